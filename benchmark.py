@@ -0,0 +1,556 @@
+#!/usr/bin/env python3
+# Copyright 2026 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Offline benchmarks of the collection pipeline, replaying a fixture of
+GitHub and Coveralls responses from a local server.
+
+    # Record an anonymized fixture of the org (needs GITHUB_TOKEN)
+    python3 benchmark.py --record org-fixture.json
+
+    # Benchmark with the recorded fixture, or a synthetic one if omitted
+    python3 benchmark.py --fixtures org-fixture.json --json results.json
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import re
+import time
+import timeit
+from dataclasses import replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+
+import github_inventory_settings as settings
+
+import dao.cache
+import utils
+from dao.coveralls import Coveralls_DAO, parse_latest_build
+from dao.github import (
+    GitHub_DAO, parse_docker_values, parse_prod_values, scan_statics)
+from dao.google import GoogleSheet_DAO, value_matrix
+from dependencies import (
+    parse_package_json, parse_package_lock, parse_pyproject,
+    parse_requirements, parse_setup_py)
+from rows import RepoRow
+from update_github_sheet import collect_repo_values
+
+logger = logging.getLogger(__name__)
+
+# Replay server path prefix for each host in a fixture
+HOSTS = {
+    '/api': 'https://api.github.com',
+    '/raw': 'https://raw.githubusercontent.com',
+    '/coveralls': 'https://coveralls.io',
+}
+
+# Repo fields read by the pipeline, everything else is dropped on record
+REPO_FIELDS = ['html_url', 'name', 'full_name', 'language', 'default_branch',
+               'pushed_at', 'archived', 'trees_url', 'releases_url']
+
+SCALES = [100, 1000, 10000]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the inventory collection pipeline offline')
+    parser.add_argument(
+        '--fixtures', help='recorded fixture file, default is synthetic')
+    parser.add_argument(
+        '--record', metavar='PATH',
+        help='record an anonymized fixture of GITHUB_ORG and exit')
+    parser.add_argument(
+        '--scales', default=','.join(str(scale) for scale in SCALES),
+        help='comma separated repo counts to benchmark')
+    parser.add_argument(
+        '--workers', type=int,
+        default=getattr(settings, 'GITHUB_WORKERS', 1),
+        help='number of repositories to collect concurrently')
+    parser.add_argument(
+        '--json', dest='json_path', help='also write the results here')
+    return parser.parse_args()
+
+
+def git_sha(content):
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()  # noqa: S324
+
+
+def rename_repos(fixtures, names):
+    """
+    Returns fixtures with each 'owner/name' in names replaced by
+    names['owner/name'], in repos, response URLs and response bodies.
+    """
+    if not names:
+        return fixtures
+
+    # Longest first, so one name that prefixes another is not split
+    name_re = re.compile('({})(?![\\w-])'.format('|'.join(
+        re.escape(name) for name in sorted(names, key=len, reverse=True))))
+
+    def _rename(text):
+        return name_re.sub(lambda match: names[match.group(1)], text)
+
+    return {
+        'repos': [json.loads(_rename(json.dumps(repo)))
+                  for repo in fixtures['repos']],
+        'responses': {_rename(url): _rename(body)
+                      for url, body in fixtures['responses'].items()},
+    }
+
+
+def scale_fixtures(fixtures, count):
+    """
+    Returns fixtures with exactly count repos, repeating the given
+    repos under new names as needed.
+    """
+    repos = fixtures['repos']
+    if count <= len(repos):
+        return {'repos': repos[:count], 'responses': fixtures['responses']}
+
+    # The copies share git objects with the originals, like forks do
+    scaled = {'repos': [], 'responses': {}}
+    for copy in range(0, count, len(repos)):
+        renamed = rename_repos(fixtures, {
+            repo['full_name']: f'{repo["full_name"]}-{copy}'
+            for repo in repos[:count - copy]})
+        scaled['repos'].extend(renamed['repos'][:count - copy])
+        scaled['responses'].update(renamed['responses'])
+    return scaled
+
+
+def synthetic_fixtures(count):
+    """
+    An org of count repos cycling through the kinds of repo in the
+    real inventory: Django webapps with statics, Python libraries,
+    JavaScript apps and repos with no recognized files.
+    """
+    cicd = (
+        "on: push\n"
+        "env:\n"
+        "  COVERAGE_PYTHON_VERSION: '3.12'\n"
+        "jobs:\n"
+        "  test:\n"
+        "    steps:\n"
+        "      - uses: uw-it-aca/actions/python-linters@main\n"
+        "        with:\n"
+        "          app_name: app\n"
+        "      - uses: uw-it-aca/actions/container-vuln-scan@main\n"
+        "      - run: coveralls\n"
+        "  build:\n"
+        "    steps:\n"
+        "      - run: npm run coveralls\n")
+    # A lockfile v3 with the transitive packages of a typical webapp
+    package_lock = json.dumps({'lockfileVersion': 3, 'packages': {
+        '': {'dependencies': {'vue': '^3.4', 'bootstrap': '^5.3'},
+             'devDependencies': {'vite': '^5.0', 'eslint': '^8.0'}},
+        **{f'node_modules/{name}': {
+            'version': version,
+            'resolved': f'https://registry.npmjs.org/{name}/-/'
+                        f'{name}-{version}.tgz',
+        } for name, version in [
+            ('vue', '3.4.21'), ('bootstrap', '5.3.3'), ('vite', '5.2.8'),
+            ('eslint', '8.57.0')]},
+        'node_modules/axdd-components': {
+            'version': '0.1.0',
+            'resolved': 'git+ssh://git@github.com/x.git#' + 'f' * 40},
+        **{f'node_modules/dep-{j}': {'version': f'1.{j}.0'}
+           for j in range(200)},
+        **{f'node_modules/dep-{j}/node_modules/vue': {'version': '2.7.0'}
+           for j in range(5)},
+    }})
+    kinds = [
+        ('Python', {
+            '.github/workflows/cicd.yml': cicd,
+            'setup.py': ("install_requires=['Django~=4.2', "
+                         "'django-compressor', 'uw-saml~=1.0']"),
+            'Dockerfile': (
+                'ARG DJANGO_CONTAINER_VERSION=2.1.0\n'
+                'FROM us-docker.pkg.dev/uwit-mci-axdd/containers/'
+                'django-container:${DJANGO_CONTAINER_VERSION} as app\n'),
+            'docker/prod-values.yml': 'ingress:\n  enabled: true\n',
+            'package.json': json.dumps({
+                'devDependencies': {'vite': '^5.0', 'eslint': '^8.0'},
+                'dependencies': {'vue': '^3.4', 'bootstrap': '^5.3',
+                                 'axdd-components': 'github:x#1.2'}}),
+            'package-lock.json': package_lock,
+            'app/static/js/main.js': '',
+            'app/static/css/main.scss': '',
+            'app/views.py': '',
+        }),
+        ('Python', {
+            '.github/workflows/cicd.yml': cicd.replace(
+                'npm run coveralls', 'python -m build'),
+            'pyproject.toml': (
+                '[project]\nrequires-python = ">=3.12"\n'
+                'dependencies = ["Django>=5.0,<5.1", "requests"]\n'),
+            'requirements-dev.txt': 'pytest==8.0\ncoverage\n',
+            'lib/__init__.py': '',
+        }),
+        ('Python', {
+            'pyproject.toml': (
+                '[tool.poetry.dependencies]\npython = "^3.10"\n'
+                'django = {version = "^4.2", extras = ["bcrypt"]}\n'),
+            'requirements.txt': 'Django==4.2.11 ; python_version >= "3.10"\n',
+            'lib/__init__.py': '',
+        }),
+        ('JavaScript', {
+            'package.json': json.dumps({'devDependencies': {'vite': '^5'}}),
+            'src/main.js': '',
+            'src/main.css': '',
+        }),
+        (None, {}),
+    ]
+
+    fixtures = {'repos': [], 'responses': {}}
+    responses = fixtures['responses']
+    for i in range(count):
+        lang, files = kinds[i % len(kinds)]
+        name = f'repo-{i}'
+        files = dict(files, **{'README.md': f'# {name}\n'})
+        api_url = f'{HOSTS["/api"]}/repos/org/{name}'
+        fixtures['repos'].append({
+            'html_url': f'https://github.com/org/{name}',
+            'name': name,
+            'full_name': f'org/{name}',
+            'language': lang,
+            'default_branch': 'main',
+            'pushed_at': '2026-01-01T00:00:00Z',
+            'license': {'name': 'Apache License 2.0'},
+            'archived': False,
+            'trees_url': f'{api_url}/git/trees{{/sha}}',
+            'releases_url': f'{api_url}/releases{{/id}}',
+        })
+
+        for path, content in files.items():
+            responses[f'{HOSTS["/raw"]}/org/{name}/main/{path}'] = content
+        responses[f'{api_url}/releases/latest'] = json.dumps(
+            {'tag_name': f'1.{i}.0'})
+        responses[f'{HOSTS["/coveralls"]}/github/org/{name}.json'
+                  '?branch=main'] = json.dumps({'builds': [{
+                      'commit_sha': git_sha(name), 'covered_percent': 87.25}]})
+        responses[f'{HOSTS["/coveralls"]}/builds/{git_sha(name)}.json'
+                  '?paths=*%2Fstatic%2F*'] = json.dumps({
+                      'selected_source_files_count': 2,
+                      'paths_covered_percent': 40.0})
+
+        # Nested trees, named by the SHA of their listing like git does
+        dirs = {'': {}}
+        for path, content in files.items():
+            parts = path.split('/')
+            for depth in range(1, len(parts)):
+                dirs.setdefault('/'.join(parts[:depth]), {})
+                dirs['/'.join(parts[:depth - 1])][parts[depth - 1]] = None
+            dirs['/'.join(parts[:-1])][parts[-1]] = git_sha(content)
+
+        def _tree_sha(path, dirs=dirs, api_url=api_url):
+            items = [{
+                'path': entry,
+                'type': 'blob' if sha else 'tree',
+                'sha': sha or _tree_sha(f'{path}/{entry}'.lstrip('/')),
+            } for entry, sha in sorted(dirs[path].items())]
+            sha = git_sha(json.dumps(items))
+            responses[f'{api_url}/git/trees/{sha}'] = json.dumps(
+                {'sha': sha, 'tree': items, 'truncated': False})
+            return sha
+
+        root = _tree_sha('')
+        responses[f'{api_url}/git/trees/main'] = responses[
+            f'{api_url}/git/trees/{root}']
+        responses[f'{api_url}/git/trees/{root}?recursive=1'] = json.dumps({
+            'sha': root,
+            'tree': [{'path': path, 'type': 'blob', 'sha': git_sha(content)}
+                     for path, content in files.items()],
+            'truncated': False})
+
+    return fixtures
+
+
+def recording_dao(dao_class, responses, lock):
+    """
+    Returns a dao_class instance whose sessions add each successful
+    response to responses.
+    """
+    def _record(resp, *args, **kwargs):
+        if resp.status_code == 200:
+            with lock:
+                responses[resp.url] = resp.text
+
+    class RecordingDAO(dao_class):
+        @property
+        def client(self):
+            client = super().client
+            if _record not in client.hooks['response']:
+                client.hooks['response'].append(_record)
+            return client
+
+    return RecordingDAO()
+
+
+def record_fixtures(path, workers):
+    """
+    Collects the org and writes every response it needed, with the org
+    and repo names replaced by org/repo-N, to path.
+    """
+    github_org = getattr(settings, 'GITHUB_ORG', '')
+    settings.GITHUB_CACHE_PATH = None  # record full responses, not 304s
+
+    responses = {}
+    lock = Lock()
+    ghclient = recording_dao(GitHub_DAO, responses, lock)
+    utils.coveralls = recording_dao(Coveralls_DAO, responses, lock)
+
+    repos = [{field: repo.get(field) for field in REPO_FIELDS} | {
+        'license': {'name': repo['license']['name']} if (
+            repo.get('license')) else None,
+    } for repo in ghclient.get_repositories_for_org(github_org)]
+    collect_repo_values(repos, ghclient, workers)
+
+    fixtures = rename_repos({'repos': repos, 'responses': responses}, {
+        repo['full_name']: f'org/repo-{i}' for i, repo in enumerate(repos)})
+    for repo in fixtures['repos']:
+        repo['name'] = repo['full_name'].split('/')[1]
+
+    with open(path, 'w') as f:
+        json.dump(fixtures, f)
+    logger.info(f'Recorded {len(repos)} repos, {len(responses)} responses'
+                f' to {path}')
+
+
+class ReplayServer(ThreadingHTTPServer):
+    """
+    Serves fixture responses by URL path, HOSTS prefixes select the
+    host, anything not in the fixture is a 404.
+    """
+    daemon_threads = True
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.requests = 0
+        self._lock = Lock()
+        super().__init__(('127.0.0.1', 0), ReplayHandler)
+        Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def base_url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+    def repos(self, fixtures):
+        """
+        Returns the fixture repos with their API URLs pointed here.
+        """
+        return [{
+            **repo,
+            'trees_url': repo['trees_url'].replace(
+                HOSTS['/api'], self.base_url + '/api'),
+            'releases_url': repo['releases_url'].replace(
+                HOSTS['/api'], self.base_url + '/api'),
+        } for repo in fixtures['repos']]
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        prefix, _, path = self.path.partition('/')[2].partition('/')
+        body = self.server.responses.get(
+            f'{HOSTS.get("/" + prefix, "")}/{path}')
+        with self.server._lock:
+            self.server.requests += 1
+
+        content = body.encode('utf-8') if body is not None else b''
+        self.send_response(200 if body is not None else 404)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def reset_value_cache():
+    # Start each scale cold, values memoized by an earlier one would
+    # otherwise skip most of its requests
+    with dao.cache._cache_lock:
+        dao.cache._value_cache = None
+
+
+def benchmark_collection(fixtures, workers):
+    """
+    End-to-end get_repo_values throughput against the replay server.
+    """
+    server = ReplayServer(fixtures['responses'])
+    settings.GITHUB_RAW_URL = server.base_url + '/raw'
+    settings.COVERALLS_URL = server.base_url + '/coveralls'
+    try:
+        repos = server.repos(fixtures)
+        reset_value_cache()
+        start = time.perf_counter()
+        results = collect_repo_values(repos, GitHub_DAO(), workers)
+        seconds = time.perf_counter() - start
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    return {
+        'repos': len(repos),
+        'failed': results.count(None),
+        'requests': server.requests,
+        'seconds': seconds,
+        'repos_per_second': len(repos) / seconds,
+    }, [values for values in results if values is not None]
+
+
+def benchmark_parsers(fixtures, number=200):
+    """
+    CPU microseconds per call for each parser, over every matching
+    file in fixtures.
+    """
+    parsers = {
+        'setup.py': parse_setup_py,
+        'pyproject.toml': parse_pyproject,
+        'requirements.txt': parse_requirements,
+        'Dockerfile': parse_docker_values,
+        'docker/prod-values.yml': parse_prod_values,
+        'package.json': parse_package_json,
+        'package-lock.json': parse_package_lock,
+        'workflow': utils.analyze_workflow,
+    }
+    samples = {name: [] for name in parsers}
+    samples.update({'trees': [], 'coveralls': []})
+    for url, body in fixtures['responses'].items():
+        if url.startswith(HOSTS['/raw']):
+            for name in parsers:
+                if url.endswith(f'/{name}') or (
+                        name == 'workflow' and '/.github/workflows/' in url):
+                    samples[name].append(body.encode('utf-8'))
+                    break
+        elif url.endswith('?recursive=1'):
+            samples['trees'].append(
+                [item['path'] for item in json.loads(body)['tree']])
+        elif url.startswith(HOSTS['/coveralls'] + '/github/'):
+            samples['coveralls'].append(body)
+
+    parsers.update({
+        'trees': lambda paths: scan_statics(paths),
+        'coveralls': parse_latest_build,
+    })
+
+    results = {}
+    for name, parser in parsers.items():
+        contents = samples[name][:number]
+        if not contents:
+            continue
+        timer = timeit.Timer(
+            lambda parser=parser, contents=contents: [
+                parser(content) for content in contents],
+            timer=time.process_time)
+        loops, seconds = timer.autorange()
+        results[name] = {
+            'files': len(contents),
+            'cpu_us_per_call': seconds / loops / len(contents) * 1e6,
+        }
+    return results
+
+
+class ReplaySheet_DAO(GoogleSheet_DAO):
+    """
+    GoogleSheet_DAO whose client stands in for gspread's HTTP client,
+    holding the current values of each worksheet and counting the
+    cells written.
+    """
+    def __init__(self, worksheets):
+        super().__init__()
+        self.worksheets = worksheets
+        self.cells_written = 0
+
+    @property
+    def client(self):
+        return self
+
+    @property
+    def http_client(self):
+        return self
+
+    def values_batch_get(self, sheet_id, ranges, params=None):
+        return {'valueRanges': [{
+            'values': [list(row) for row in self.worksheets[name.strip("'")]],
+        } for name in ranges]}
+
+    def values_batch_update(self, sheet_id, body=None):
+        self.cells_written += sum(len(value_range['values']) * len(
+            value_range['values'][0]) for value_range in body['data'])
+
+
+def benchmark_sheet_diff(results, change_rate=0.05):
+    """
+    update_sheets time for a sheet holding the collected values, with
+    change_rate of the rows changed since the last update.
+    """
+    repo_list = [repo_row for repo_row, _webapp in results]
+    col_names = list(RepoRow.COLUMNS)
+    current = [col_names] + value_matrix(repo_list, col_names)
+
+    step = max(int(1 / change_rate), 1)
+    changed = [replace(row, version='changed') if (i % step == 0) else row
+               for i, row in enumerate(repo_list)]
+
+    sheets = ReplaySheet_DAO({'GitHub': current})
+    start = time.perf_counter()
+    sheets.update_sheets('benchmark', {'GitHub': changed})
+    seconds = time.perf_counter() - start
+    return {
+        'cells': len(current) * len(col_names),
+        'cells_written': sheets.cells_written,
+        'seconds': seconds,
+    }
+
+
+def run(args):
+    recorded = None
+    if args.fixtures:
+        with open(args.fixtures) as f:
+            recorded = json.load(f)
+
+    # Replayed responses are not rate limited or cached
+    settings.GITHUB_TOKEN = getattr(settings, 'GITHUB_TOKEN', None) or 'replay'
+    settings.GITHUB_REQUEST_RATE = 1e9
+    settings.GITHUB_REQUEST_BURST = 1e9
+    settings.GITHUB_CACHE_PATH = None
+
+    report = {'parsers': benchmark_parsers(
+        recorded or synthetic_fixtures(100)), 'scales': {}}
+    for name, result in report['parsers'].items():
+        logger.info(f'parse {name}: {result["cpu_us_per_call"]:.1f}us CPU'
+                    f' per call, {result["files"]} files')
+
+    for scale in [int(scale) for scale in args.scales.split(',')]:
+        fixtures = scale_fixtures(recorded, scale) if (
+            recorded) else synthetic_fixtures(scale)
+        collection, results = benchmark_collection(fixtures, args.workers)
+        sheet_diff = benchmark_sheet_diff(results)
+        report['scales'][scale] = {
+            'collection': collection, 'sheet_diff': sheet_diff}
+        logger.info(
+            f'{scale} repos: collected in {collection["seconds"]:.2f}s '
+            f'({collection["repos_per_second"]:.1f} repos/s, '
+            f'{collection["requests"]} requests, '
+            f'{collection["failed"]} failed), sheet diff of '
+            f'{sheet_diff["cells"]} cells in {sheet_diff["seconds"]:.3f}s')
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    logging.getLogger('dao.google').setLevel(logging.WARNING)
+    if args.record:
+        record_fixtures(args.record, args.workers)
+    else:
+        run(args)
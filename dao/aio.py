@@ -0,0 +1,278 @@
+# Copyright 2026 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+import asyncio
+import logging
+import time
+from itertools import count
+
+import github_inventory_settings as settings
+import httpx
+
+from dao.cache import get_value_cache
+from dao.coveralls import (
+    cached_js_coverage, coveralls_build_url, coveralls_repo_url,
+    js_coverage_from_response, latest_build, parse_build_coverage)
+from dao.github import (
+    SHA_RE, STATICS_NAMESPACE, WORKFLOWS_PATH, StaticsScan, cached_tree,
+    entry_sha, memoize_values, memoized_values, parse_current_version,
+    parse_docker_values, parse_prod_values, raw_file_url, retry_request,
+    root_file_names, tree_from_response, workflow_files)
+from dao.metrics import get_metrics
+from dao.ratelimit import get_rate_limiter
+from dependencies import DEFAULT_MANIFEST_NAMES, NPM, PYTHON
+
+logger = logging.getLogger(__name__)
+
+
+def new_async_client(headers, semaphore_limit):
+    return httpx.AsyncClient(
+        http2=True,
+        follow_redirects=True,
+        headers=headers,
+        limits=httpx.Limits(
+            max_connections=semaphore_limit,
+            max_keepalive_connections=semaphore_limit),
+        timeout=getattr(settings, 'GITHUB_ASYNC_TIMEOUT', 30))
+
+
+class AsyncLimiter:
+    """
+    Global cap on in-flight requests, shared by the async DAOs so that
+    GitHub and Coveralls requests draw from the same budget.
+    """
+    def __init__(self, limit=None):
+        if limit is None:
+            limit = getattr(settings, 'GITHUB_ASYNC_CONCURRENCY', 20)
+        self.limit = limit
+        self._semaphore = asyncio.Semaphore(limit)
+
+    async def __aenter__(self):
+        await self._semaphore.acquire()
+
+    async def __aexit__(self, *args):
+        self._semaphore.release()
+
+
+class AsyncGitHub_DAO:
+    def __init__(self, limiter=None):
+        self.limiter = limiter or AsyncLimiter()
+        self._client = None
+        self._branch_trees = {}
+
+    @property
+    def client(self):
+        if self._client is None:
+            github_org = getattr(settings, 'GITHUB_ORG', '')
+            access_token = getattr(settings, 'GITHUB_TOKEN', '')
+
+            if not access_token:
+                raise Exception(  # noqa: TRY002
+                    'Need a GITHUB_TOKEN with access to github org')
+
+            self._client = new_async_client({
+                'Authorization': f'token {access_token}',
+                'Accept': 'application/vnd.github.v3+json',
+                'User-Agent': f'{github_org}/github-inventory-updater',
+            }, self.limiter.limit)
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _request(self, method, url, **kwargs):
+        """
+        Makes a request as GitHub_DAO._request does, paced by the same
+        shared rate limiter, then within the in-flight limit.
+        """
+        rate_limiter = get_rate_limiter()
+        for attempt in count():
+            throttled = await rate_limiter.acquire_async()
+            resp = error = None
+            async with self.limiter:
+                start = time.perf_counter()
+                try:
+                    resp = await self.client.request(method, url, **kwargs)
+                except httpx.TransportError as ex:
+                    error = ex
+                seconds = time.perf_counter() - start
+            if not retry_request(url, attempt, seconds, throttled, resp,
+                                 error):
+                return resp
+
+    async def get(self, url, headers=None):
+        if headers is None:
+            headers = {}
+
+        resp = await self._request('get', url, headers=headers)
+        if resp.status_code in getattr(settings, 'GITHUB_OK_STATUS', []):
+            return resp
+
+        raise Exception(  # noqa: TRY002
+            f'GitHub request failed, URL: {url}, Status: {resp.status_code}, '
+            f'Response: {resp.content}'
+        )
+
+    async def get_file(self, url, default_branch, path):
+        resp = await self.get(raw_file_url(url, default_branch, path))
+        if resp.status_code == 200:
+            return resp.content
+
+    async def get_tree(self, url, ref):
+        if SHA_RE.fullmatch(ref) is not None:
+            return await self._get_tree(url, ref)
+
+        # Concurrent lookups of a branch share one request
+        key = (url, ref)
+        if key not in self._branch_trees:
+            self._branch_trees[key] = asyncio.ensure_future(
+                self._get_tree(url, ref))
+        return await self._branch_trees[key]
+
+    async def _get_tree(self, url, ref):
+        tree = cached_tree(ref)
+        if tree is None:
+            tree = tree_from_response(
+                ref, await self.get(url.replace('{/sha}', f'/{ref}')))
+        return tree
+
+    async def get_subtree(self, url, tree, path):
+        for name in path.split('/'):
+            sha = entry_sha(tree, name, 'tree')
+            tree = await self.get_tree(url, sha) if sha else None
+        return tree
+
+    async def get_workflow_files(self, url, trees_url, default_branch):
+        return workflow_files(await self.get_subtree(
+            trees_url, await self.get_tree(trees_url, default_branch),
+            WORKFLOWS_PATH))
+
+    async def get_current_version(self, url):
+        url = url.replace('{/id}', '/latest')
+        resp = await self.get(url)
+        if resp.status_code == 200:
+            return parse_current_version(resp.content)
+
+    async def get_has_statics(self, url, default_branch):
+        root = await self.get_tree(url, default_branch)
+        if root is None:
+            return (False, False)
+
+        cache = get_value_cache()
+        statics = cache.get(STATICS_NAMESPACE, root['sha'])
+        if statics is None:
+            statics = await self._scan_tree_statics(url, root)
+            cache.set(STATICS_NAMESPACE, root['sha'], statics)
+        return tuple(statics)
+
+    async def _scan_tree_statics(self, url, root):
+        resp = await self.get(
+            url.replace('{/sha}', f'/{root["sha"]}?recursive=1'))
+        scan = StaticsScan(root, resp.json())
+        while (sha := scan.next_tree()) is not None:
+            resp = await self.get(url.replace('{/sha}', f'/{sha}'))
+            scan.add(resp.json())
+        return scan.statics
+
+    async def get_blob_sha(self, trees_url, default_branch, path):
+        dir_path, _, name = path.rpartition('/')
+        tree = await self.get_tree(trees_url, default_branch)
+        if dir_path:
+            tree = await self.get_subtree(trees_url, tree, dir_path)
+        return entry_sha(tree, name, 'blob')
+
+    async def get_file_values(self, url, default_branch, path, parse,
+                              trees_url=None):
+        if trees_url is None:
+            content = await self.get_file(url, default_branch, path)
+            return parse(content) if content is not None else None
+
+        sha = await self.get_blob_sha(trees_url, default_branch, path)
+        if sha is None:
+            return None
+
+        values = memoized_values(parse, sha)
+        if values is None:
+            content = await self.get_file(url, default_branch, path)
+            if content is None:
+                return None
+            values = memoize_values(parse, sha, content)
+        return values
+
+    async def get_dependency_values(self, url, default_branch, ecosystem,
+                                    trees_url=None):
+        names = DEFAULT_MANIFEST_NAMES
+        if trees_url is not None:
+            names = root_file_names(
+                await self.get_tree(trees_url, default_branch))
+
+        files = ecosystem.manifest_files(names)
+        results = await asyncio.gather(*[self.get_file_values(
+            url, default_branch, name, parse, trees_url)
+            for name, parse, pins in files])
+        return ecosystem.values([
+            (dependencies, pins) for (name, parse, pins), dependencies in zip(
+                files, results) if dependencies is not None])
+
+    async def get_package_values(self, url, default_branch, trees_url=None):
+        return await self.get_dependency_values(
+            url, default_branch, NPM, trees_url)
+
+    async def get_prod_values(self, url, default_branch, trees_url=None):
+        return await self.get_file_values(
+            url, default_branch, 'docker/prod-values.yml', parse_prod_values,
+            trees_url) or {}
+
+    async def get_docker_values(self, url, default_branch, trees_url=None):
+        return await self.get_file_values(
+            url, default_branch, 'Dockerfile', parse_docker_values,
+            trees_url) or {}
+
+    async def get_setup_values(self, url, default_branch, trees_url=None):
+        return await self.get_dependency_values(
+            url, default_branch, PYTHON, trees_url)
+
+
+class AsyncCoveralls_DAO:
+    def __init__(self, limiter=None):
+        self.limiter = limiter or AsyncLimiter()
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            github_org = getattr(settings, 'GITHUB_ORG', '')
+            self._client = new_async_client({
+                'User-Agent': f'{github_org}/github-inventory-updater',
+                'Accept': 'application/json',
+            }, self.limiter.limit)
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def get(self, url):
+        async with self.limiter:
+            start = time.perf_counter()
+            resp = await self.client.get(url)
+        get_metrics().record_request(
+            url, resp.status_code, len(resp.content),
+            time.perf_counter() - start)
+        return resp
+
+    async def get_coverage(self, repo_url, default_branch, has_js=False):
+        coveralls_url = coveralls_repo_url(repo_url, default_branch)
+        build = latest_build(coveralls_url, await self.get(coveralls_url))
+        if build is None:
+            return (0, False)
+
+        commit_id = build['commit_sha']
+        js_coverage = cached_js_coverage(commit_id) if has_js else False
+        if js_coverage is None:
+            js_coverage = js_coverage_from_response(
+                commit_id, await self.get(coveralls_build_url(commit_id)))
+        return (parse_build_coverage(build), js_coverage)
@@ -0,0 +1,218 @@
+# Copyright 2026 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+import logging
+import sqlite3
+import time
+from threading import Lock
+
+import github_inventory_settings as settings
+import requests
+from requests.structures import CaseInsensitiveDict
+
+logger = logging.getLogger(__name__)
+
+CACHED_HEADERS = ['Content-Type', 'ETag', 'Last-Modified', 'Link']
+
+
+class ResponseCache:
+    """
+    Persistent store of GitHub responses keyed by URL, used to send
+    conditional requests (If-None-Match/If-Modified-Since) and to
+    replay the stored body when GitHub answers 304 Not Modified.  The
+    least recently used responses are evicted beyond max_size bytes.
+    """
+    def __init__(self, path, max_size):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._accessed = {}
+        self._lock = Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            'url TEXT PRIMARY KEY, status INTEGER, headers TEXT, '
+            'content BLOB, size INTEGER, accessed REAL)')
+        self._size = self._db.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+    def conditional_headers(self, url):
+        with self._lock:
+            row = self._db.execute(
+                'SELECT headers FROM responses WHERE url = ?',
+                (url,)).fetchone()
+
+        headers = {}
+        if row is not None:
+            cached = json.loads(row[0])
+            if cached.get('ETag'):
+                headers['If-None-Match'] = cached['ETag']
+            if cached.get('Last-Modified'):
+                headers['If-Modified-Since'] = cached['Last-Modified']
+        return headers
+
+    def response(self, url):
+        with self._lock:
+            row = self._db.execute(
+                'SELECT status, headers, content FROM responses '
+                'WHERE url = ?', (url,)).fetchone()
+            if row is None:
+                return None
+            # Written with the next store, not on every hit
+            self._accessed[url] = time.time()
+            self.hits += 1
+
+        resp = requests.Response()
+        resp.url = url
+        resp.status_code = row[0]
+        resp.headers = CaseInsensitiveDict(json.loads(row[1]))
+        resp._content = row[2]
+        return resp
+
+    def store(self, url, resp):
+        with self._lock:
+            self.misses += 1
+            if not (resp.headers.get('ETag') or
+                    resp.headers.get('Last-Modified')):
+                return
+
+            headers = {name: resp.headers[name] for name in CACHED_HEADERS
+                       if name in resp.headers}
+            size = len(resp.content)
+            old = self._db.execute(
+                'SELECT size FROM responses WHERE url = ?', (url,)).fetchone()
+            self._db.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)',
+                (url, resp.status_code, json.dumps(headers), resp.content,
+                 size, time.time()))
+            self._size += size - (old[0] if old else 0)
+            self._accessed.pop(url, None)
+            self._write_accessed()
+            if self._size > self.max_size:
+                self._evict()
+            self._db.commit()
+
+    def flush(self):
+        """
+        Writes the access times of the responses replayed since the
+        last store.
+        """
+        with self._lock:
+            self._write_accessed()
+            self._db.commit()
+
+    def _write_accessed(self):
+        self._db.executemany(
+            'UPDATE responses SET accessed = ? WHERE url = ?',
+            [(accessed, url) for url, accessed in self._accessed.items()])
+        self._accessed.clear()
+
+    def _evict(self):
+        # Drop least recently used responses down to 90% of max_size
+        target = self.max_size * 0.9
+        rows = self._db.execute(
+            'SELECT url, size FROM responses ORDER BY accessed').fetchall()
+        for url, size in rows:
+            if self._size <= target:
+                break
+            self._db.execute('DELETE FROM responses WHERE url = ?', (url,))
+            self._size -= size
+
+    def log_stats(self):
+        total = self.hits + self.misses
+        logger.info(
+            f'GitHub response cache: {self.hits} hits, {self.misses} misses'
+            f' ({(self.hits / total * 100) if total else 0:.1f}% hit rate),'
+            f' {self._size} bytes stored')
+
+
+class ValueCache:
+    """
+    Persistent memo of derived values, such as parse results keyed by
+    git object SHA, grouped by namespace.  Values must be JSON
+    serializable.  Without a path it only lasts for the run.  Once the
+    values stored exceed max_size bytes, the least recently set ones
+    are dropped.
+    """
+    def __init__(self, path=None, max_size=None):
+        self.max_size = max_size
+        self._lock = Lock()
+        self._db = sqlite3.connect(path or ':memory:', check_same_thread=False)
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS memo ('
+            'namespace TEXT, key TEXT, value TEXT, '
+            'PRIMARY KEY (namespace, key))')
+        self._size = self._db.execute(
+            'SELECT COALESCE(SUM(LENGTH(value)), 0) FROM memo').fetchone()[0]
+
+    def get(self, namespace, key):
+        with self._lock:
+            row = self._db.execute(
+                'SELECT value FROM memo WHERE namespace = ? AND key = ?',
+                (namespace, key)).fetchone()
+        if row is not None:
+            return json.loads(row[0])
+
+    def set(self, namespace, key, value):
+        value = json.dumps(value)
+        with self._lock:
+            old = self._db.execute(
+                'SELECT LENGTH(value) FROM memo WHERE namespace = ? AND '
+                'key = ?', (namespace, key)).fetchone()
+            # A replaced row gets a new rowid, the highest
+            self._db.execute(
+                'INSERT OR REPLACE INTO memo VALUES (?, ?, ?)',
+                (namespace, key, value))
+            self._size += len(value) - (old[0] if old else 0)
+            if self.max_size is not None and self._size > self.max_size:
+                self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        # Drop the oldest values down to 90% of max_size
+        target = self.max_size * 0.9
+        rows = self._db.execute(
+            'SELECT rowid, LENGTH(value) FROM memo ORDER BY rowid').fetchall()
+        for rowid, size in rows:
+            if self._size <= target:
+                break
+            self._db.execute('DELETE FROM memo WHERE rowid = ?', (rowid,))
+            self._size -= size
+
+
+_response_cache = None
+_cache_lock = Lock()
+_value_cache = None
+
+
+def get_response_cache():
+    """
+    Returns the shared ResponseCache, or None if GITHUB_CACHE_PATH
+    is not set.
+    """
+    global _response_cache
+    path = getattr(settings, 'GITHUB_CACHE_PATH', None)
+    if not path:
+        return None
+
+    with _cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache(path, getattr(
+                settings, 'GITHUB_CACHE_MAX_SIZE', 256 * 1024 * 1024))
+    return _response_cache
+
+
+def get_value_cache():
+    """
+    Returns the shared ValueCache, kept in GITHUB_CACHE_PATH if set,
+    holding up to GITHUB_VALUE_CACHE_MAX_SIZE bytes of values.
+    """
+    global _value_cache
+    with _cache_lock:
+        if _value_cache is None:
+            _value_cache = ValueCache(
+                getattr(settings, 'GITHUB_CACHE_PATH', None),
+                getattr(settings, 'GITHUB_VALUE_CACHE_MAX_SIZE',
+                        64 * 1024 * 1024))
+    return _value_cache
@@ -3,15 +3,86 @@
 
 import json
 import logging
+import time
 from threading import local
+from urllib.parse import quote
 
 import github_inventory_settings as settings
 import requests
-from bs4 import BeautifulSoup
+
+from dao.cache import get_value_cache
+from dao.metrics import get_metrics
 
 logger = logging.getLogger(__name__)
 
 
+def coveralls_repo_url(repo_url, default_branch):
+    coveralls_url = repo_url.replace('https://github.com', getattr(
+        settings, 'COVERALLS_URL', 'https://coveralls.io') + '/github')
+    return f'{coveralls_url}.json?branch={quote(default_branch)}'
+
+
+def coveralls_build_url(commit_id):
+    coveralls_url = getattr(settings, 'COVERALLS_URL', 'https://coveralls.io')
+    return f'{coveralls_url}/builds/{commit_id}.json?paths=*%2Fstatic%2F*'
+
+
+def parse_latest_build(content):
+    """
+    Returns the latest build from a repo response, which is either the
+    build itself or a page of builds, newest first.
+    """
+    data = json.loads(content)
+    if 'builds' in data:
+        return data['builds'][0] if data['builds'] else None
+    return data if data.get('commit_sha') else None
+
+
+def parse_build_coverage(build):
+    return int(float(build.get('covered_percent') or 0) * 10) / 10.0
+
+
+def parse_build_js_coverage(content):
+    data = json.loads(content)
+    if data.get('selected_source_files_count', 0) > 0:
+        return (data.get('paths_covered_percent') or 0) > 0
+    return False
+
+
+def latest_build(coveralls_url, resp):
+    """
+    Returns the latest build in resp, the response for coveralls_url,
+    or None, logging why if it could not be read.
+    """
+    if resp.status_code != 200:
+        logger.error(f'Error fetching {coveralls_url}: {resp}')
+        return None
+
+    try:
+        return parse_latest_build(resp.content)
+    except ValueError as err:
+        logger.error(f'Error determining coverage for {coveralls_url}: '
+                     f'{err}, response: {resp.content}')
+        return None
+
+
+def cached_js_coverage(commit_id):
+    return get_value_cache().get('coveralls js', commit_id)
+
+
+def js_coverage_from_response(commit_id, resp):
+    """
+    Returns whether the statics of the build for commit_id are covered,
+    caching it by commit SHA, or False if the build could not be read.
+    """
+    if resp.status_code != 200:
+        return False
+
+    js_coverage = parse_build_js_coverage(resp.content)
+    get_value_cache().set('coveralls js', commit_id, js_coverage)
+    return js_coverage
+
+
 class Coveralls_DAO:
     def __init__(self):
         self._local = local()
@@ -24,42 +95,34 @@ class Coveralls_DAO:
             client = requests.Session()
             client.headers.update({
                 'User-Agent': f'{github_org}/github-inventory-updater',
+                'Accept': 'application/json',
             })
             self._local.client = client
         return self._local.client
 
+    def get(self, url):
+        start = time.perf_counter()
+        resp = self.client.get(url)
+        get_metrics().record_request(
+            url, resp.status_code, len(resp.content),
+            time.perf_counter() - start)
+        return resp
+
     def get_coverage(self, repo_url, default_branch, has_js=False):
-        coveralls_url = repo_url.replace(
-            'https://github.com', 'https://coveralls.io/repos/github')
-        coveralls_url += f'/badge.svg?branch={default_branch}'
-        coverage = 0
-        has_js_coverage = False
-
-        resp = self.client.get(coveralls_url)
-        if resp.status_code == 200:
-            html = resp.content.decode('utf-8')
-            soup = BeautifulSoup(html, 'lxml')
-            try:
-                raw_percent = soup.find_all('text')[-1].text or '0'
-                covered_percent = raw_percent.replace('%', '')
-                coverage = int(float(covered_percent) * 10) / 10.0
-            except Exception as err:
-                logger.error(f'Error determining coverage for {coveralls_url}: '
-                             f'{err}, response: {html}')
-                return (coverage, has_js_coverage)
-
-            if has_js:
-                commit_id = '' # data.get('commit_sha')
-                build_url = (
-                    f'https://coveralls.io/builds/{commit_id}.json?paths=*%2Fstatic%2F*'
-                )
-                resp = self.client.get(build_url)
-
-                if resp.status_code == 200:
-                    data = json.loads(resp.content)
-                    if data.get('selected_source_files_count', 0) > 0:
-                        has_js_coverage = data.get('paths_covered_percent', 0) > 0
-        else:
-            logger.error(f'Error fetching {coveralls_url}: {resp}')
-
-        return (coverage, has_js_coverage)
+        """
+        Returns (coverage, has_js_coverage) for the latest build on
+        default_branch.  Coverage is read from the latest build on every
+        run, whether its statics are covered is cached by the build's
+        commit SHA.
+        """
+        coveralls_url = coveralls_repo_url(repo_url, default_branch)
+        build = latest_build(coveralls_url, self.get(coveralls_url))
+        if build is None:
+            return (0, False)
+
+        commit_id = build['commit_sha']
+        js_coverage = cached_js_coverage(commit_id) if has_js else False
+        if js_coverage is None:
+            js_coverage = js_coverage_from_response(
+                commit_id, self.get(coveralls_build_url(commit_id)))
+        return (parse_build_coverage(build), js_coverage)
@@ -2,25 +2,324 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import json
+import logging
 import re
+import time
+from itertools import count
 from threading import local
+from urllib.parse import urlencode
 
 import github_inventory_settings as settings
 import requests
-import toml
 import yaml
 
-JS_RE = re.compile(r'.*\.js$')
-CSS_RE = re.compile(r'.*\.(?:css|scss|less)$')
-DJANGO_RE = re.compile(r'[\'"]django([~=>].*)?[\'"]', re.IGNORECASE)
-COMPRESSOR_RE = re.compile(r'[\'"]django-compressor([~=>].*)?[\'"]', re.IGNORECASE)
+from dao.cache import get_response_cache, get_value_cache
+from dao.metrics import get_metrics
+from dao.ratelimit import get_rate_limiter, is_retryable
+from dependencies import DEFAULT_MANIFEST_NAMES, NPM, PYTHON
+
+JS_EXTENSIONS = ('.js',)
+CSS_EXTENSIONS = ('.css', '.scss', '.less')
 DJANGO_CONTAINER_RE = re.compile(r'FROM .*:(.*) as .*')
 DJANGO_CONTAINER_VERSION_RE = re.compile(r'ARG DJANGO_CONTAINER_VERSION=(.*)')
+SHA_RE = re.compile(r'[0-9a-f]{40}')
+WORKFLOWS_PATH = '.github/workflows'
+WORKFLOW_EXTENSIONS = ('.yml', '.yaml')
+PREFETCH_PATHS = [
+    'setup.py',
+    'pyproject.toml',
+    'Dockerfile',
+    'docker/prod-values.yml',
+    'package.json',
+    'package-lock.json',
+    'requirements.txt',
+    'requirements-dev.txt',
+    'requirements-test.txt',
+]
+
+# Parse results and statics persist in GITHUB_CACHE_PATH by git SHA.
+# Bump a version whenever the parsers given to memoize_values, or the
+# extensions scan_statics looks for, change, so that results of
+# earlier code are not reused.
+PARSERS_VERSION = 1
+STATICS_VERSION = 1
+STATICS_NAMESPACE = f'statics v{STATICS_VERSION}'
+
+logger = logging.getLogger(__name__)
+
+
+def raw_file_url(url, default_branch, path):
+    git_file_url = url.replace('https://github.com', getattr(
+        settings, 'GITHUB_RAW_URL', 'https://raw.githubusercontent.com'))
+    return f'{git_file_url}/{default_branch}/{path}'
+
+
+def graphql_files_query(repos):
+    """
+    One query fetching the text of PREFETCH_PATHS and of the workflow
+    files, and the latest release tag, for each repo, aliased by
+    position in repos.
+    """
+    fields = []
+    for i, repo in enumerate(repos):
+        owner, name = repo['full_name'].split('/')
+        blobs = ' '.join(
+            f'f{j}: object(expression: '
+            f'{json.dumps(repo["default_branch"] + ":" + path)}) '
+            '{ ... on Blob { text isTruncated } }'
+            for j, path in enumerate(PREFETCH_PATHS))
+        workflows = (
+            'workflows: object(expression: '
+            f'{json.dumps(repo["default_branch"] + ":" + WORKFLOWS_PATH)}) '
+            '{ ... on Tree { entries { name type oid '
+            'object { ... on Blob { text isTruncated } } } } }')
+        fields.append(
+            f'r{i}: repository(owner: {json.dumps(owner)}, '
+            f'name: {json.dumps(name)}) '
+            f'{{ {blobs} {workflows} latestRelease {{ tagName }} }}')
+    return 'query { ' + ' '.join(fields) + ' }'
+
+
+def parse_graphql_files(data, repos):
+    """
+    Returns a ({path: content or None}, release tag, workflow files)
+    tuple for each repo in a graphql_files_query response, or None for
+    repos it is missing.  Files too large for GraphQL to return whole
+    are left out, to be downloaded.
+    """
+    def _add_file(files, path, blob):
+        if not blob:
+            files[path] = None
+        elif not blob.get('isTruncated'):
+            files[path] = blob['text'].encode('utf-8') if (
+                blob.get('text') is not None) else None
+
+    results = []
+    for i in range(len(repos)):
+        repo_data = (data.get('data') or {}).get(f'r{i}')
+        if repo_data is None:
+            results.append(None)
+            continue
+
+        files = {}
+        for j, path in enumerate(PREFETCH_PATHS):
+            _add_file(files, path, repo_data.get(f'f{j}'))
+
+        workflows = []
+        for entry in (repo_data.get('workflows') or {}).get('entries', []):
+            if (entry['type'] == 'blob' and
+                    entry['name'].endswith(WORKFLOW_EXTENSIONS)):
+                workflows.append((entry['name'], entry['oid']))
+                _add_file(files, f'{WORKFLOWS_PATH}/{entry["name"]}',
+                          entry.get('object'))
+
+        release = repo_data.get('latestRelease')
+        results.append((files, release.get('tagName') if release else None,
+                        sorted(workflows)))
+    return results
+
+
+def retry_request(url, attempt, seconds, throttled, resp=None, error=None):
+    """
+    Records an attempt at a request to url, which took seconds after
+    waiting throttled seconds for the rate limiter, and got resp or
+    raised error.  Returns whether to retry it, after pausing the rate
+    limiter for the backoff, and raises error once retries run out.
+    Each attempt is recorded with its own latency, and a 304 as a
+    response cache hit.
+    """
+    limiter = get_rate_limiter()
+    if resp is not None:
+        limiter.update(resp)
+    retry = attempt < getattr(settings, 'GITHUB_MAX_RETRIES', 5) and (
+        error is not None or is_retryable(resp))
+    get_metrics().record_request(
+        url, resp.status_code if resp is not None else 0,
+        len(resp.content) if resp is not None else 0, seconds,
+        cache_hit=resp is not None and resp.status_code == 304,
+        retried=retry, throttled=throttled)
+
+    if not retry:
+        if error is not None:
+            raise error
+        return False
+
+    logger.warning(f'Retrying {url}: ' + (
+        str(error) if error is not None else f'Status {resp.status_code}'))
+    limiter.backoff(resp, attempt)
+    return True
+
+
+def parse_tree(content):
+    """
+    Returns a git trees response as {'sha': ..., 'tree': [{path, type,
+    sha}]}.
+    """
+    data = json.loads(content)
+    return {'sha': data['sha'], 'tree': [{
+        'path': item['path'],
+        'type': item['type'],
+        'sha': item['sha'],
+    } for item in data.get('tree', [])]}
+
+
+def cached_tree(ref):
+    """
+    Returns the memoized listing of ref if it is a tree SHA, whose
+    listing never changes, otherwise None.
+    """
+    if SHA_RE.fullmatch(ref) is not None:
+        return get_value_cache().get('tree', ref)
+
+
+def tree_from_response(ref, resp):
+    """
+    Returns the listing of ref in resp, memoizing it if ref is a tree
+    SHA, or None if there is no such tree.
+    """
+    if resp.status_code != 200:
+        return None
+    tree = parse_tree(resp.content)
+    if SHA_RE.fullmatch(ref) is not None:
+        get_value_cache().set('tree', ref, tree)
+    return tree
+
+
+def entry_sha(tree, name, obj_type):
+    """
+    Returns the SHA of the obj_type entry named name in tree, or None.
+    """
+    if tree is not None:
+        return next((item['sha'] for item in tree['tree'] if (
+            item['path'] == name and item['type'] == obj_type)), None)
+
+
+def workflow_files(tree):
+    """
+    Returns (name, blob SHA) for each workflow file in tree, the
+    listing of WORKFLOWS_PATH.
+    """
+    if tree is None:
+        return []
+    return sorted((item['path'], item['sha']) for item in tree['tree'] if (
+        item['type'] == 'blob' and
+        item['path'].endswith(WORKFLOW_EXTENSIONS)))
+
+
+def root_file_names(root):
+    if root is None:
+        return []
+    return [item['path'] for item in root['tree'] if item['type'] == 'blob']
+
+
+def parser_namespace(parse):
+    return f'{parse.__name__} v{PARSERS_VERSION}'
+
+
+def memoized_values(parse, sha):
+    """
+    Returns parse's result for the blob with sha, if memoized.
+    """
+    return get_value_cache().get(parser_namespace(parse), sha)
+
+
+def memoize_values(parse, sha, content):
+    values = parse(content)
+    get_value_cache().set(parser_namespace(parse), sha, values)
+    return values
+
+
+def parse_current_version(content):
+    data = json.loads(content)
+    return data.get('tag_name')
+
+
+def scan_statics(paths, has_js=False, has_css=False):
+    """
+    Returns (has_js, has_css) for paths, stopping as soon as both
+    are found.
+    """
+    for path in paths:
+        if path.endswith(JS_EXTENSIONS):
+            has_js = True
+        elif path.endswith(CSS_EXTENSIONS):
+            has_css = True
+        if has_js and has_css:
+            break
+    return (has_js, has_css)
+
+
+class StaticsScan:
+    """
+    Scan of a tree for statics, from its recursive listing and, if that
+    was truncated, from its subtrees, listed one at a time by the
+    caller until both are found.
+    """
+    def __init__(self, root, listing):
+        self.statics = scan_statics(
+            item.get('path', '') for item in listing.get('tree', []))
+        self._pending = []
+        if listing.get('truncated'):
+            self.add(root)
+
+    def next_tree(self):
+        """
+        Returns the SHA of the next subtree to list, or None once the
+        scan is done.
+        """
+        if self._pending and not all(self.statics):
+            return self._pending.pop()
+
+    def add(self, tree):
+        items = tree.get('tree', [])
+        self.statics = scan_statics(
+            (item.get('path', '') for item in items), *self.statics)
+        self._pending.extend(item['sha'] for item in items if (
+            item.get('type') == 'tree'))
+
+
+def parse_prod_values(content):
+    config = yaml.full_load(content)
+    values = {}
+    ingresses = []
+    if ('ingress' in config and 'enabled' in config['ingress'] and
+            config['ingress']['enabled'] is True):
+        ingresses.append('ingress-nginx')
+    if ('gateway' in config and 'enabled' in config['gateway'] and
+            config['gateway']['enabled'] is True):
+        ingresses.append('kgateway')
+    if len(ingresses):
+        values['Ingress'] = ','.join(ingresses)
+    return values
+
+
+def parse_docker_values(content):
+    content = content.decode('utf-8')
+    values = {}
+    matches = (DJANGO_CONTAINER_VERSION_RE.match(content) or
+               DJANGO_CONTAINER_RE.match(content))
+    if matches:
+        container_version = matches.group(1)
+        values['django-container'] = container_version
+        if 'FROM gcr.io' in content:
+            values['django-container'] += ' (gcr.io)'
+
+        if container_version.startswith('1.'):
+            values['Language'] = 'Python3.8'
+        elif container_version.startswith('2.'):
+            values['Language'] = 'Python3.10'
+        elif container_version.startswith('3.'):
+            values['Language'] = 'Python3.12'
+    return values
 
 
 class GitHub_DAO:
     def __init__(self):
         self._local = local()
+        self._prefetched_files = {}
+        self._prefetched_versions = {}
+        self._prefetched_workflows = {}
+        self._branch_trees = {}
 
     @property
     def client(self):
@@ -41,11 +340,42 @@ class GitHub_DAO:
             self._local.client = client
         return self._local.client
 
+    def _request(self, method, url, **kwargs):
+        """
+        Makes a request paced by the shared rate limiter, retrying
+        connection errors, server errors and rate limit responses.
+        """
+        limiter = get_rate_limiter()
+        for attempt in count():
+            throttled = limiter.acquire()
+            resp = error = None
+            start = time.perf_counter()
+            try:
+                resp = self.client.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as ex:
+                error = ex
+            if not retry_request(url, attempt, time.perf_counter() - start,
+                                 throttled, resp, error):
+                return resp
+
     def get(self, url, headers=None):
         if headers is None:
             headers = {}
 
-        resp = self.client.get(url, headers=headers)
+        cache = get_response_cache()
+        if cache is not None:
+            resp = self._request('get', url, headers={
+                **cache.conditional_headers(url), **headers})
+            if resp.status_code == 304:
+                cached = cache.response(url)
+                if cached is not None:
+                    return cached
+                resp = self._request('get', url, headers=headers)
+            elif resp.status_code == 200:
+                cache.store(url, resp)
+        else:
+            resp = self._request('get', url, headers=headers)
+
         if resp.status_code in getattr(settings, 'GITHUB_OK_STATUS', []):
             return resp
 
@@ -54,158 +384,240 @@ class GitHub_DAO:
             f'Response: {resp.content}'
         )
 
-    def get_current_version(self, url):
-        url = url.replace('{/id}', '/latest')
-        resp = self.get(url)
+    def post(self, url, data):
+        resp = self._request('post', url, json=data)
         if resp.status_code == 200:
-            data = json.loads(resp.content)
-            return data.get('tag_name')
-
-    def get_has_statics(self, url, default_branch):
-        url = url.replace('{/sha}', f'/{default_branch}?recursive=1')
-        resp = self.get(url)
-        has_js = False
-        has_css = False
-
-        if resp.status_code == 200:
-            data = json.loads(resp.content)
-            for item in data.get('tree', []):
-                path = item.get('path', '')
-                if JS_RE.match(path):
-                    has_js = True
-                elif CSS_RE.match(path):
-                    has_css = True
-        return (has_js, has_css)
-
-    def get_package_values(self, url, default_branch):
-        git_file_url = url.replace(
-            'https://github.com', 'https://raw.githubusercontent.com')
-        package_url = f'{git_file_url}/{default_branch}/package.json'
-        values = {}
-
-        resp = self.get(package_url)
-        if resp.status_code == 200:
-            data = json.loads(resp.content)
-
-            for dependencies in [data.get('devDependencies', {}),
-                                 data.get('dependencies', {})]:
-                if dependencies.get('vue'):
-                    values['Vue'] = dependencies.get('vue')
-                if dependencies.get('webpack'):
-                    values['Webpack'] = dependencies.get('webpack')
-                if dependencies.get('bootstrap'):
-                    values['Bootstrap'] = dependencies.get('bootstrap')
-                if dependencies.get('bootstrap-icons'):
-                    values['Bootstrap Icons'] = dependencies['bootstrap-icons']
-                if dependencies.get('vite'):
-                    values['Vite'] = dependencies.get('vite')
-                if dependencies.get('prettier'):
-                    values['Prettier'] = dependencies.get('prettier')
-                if dependencies.get('eslint'):
-                    values['ESLint'] = dependencies.get('eslint')
-                if dependencies.get('stylelint'):
-                    values['Stylelint'] = dependencies.get('stylelint')
-                if dependencies.get('axdd-components'):
-                    try:
-                        _u, version = dependencies['axdd-components'].split('#')
-                        if version:
-                            values['axdd-components'] = version
-                    except ValueError:
-                        pass
-        return values
+            return resp
 
-    def get_prod_values(self, url, default_branch):
-        git_file_url = url.replace(
-            'https://github.com', 'https://raw.githubusercontent.com')
-        prod_values_url = f'{git_file_url}/{default_branch}/docker/prod-values.yml'
-        values = {}
+        raise Exception(  # noqa: TRY002
+            f'GitHub request failed, URL: {url}, Status: {resp.status_code}, '
+            f'Response: {resp.content}'
+        )
 
-        resp = self.get(prod_values_url)
+    def prefetch_files(self, repos, batch_size=None):
+        """
+        Loads PREFETCH_PATHS, the workflow files and the latest release
+        tag for repos with one GraphQL query per batch, so that
+        get_file, get_workflow_files and get_current_version do not need
+        a request per file.
+        """
+        if batch_size is None:
+            batch_size = getattr(settings, 'GITHUB_GRAPHQL_BATCH_SIZE', 25)
+        graphql_url = getattr(
+            settings, 'GITHUB_GRAPHQL_URL', 'https://api.github.com/graphql')
+
+        for i in range(0, len(repos), batch_size):
+            batch = repos[i:i + batch_size]
+            try:
+                resp = self.post(
+                    graphql_url, {'query': graphql_files_query(batch)})
+                data = json.loads(resp.content)
+            except Exception as ex:
+                # Their files are read one at a time instead
+                logger.warning(f'GraphQL prefetch of {len(batch)} repos '
+                               f'failed: {ex}')
+                continue
+            for error in data.get('errors', []):
+                logger.warning(f'GraphQL prefetch: {error.get("message")}')
+
+            for repo, result in zip(batch, parse_graphql_files(data, batch)):
+                if result is not None:
+                    self._prefetched_files[repo['html_url']] = result[0]
+                    self._prefetched_versions[repo['releases_url']] = result[1]
+                    self._prefetched_workflows[repo['html_url']] = result[2]
+
+    def get_file(self, url, default_branch, path):
+        """
+        Returns the content of path on default_branch, or None if the
+        file does not exist.
+        """
+        files = self._prefetched_files.get(url)
+        if files is not None and path in files:
+            return files[path]
+
+        resp = self.get(raw_file_url(url, default_branch, path))
         if resp.status_code == 200:
-            config = yaml.full_load(resp.content)
-            ingresses = []
-            if ('ingress' in config and 'enabled' in config['ingress'] and
-                    config['ingress']['enabled'] is True):
-                ingresses.append('ingress-nginx')
-            if ('gateway' in config and 'enabled' in config['gateway'] and
-                    config['gateway']['enabled'] is True):
-                ingresses.append('kgateway')
-            if len(ingresses):
-                values['Ingress'] = ','.join(ingresses)
-        return values
+            return resp.content
 
-    def get_docker_values(self, url, default_branch):
-        git_file_url = url.replace(
-            'https://github.com', 'https://raw.githubusercontent.com')
-        dockerfile_url = f'{git_file_url}/{default_branch}/Dockerfile'
-        values = {}
+    def get_current_version(self, url):
+        if url in self._prefetched_versions:
+            return self._prefetched_versions[url]
 
-        resp = self.get(dockerfile_url)
+        url = url.replace('{/id}', '/latest')
+        resp = self.get(url)
         if resp.status_code == 200:
-            content = resp.content.decode('utf-8')
-            matches = (DJANGO_CONTAINER_VERSION_RE.match(content) or
-                       DJANGO_CONTAINER_RE.match(content))
-            if matches:
-                container_version = matches.group(1)
-                values['django-container'] = container_version
-                if 'FROM gcr.io' in content:
-                    values['django-container'] += ' (gcr.io)'
-
-                if container_version.startswith('1.'):
-                    values['Language'] = 'Python3.8'
-                elif container_version.startswith('2.'):
-                    values['Language'] = 'Python3.10'
-                elif container_version.startswith('3.'):
-                    values['Language'] = 'Python3.12'
+            return parse_current_version(resp.content)
+
+    def get_tree(self, url, ref):
+        """
+        Returns the non-recursive listing of the tree at ref, a branch
+        or tree SHA, as {'sha': ..., 'tree': [{path, type, sha}]}, or
+        None if there is no such tree.  Listings by SHA never change
+        and are memoized, branch listings are kept for the run.
+        """
+        key = (url, ref)
+        if key in self._branch_trees:
+            return self._branch_trees[key]
+
+        tree = cached_tree(ref)
+        if tree is None:
+            tree = tree_from_response(
+                ref, self.get(url.replace('{/sha}', f'/{ref}')))
+            if SHA_RE.fullmatch(ref) is None:
+                self._branch_trees[key] = tree
+        return tree
+
+    def get_subtree(self, url, tree, path):
+        for name in path.split('/'):
+            sha = entry_sha(tree, name, 'tree')
+            tree = self.get_tree(url, sha) if sha else None
+        return tree
+
+    def get_workflow_files(self, url, trees_url, default_branch):
+        """
+        Returns (name, blob SHA) for each workflow file on default_branch.
+        """
+        if url in self._prefetched_workflows:
+            return self._prefetched_workflows[url]
+
+        return workflow_files(self.get_subtree(
+            trees_url, self.get_tree(trees_url, default_branch),
+            WORKFLOWS_PATH))
 
+    def get_has_statics(self, url, default_branch):
+        root = self.get_tree(url, default_branch)
+        if root is None:
+            return (False, False)
+
+        # The statics of a tree never change, so only scan new tree SHAs
+        cache = get_value_cache()
+        statics = cache.get(STATICS_NAMESPACE, root['sha'])
+        if statics is None:
+            statics = self._scan_tree_statics(url, root)
+            cache.set(STATICS_NAMESPACE, root['sha'], statics)
+        return tuple(statics)
+
+    def _scan_tree_statics(self, url, root):
+        resp = self.get(url.replace('{/sha}', f'/{root["sha"]}?recursive=1'))
+        scan = StaticsScan(root, json.loads(resp.content))
+        while (sha := scan.next_tree()) is not None:
+            scan.add(json.loads(
+                self.get(url.replace('{/sha}', f'/{sha}')).content))
+        return scan.statics
+
+    def get_blob_sha(self, trees_url, default_branch, path):
+        """
+        Returns the blob SHA of path on default_branch, or None if there
+        is no such file.
+        """
+        dir_path, _, name = path.rpartition('/')
+        tree = self.get_tree(trees_url, default_branch)
+        if dir_path:
+            tree = self.get_subtree(trees_url, tree, dir_path)
+        return entry_sha(tree, name, 'blob')
+
+    def get_file_values(self, url, default_branch, path, parse,
+                        trees_url=None):
+        """
+        Returns parse(content) of path on default_branch, or None if the
+        file does not exist.  With trees_url, results are memoized by
+        blob SHA, so a file identical to one already parsed, in any
+        repo, is neither downloaded nor parsed again.
+        """
+        files = self._prefetched_files.get(url)
+        if trees_url is None or (files is not None and path in files):
+            content = self.get_file(url, default_branch, path)
+            return parse(content) if content is not None else None
+
+        sha = self.get_blob_sha(trees_url, default_branch, path)
+        if sha is None:
+            return None
+
+        values = memoized_values(parse, sha)
+        if values is None:
+            content = self.get_file(url, default_branch, path)
+            if content is None:
+                return None
+            values = memoize_values(parse, sha, content)
         return values
 
-    def get_setup_values(self, url, default_branch):
-        git_file_url = url.replace(
-            'https://github.com', 'https://raw.githubusercontent.com')
-        setup_url = f'{git_file_url}/{default_branch}/setup.py'
-        values = {}
-
-        resp = self.get(setup_url)
+    def get_dependency_values(self, url, default_branch, ecosystem,
+                              trees_url=None):
+        """
+        Returns the sheet values of the ecosystem's dependencies, read
+        from every manifest in the root of default_branch.
+        """
+        names = DEFAULT_MANIFEST_NAMES
+        if trees_url is not None:
+            names = root_file_names(self.get_tree(trees_url, default_branch))
+
+        parsed = []
+        for name, parse, pins in ecosystem.manifest_files(names):
+            dependencies = self.get_file_values(
+                url, default_branch, name, parse, trees_url)
+            if dependencies is not None:
+                parsed.append((dependencies, pins))
+        return ecosystem.values(parsed)
+
+    def get_package_values(self, url, default_branch, trees_url=None):
+        return self.get_dependency_values(
+            url, default_branch, NPM, trees_url)
+
+    def get_prod_values(self, url, default_branch, trees_url=None):
+        return self.get_file_values(
+            url, default_branch, 'docker/prod-values.yml', parse_prod_values,
+            trees_url) or {}
+
+    def get_docker_values(self, url, default_branch, trees_url=None):
+        return self.get_file_values(
+            url, default_branch, 'Dockerfile', parse_docker_values,
+            trees_url) or {}
+
+    def get_setup_values(self, url, default_branch, trees_url=None):
+        return self.get_dependency_values(
+            url, default_branch, PYTHON, trees_url)
+
+    def get_repository(self, full_name):
+        """
+        Returns the repo named owner/name, or None if it does not exist.
+        """
+        api_url = getattr(settings, 'GITHUB_API_URL', 'https://api.github.com')
+        resp = self.get(f'{api_url}/repos/{full_name}')
         if resp.status_code == 200:
-            content = resp.content.decode('utf-8')
-            values['Django'] = 'N/A'
-
-            results = DJANGO_RE.findall(content)
-            if len(results):
-                values['Django'] = results[0] if (
-                    len(results[0])) else 'Latest'
-
-            results = COMPRESSOR_RE.findall(content)
-            if len(results):
-                values['django-compressor'] = results[0] if (
-                    len(results[0])) else 'Latest'
-
-        elif resp.status_code == 404:
-            pyproject_url = f'{git_file_url}/{default_branch}/pyproject.toml'
-            resp = self.get(pyproject_url)
-            if resp.status_code == 200:
-                values['Django'] = 'N/A'
-
-                config = toml.loads(resp.content.decode('utf-8'))
-                python_version = config.get('Python', config.get('python'))
-                if python_version:
-                    values['Language'] = f'Python{python_version}'
-                values['Django'] = config.get(
-                    'Django', config.get('django', 'N/A'))
-                values['django-compressor'] = config.get('django-compressor')
-        return values
-
-    def get_repositories_for_org(self, org):
-        url = f'https://api.github.com/orgs/{org}/repos?per_page=100'
+            return json.loads(resp.content)
+
+    def get_org_events(self, org):
+        """
+        Returns (events, poll interval) for the org's latest public
+        events, newest first.
+        """
+        api_url = getattr(settings, 'GITHUB_API_URL', 'https://api.github.com')
+        resp = self.get(f'{api_url}/orgs/{org}/events?per_page=100')
+        events = json.loads(resp.content) if resp.status_code == 200 else []
+        return (events, int(resp.headers.get('X-Poll-Interval', 60)))
+
+    def get_repositories_for_org(self, org, repo_type='all', since=None):
+        """
+        Yields the org's unarchived repos of repo_type, most recently
+        pushed first, as each page arrives.  With since, an ISO 8601
+        timestamp, paging stops at the first repo pushed before it.
+        """
+        api_url = getattr(settings, 'GITHUB_API_URL', 'https://api.github.com')
+        url = f'{api_url}/orgs/{org}/repos?' + urlencode({
+            'type': repo_type,
+            'sort': 'pushed',
+            'direction': 'desc',
+            'per_page': 100,
+        })
+
+        while url is not None:
+            resp = self.get(url)
+            for repo in json.loads(resp.content):
+                if since is not None and (repo.get('pushed_at') or '') < since:
+                    return
+                # The REST API has no archived filter
+                if not repo.get('archived'):
+                    yield repo
 
-        resp = self.get(url)
-        repos = json.loads(resp.content)
-        next_link = resp.links.get('next')
-
-        while next_link is not None:
-            resp = self.get(next_link['url'])
-            repos.extend(json.loads(resp.content))
             next_link = resp.links.get('next')
-
-        return sorted(repos, key=lambda item: item['pushed_at'], reverse=True)
+            url = next_link['url'] if next_link is not None else None
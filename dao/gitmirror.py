@@ -0,0 +1,241 @@
+# Copyright 2026 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+import base64
+import json
+import logging
+import os
+import subprocess
+from threading import Lock
+
+import github_inventory_settings as settings
+
+from dao.github import (
+    PREFETCH_PATHS, WORKFLOW_EXTENSIONS, WORKFLOWS_PATH, GitHub_DAO,
+    scan_statics)
+from dao.metrics import get_metrics
+from dependencies import is_manifest
+
+logger = logging.getLogger(__name__)
+
+# Offline equivalents of the org repos type filter
+REPO_TYPES = {
+    'all': lambda repo: True,
+    'member': lambda repo: True,
+    'public': lambda repo: not repo.get('private'),
+    'private': lambda repo: bool(repo.get('private')),
+    'forks': lambda repo: bool(repo.get('fork')),
+    'sources': lambda repo: not repo.get('fork'),
+}
+
+
+def is_mirrored_file(path):
+    """
+    The files read from each clone along with its listing.
+    """
+    if path in PREFETCH_PATHS or is_manifest(path):
+        return True
+    dir_path, _, name = path.rpartition('/')
+    return dir_path == WORKFLOWS_PATH and name.endswith(WORKFLOW_EXTENSIONS)
+
+
+def parse_ls_tree(output):
+    """
+    Returns [(type, sha, path)] from git ls-tree -z output.
+    """
+    entries = []
+    for line in output.split(b'\0'):
+        if line:
+            info, _, path = line.partition(b'\t')
+            _mode, obj_type, sha = info.decode('ascii').split()
+            entries.append((obj_type, sha, path.decode('utf-8')))
+    return entries
+
+
+def parse_cat_file_batch(output):
+    """
+    Returns [(sha, content or None)] from git cat-file --batch output,
+    in request order.
+    """
+    objects = []
+    pos = 0
+    while pos < len(output):
+        end = output.index(b'\n', pos)
+        header = output[pos:end].decode('utf-8').split()
+        pos = end + 1
+        if header[-1] == 'missing':
+            objects.append((header[0], None))
+            continue
+        size = int(header[2])
+        objects.append((header[0], output[pos:pos + size]))
+        pos += size + 1
+    return objects
+
+
+class GitMirror:
+    """
+    Bare, shallow clones of the default branch of each repo, kept under
+    path as owner/name.git, with the org listings they were synced from.
+    """
+    def __init__(self, path):
+        self.path = path
+
+    def repo_path(self, repo):
+        return os.path.join(self.path, f'{repo["full_name"]}.git')
+
+    def listing_path(self, org):
+        return os.path.join(self.path, f'{org}.json')
+
+    def git(self, *args, git_dir=None, input=None):
+        env = dict(os.environ)
+        access_token = getattr(settings, 'GITHUB_TOKEN', '')
+        if access_token:
+            # In the environment rather than argv, so it is not in ps
+            credentials = base64.b64encode(
+                f'x-access-token:{access_token}'.encode('utf-8'))
+            env.update({
+                'GIT_CONFIG_COUNT': '1',
+                'GIT_CONFIG_KEY_0': 'http.extraHeader',
+                'GIT_CONFIG_VALUE_0':
+                    f'Authorization: Basic {credentials.decode("ascii")}',
+            })
+        command = ['git'] + (
+            ['--git-dir', git_dir] if git_dir else []) + list(args)
+        return subprocess.run(  # noqa: S603
+            command, input=input, env=env, capture_output=True,
+            check=True).stdout
+
+    def sync(self, repo):
+        """
+        Clones repo, or fetches its default branch, at depth 1.
+        """
+        git_dir = self.repo_path(repo)
+        branch = repo['default_branch']
+        if os.path.exists(git_dir):
+            self.git('fetch', '--depth', '1', 'origin',
+                     f'+refs/heads/{branch}:refs/heads/{branch}',
+                     git_dir=git_dir)
+        else:
+            self.git('clone', '--bare', '--depth', '1', '--single-branch',
+                     '--branch', branch, repo['clone_url'], git_dir)
+
+    def read(self, repo):
+        """
+        Returns (root tree SHA, ls-tree entries, {path: content}) for the
+        default branch, reading every mirrored file with one git
+        cat-file --batch.  A repo with no clone or branch is empty.
+        """
+        git_dir = self.repo_path(repo)
+        ref = f'refs/heads/{repo["default_branch"]}'
+        try:
+            entries = parse_ls_tree(self.git(
+                'ls-tree', '-r', '-t', '-z', '--full-tree', ref,
+                git_dir=git_dir))
+        except (subprocess.CalledProcessError, FileNotFoundError) as ex:
+            logger.warning(f'No mirror of {repo["html_url"]}: {ex}')
+            return (None, [], {})
+
+        # Identical files share a blob, which is read once for all paths
+        paths = {}
+        for obj_type, sha, path in entries:
+            if obj_type == 'blob' and is_mirrored_file(path):
+                paths.setdefault(sha, []).append(path)
+        objects = parse_cat_file_batch(self.git(
+            'cat-file', '--batch', git_dir=git_dir, input=''.join(
+                f'{name}\n' for name in [f'{ref}^{{tree}}', *paths]).encode(
+                    'utf-8')))
+
+        root_sha = objects[0][0]
+        files = {path: content for sha, content in objects[1:]
+                 for path in paths[sha]}
+        return (root_sha, entries, files)
+
+    def save_listing(self, org, repos):
+        os.makedirs(self.path, exist_ok=True)
+        path = self.listing_path(org)
+        with open(f'{path}.tmp', 'w') as f:
+            json.dump(repos, f)
+        os.replace(f'{path}.tmp', path)
+
+    def load_listing(self, org):
+        with open(self.listing_path(org)) as f:
+            return json.load(f)
+
+
+class GitMirror_DAO(GitHub_DAO):
+    """
+    GitHub_DAO reading repos, trees, files and release tags from a
+    GitMirror instead of GitHub, so that collection makes no GitHub
+    requests.  Repos are looked up by the URLs in the mirror's listings.
+    """
+    def __init__(self, mirror):
+        super().__init__()
+        self.mirror = mirror
+        self._repos = {}
+        self._trees = {}
+        self._read_lock = Lock()
+
+    def get_repositories_for_org(self, org, repo_type='all', since=None):
+        for repo in self.mirror.load_listing(org):
+            if since is not None and (repo.get('pushed_at') or '') < since:
+                return
+            if REPO_TYPES[repo_type](repo):
+                for key in ['html_url', 'trees_url', 'releases_url']:
+                    self._repos[repo[key]] = repo
+                yield repo
+
+    def prefetch_files(self, repos, batch_size=None):
+        pass
+
+    def _read(self, url):
+        """
+        The mirrored trees and files of the repo with url, read once.
+        """
+        repo = self._repos[url]
+        with self._read_lock:
+            if repo['html_url'] in self._trees:
+                return self._trees[repo['html_url']]
+
+        with get_metrics().span('mirror read'):
+            root_sha, entries, files = self.mirror.read(repo)
+
+        dirs = {path: sha for obj_type, sha, path in entries if (
+            obj_type == 'tree')}
+        if root_sha is not None:
+            dirs[''] = root_sha
+        # Identical directories share a tree, listed from the first one
+        tree_paths = {}
+        for dir_path, tree_sha in dirs.items():
+            tree_paths.setdefault(tree_sha, dir_path)
+        trees = {sha: {'sha': sha, 'tree': []} for sha in tree_paths}
+        for obj_type, sha, path in entries:
+            dir_path, _, name = path.rpartition('/')
+            if tree_paths[dirs[dir_path]] == dir_path:
+                trees[dirs[dir_path]]['tree'].append(
+                    {'path': name, 'type': obj_type, 'sha': sha})
+
+        data = {
+            'root': trees.get(root_sha),
+            'trees': trees,
+            'paths': [path for obj_type, sha, path in entries if (
+                obj_type == 'blob')],
+            'files': files,
+        }
+        with self._read_lock:
+            self._trees[repo['html_url']] = data
+        return data
+
+    def get_tree(self, url, ref):
+        data = self._read(url)
+        if ref == self._repos[url]['default_branch']:
+            return data['root']
+        return data['trees'].get(ref)
+
+    def get_has_statics(self, url, default_branch):
+        return scan_statics(self._read(url)['paths'])
+
+    def get_file(self, url, default_branch, path):
+        return self._read(url)['files'].get(path)
+
+    def get_current_version(self, url):
+        return self._repos[url].get('latest_release')
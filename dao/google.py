@@ -1,13 +1,132 @@
 # Copyright 2026 UW-IT, University of Washington
 # SPDX-License-Identifier: Apache-2.0
 
+import logging
+from datetime import date
 from threading import local
 
 import github_inventory_settings as settings
 import gspread
+from gspread.urls import (
+    SPREADSHEET_VALUES_BATCH_UPDATE_URL, SPREADSHEET_VALUES_BATCH_URL)
+from gspread.utils import absolute_range_name, rowcol_to_a1
 
+from dao.metrics import get_metrics
 from utils import stringify
 
+logger = logging.getLogger(__name__)
+
+# Sheet rows are matched to repos by this column
+KEY_COLUMN = 'URL'
+
+
+def value_matrix(rows, col_names):
+    """
+    The cell values of rows, records of one Row class, in the order of
+    the sheet's col_names.  Columns the rows do not have are blank.
+    """
+    if not rows:
+        return []
+    row_columns = type(rows[0]).COLUMNS
+    indexes = [row_columns.index(name) if name in row_columns else None
+               for name in col_names]
+
+    matrix = []
+    for row in rows:
+        values = row.values()
+        matrix.append([stringify(values[i]) if i is not None else ''
+                       for i in indexes])
+    return matrix
+
+
+def upsert_values(sheet_values, col_names, rows, removed_column=None,
+                  removed_value='', skipped=(), removed=None):
+    """
+    Returns (new values, appended, removed): the data rows of a sheet
+    after upserting rows by their URL.  A row replaces the values of
+    its columns in the sheet row with the same URL, or is appended
+    after the last row, and the sheet's other columns are left as they
+    are.  Sheet rows no row matched, other than those with a URL in
+    skipped, or only those with a URL in removed if it is given, are
+    counted as removed and, if the sheet has removed_column, marked
+    there with removed_value, which a row matching them again clears.
+    """
+    if KEY_COLUMN not in col_names:
+        raise Exception(  # noqa: TRY002
+            f'Sheet has no {KEY_COLUMN} column: {col_names}')
+    key = col_names.index(KEY_COLUMN)
+    width = len(col_names)
+    removed_col = col_names.index(removed_column) if (
+        removed_column in col_names) else None
+
+    new_values = [list(row[:width]) + [''] * (width - len(row))
+                  for row in sheet_values]
+    index = {}
+    for i, row in enumerate(new_values):
+        if row[key] != '':
+            index.setdefault(row[key], i)
+
+    row_columns = type(rows[0]).COLUMNS if rows else ()
+    cols = [col for col, name in enumerate(col_names) if name in row_columns]
+    matched = set()
+    appended = 0
+    for values in value_matrix(rows, col_names):
+        i = index.get(values[key])
+        if i is None:
+            i = index[values[key]] = len(new_values)
+            new_values.append([''] * width)
+            appended += 1
+        matched.add(i)
+        for col in cols:
+            new_values[i][col] = values[col]
+        if removed_col is not None:
+            new_values[i][removed_col] = ''
+
+    unlisted = 0
+    for url, i in index.items():
+        if i not in matched and url not in skipped and (
+                removed is None or url in removed):
+            unlisted += 1
+            if removed_col is not None and new_values[i][removed_col] == '':
+                new_values[i][removed_col] = removed_value
+    return (new_values, appended, unlisted)
+
+
+def changed_blocks(sheet_values, new_values):
+    """
+    Compares the current and new data rows and returns the changed
+    cells as (row, col, values) blocks, 0-based and rectangular.  Runs
+    of changed cells in a row are merged with the same run in the
+    rows above.
+    """
+    blocks = []
+    open_blocks = {}
+    for row, new_row in enumerate(new_values):
+        old_row = sheet_values[row] if row < len(sheet_values) else []
+        runs = []
+        start = None
+        for col, value in enumerate(new_row):
+            old_value = old_row[col] if col < len(old_row) else ''
+            if old_value != value:
+                if start is None:
+                    start = col
+            elif start is not None:
+                runs.append((start, col))
+                start = None
+        if start is not None:
+            runs.append((start, len(new_row)))
+
+        next_blocks = {}
+        for start, end in runs:
+            block = open_blocks.get((start, end))
+            if block is None:
+                block = (row, start, [])
+                blocks.append(block)
+            block[2].append(new_row[start:end])
+            next_blocks[(start, end)] = block
+        open_blocks = next_blocks
+    return blocks
+
 
 class GoogleSheet_DAO:
     def __init__(self):
@@ -24,22 +143,68 @@ class GoogleSheet_DAO:
     #    ws = self.client.open_by_key(sheet_id).worksheet(ws_name)
     #    return ws.get_all_values()
 
-    def update_sheet(self, sheet_id, ws_name, repo_list):
-        ws = self.client.open_by_key(sheet_id).worksheet(ws_name)
-        sheet_values = ws.get_all_values()
-        col_names = sheet_values.pop(0)
+    def update_sheet(self, sheet_id, ws_name, rows, mark_removed=True,
+                     skipped=(), removed=None):
+        self.update_sheets(
+            sheet_id, {ws_name: rows}, mark_removed, skipped, removed)
+
+    def update_sheets(self, sheet_id, worksheets, mark_removed=True,
+                      skipped=(), removed=None):
+        """
+        Upserts several worksheets, given as {ws_name: rows} where rows
+        are Row records, with one read of all of them and one write of
+        every changed range.  With mark_removed, rows and skipped, the
+        URLs of repos that failed to collect, are every listed repo, and
+        sheet rows for any other repo are marked removed.  Given
+        removed, only the rows for those URLs are.
+        """
+        metrics = get_metrics()
+        http_client = self.client.http_client
+        with metrics.request(SPREADSHEET_VALUES_BATCH_URL % sheet_id):
+            resp = http_client.values_batch_get(
+                sheet_id, [absolute_range_name(name) for name in worksheets],
+                params={'valueRenderOption': 'UNFORMATTED_VALUE'})
+
+        data = []
+        with metrics.span('sheet diff'):
+            for ws_name, value_range in zip(worksheets, resp['valueRanges']):
+                data.extend(self._changed_ranges(
+                    ws_name, value_range.get('values', []),
+                    worksheets[ws_name], mark_removed, skipped, removed))
+
+        if data:
+            with metrics.request(
+                    SPREADSHEET_VALUES_BATCH_UPDATE_URL % sheet_id):
+                http_client.values_batch_update(
+                    sheet_id, {'valueInputOption': 'RAW', 'data': data})
+
+    def _changed_ranges(self, ws_name, sheet_values, rows, mark_removed,
+                        skipped, removed):
+        col_names = sheet_values.pop(0) if sheet_values else []
         data_start_row = 2
 
-        max_row = max(len(sheet_values), len(repo_list))
-        cell_list = ws.range(
-            data_start_row, 1, max_row + (data_start_row - 1), len(col_names))
+        removed_column = getattr(settings, 'REMOVED_COLUMN', 'Removed')
+        new_values, appended, removed = upsert_values(
+            sheet_values, col_names, rows,
+            removed_column if mark_removed else None,
+            date.today().isoformat(), skipped, removed)
+        if removed and (not mark_removed or removed_column not in col_names):
+            logger.info(f'{ws_name}: {removed} rows are no longer listed')
 
-        for cell in cell_list:
-            try:
-                row_data = repo_list[cell.row - data_start_row]
-                value = row_data.get(col_names[cell.col - 1], '')
-            except IndexError:
-                value = ''
-            cell.value = stringify(value)
+        data = []
+        written = 0
+        for row, col, values in changed_blocks(sheet_values, new_values):
+            data.append({
+                'range': absolute_range_name(ws_name, '{}:{}'.format(
+                    rowcol_to_a1(row + data_start_row, col + 1),
+                    rowcol_to_a1(row + data_start_row + len(values) - 1,
+                                 col + len(values[0])))),
+                'values': values,
+            })
+            written += len(values) * len(values[0])
 
-        ws.update_cells(cell_list, value_input_option='RAW')
+        logger.info(f'{ws_name}: wrote {written} cells in {len(data)} ranges '
+                    f'({appended} rows appended, {removed} not listed), '
+                    f'skipped {len(new_values) * len(col_names) - written} '
+                    'unchanged')
+        return data
@@ -0,0 +1,170 @@
+# Copyright 2026 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+import logging
+import sqlite3
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+# Column of the deltas marking a repo's row removed from, or back in, a
+# worksheet
+REMOVED = ''
+
+
+class HistoryStore:
+    """
+    The rows written by every run, stored as the cells that changed
+    since the run before, so that any run's rows, the changes between
+    two runs and the history of a column can be read back.
+    """
+    def __init__(self, path):
+        self._db = sqlite3.connect(path)
+        self._db.executescript(
+            'CREATE TABLE IF NOT EXISTS runs ('
+            'run INTEGER PRIMARY KEY, started TEXT);'
+            'CREATE TABLE IF NOT EXISTS cells ('
+            'sheet TEXT, url TEXT, col TEXT, run INTEGER, value TEXT, '
+            'PRIMARY KEY (sheet, url, col, run)) WITHOUT ROWID;'
+            'CREATE INDEX IF NOT EXISTS cells_run ON cells (run);'
+            'CREATE INDEX IF NOT EXISTS cells_col ON cells (col, url, run);')
+
+    def runs(self):
+        return self._db.execute(
+            'SELECT run, started FROM runs ORDER BY run').fetchall()
+
+    def latest_run(self):
+        return self._db.execute('SELECT MAX(run) FROM runs').fetchone()[0]
+
+    def _state(self, run, changed_between=None):
+        """
+        Returns ({(sheet, url): {column: JSON value}}, {removed (sheet,
+        url)}) as of run.  With changed_between, (from run, to run), only
+        for the repos changed by the runs after from run up to to run.
+        """
+        query = ('SELECT sheet, url, col, value, MAX(run) FROM cells '
+                 'WHERE run <= ?')
+        params = [run]
+        if changed_between is not None:
+            query += (' AND (sheet, url) IN (SELECT sheet, url FROM cells '
+                      'WHERE run > ? AND run <= ?)')
+            params.extend(changed_between)
+
+        cells = {}
+        removed = set()
+        for sheet, url, col, value, _run in self._db.execute(
+                query + ' GROUP BY sheet, url, col', params):
+            if col == REMOVED:
+                if json.loads(value):
+                    removed.add((sheet, url))
+            else:
+                cells.setdefault((sheet, url), {})[col] = value
+        return (cells, removed)
+
+    def rows(self, run=None):
+        """
+        Returns {(sheet, url): {column: value}} for the rows written by
+        run, by default the latest.
+        """
+        cells, removed = self._state(run or self.latest_run() or 0)
+        return {key: {col: json.loads(value) for col, value in row.items()}
+                for key, row in cells.items() if key not in removed}
+
+    def record(self, worksheets, mark_removed=True, skipped=()):
+        """
+        Stores a run writing worksheets, {sheet: rows} of Row records,
+        and returns its number.  With mark_removed, repos not in rows,
+        other than those with a URL in skipped, are recorded as removed.
+        """
+        cells, removed = self._state(self.latest_run() or 0)
+        started = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        with self._db:
+            run = self._db.execute(
+                'INSERT INTO runs (started) VALUES (?)', (started,)).lastrowid
+
+            deltas = []
+            listed = set()
+            for sheet, rows in worksheets.items():
+                for row in rows:
+                    key = (sheet, row.url)
+                    listed.add(key)
+                    old = cells.get(key, {})
+                    if key in removed:
+                        deltas.append((*key, REMOVED, run, 'false'))
+                    for col, value in row.as_dict().items():
+                        value = json.dumps(value)
+                        if old.get(col) != value:
+                            deltas.append((*key, col, run, value))
+
+            if mark_removed:
+                for key in cells.keys() - listed - removed:
+                    if key[1] not in skipped:
+                        deltas.append((*key, REMOVED, run, 'true'))
+
+            self._db.executemany(
+                'INSERT INTO cells VALUES (?, ?, ?, ?, ?)', deltas)
+
+        logger.info(f'Recorded run {run} with {len(deltas)} changed cells')
+        return run
+
+    def diff(self, from_run, to_run):
+        """
+        Returns the changes from from_run to to_run, reading only the
+        repos that runs between them changed, as {'added': [(sheet,
+        url)], 'removed': [(sheet, url)], 'changed': [(sheet, url,
+        column, old, new)]}.
+        """
+        runs = (from_run, to_run)
+        old_cells, old_removed = self._state(from_run, changed_between=runs)
+        new_cells, new_removed = self._state(to_run, changed_between=runs)
+        old_keys = old_cells.keys() - old_removed
+        new_keys = new_cells.keys() - new_removed
+
+        changed = []
+        for key in sorted(old_keys & new_keys):
+            old, new = old_cells[key], new_cells[key]
+            for col in sorted(old.keys() | new.keys()):
+                if old.get(col) != new.get(col):
+                    changed.append((*key, col, json.loads(
+                        old.get(col, 'null')), json.loads(
+                            new.get(col, 'null'))))
+        return {
+            'added': sorted(new_keys - old_keys),
+            'removed': sorted(old_keys - new_keys),
+            'changed': changed,
+        }
+
+    def column_history(self, column, url=None, sheet=None):
+        """
+        Returns (run, started, sheet, url, value) for each run that
+        changed column, optionally only for the repo with url or in
+        one worksheet, oldest first for each repo.
+        """
+        query = ('SELECT cells.run, started, sheet, url, value FROM cells '
+                 'JOIN runs ON runs.run = cells.run WHERE col = ?')
+        params = [column]
+        if url is not None:
+            query += ' AND url = ?'
+            params.append(url)
+        if sheet is not None:
+            query += ' AND sheet = ?'
+            params.append(sheet)
+
+        return [(run, started, sheet, url, json.loads(value))
+                for run, started, sheet, url, value in self._db.execute(
+                    query + ' ORDER BY sheet, url, cells.run', params)]
+
+    def close(self):
+        self._db.close()
+
+
+def format_diff(diff):
+    lines = []
+    for sheet, url in diff['added']:
+        lines.append(f'{sheet}: added {url}')
+    for sheet, url in diff['removed']:
+        lines.append(f'{sheet}: removed {url}')
+    for sheet, url, column, old, new in diff['changed']:
+        lines.append(f'{sheet}: {url} {column}: {old!r} -> {new!r}')
+    return lines
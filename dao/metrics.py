@@ -0,0 +1,264 @@
+# Copyright 2026 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+import logging
+import re
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from threading import Lock
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+# First match names the endpoint class of a request URL
+ENDPOINT_CLASSES = [
+    ('git/trees recursive', re.compile(r'/git/trees/[^/]+\?recursive=1')),
+    ('git/trees', re.compile(r'/git/trees/')),
+    ('releases/latest', re.compile(r'/releases/latest')),
+    ('orgs/repos', re.compile(r'/orgs/[^/]+/repos')),
+    ('orgs/events', re.compile(r'/orgs/[^/]+/events')),
+    ('repos', re.compile(r'/repos/[^/]+/[^/?]+$')),
+    ('graphql', re.compile(r'/graphql')),
+    ('coveralls build', re.compile(r'/builds/[^/]+\.json')),
+    ('coveralls repo', re.compile(r'\.json\?branch=')),
+    ('workflow file', re.compile(r'/\.github/workflows/[^/]+$')),
+    ('file {}', re.compile(
+        r'/(setup\.py|pyproject\.toml|requirements[\w.-]*\.txt|'
+        r'Dockerfile|prod-values\.yml|package\.json|package-lock\.json)$')),
+    ('sheets {}', re.compile(r'/spreadsheets/[^/]+/values:(\w+)')),
+]
+
+SLOWEST_REPOS = 10
+METRIC_PREFIX = 'github_inventory'
+
+
+def endpoint_class(url):
+    for name, pattern in ENDPOINT_CLASSES:
+        match = pattern.search(url)
+        if match:
+            return name.format(*match.groups())
+    return 'other'
+
+
+def percentile(values, fraction):
+    """
+    Nearest-rank percentile of values, which must be sorted.
+    """
+    if not values:
+        return 0
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+class RunMetrics:
+    """
+    Latencies of every request and of the stages of the run, shared by
+    all threads, summarized by report() when the run is done.
+    """
+    def __init__(self):
+        self.started = time.time()
+        self._requests = defaultdict(list)
+        self._request_totals = defaultdict(lambda: defaultdict(int))
+        self._statuses = defaultdict(lambda: defaultdict(int))
+        self._stages = defaultdict(list)
+        self._repos = []
+        self._lock = Lock()
+
+    def record_request(self, url, status, size, seconds, cache_hit=False,
+                       retried=False, throttled=0):
+        """
+        Records one attempt at a request, which took seconds once sent,
+        after waiting throttled seconds for the rate limiter.  With
+        retried, the attempt failed and was retried.
+        """
+        key = (urlsplit(url).netloc, endpoint_class(url))
+        with self._lock:
+            self._requests[key].append(seconds)
+            self._statuses[key][str(status)] += 1
+            totals = self._request_totals[key]
+            totals['bytes'] += size
+            totals['cache_hits'] += int(cache_hit)
+            totals['retries'] += int(retried)
+            totals['throttled_seconds'] += throttled
+
+    @contextmanager
+    def request(self, url):
+        """
+        Records a request made by a client that only reports failure,
+        such as gspread, as a 200 unless it raises.
+        """
+        start = time.perf_counter()
+        status = 200
+        try:
+            yield
+        except Exception as ex:
+            status = getattr(getattr(ex, 'response', None), 'status_code', 0)
+            raise
+        finally:
+            self.record_request(url, status, 0, time.perf_counter() - start)
+
+    @contextmanager
+    def span(self, stage, repo=None):
+        """
+        Records the time spent in stage, and with repo, the time spent
+        collecting that repo.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            with self._lock:
+                self._stages[stage].append(seconds)
+                if repo is not None:
+                    self._repos.append((seconds, repo))
+
+    def report(self, rate_limit=None):
+        with self._lock:
+            requests = {key: sorted(values)
+                        for key, values in self._requests.items()}
+            totals = {key: dict(values)
+                      for key, values in self._request_totals.items()}
+            statuses = {key: dict(values)
+                        for key, values in self._statuses.items()}
+            stages = {stage: sorted(values)
+                      for stage, values in self._stages.items()}
+            repos = sorted(self._repos, reverse=True)[:SLOWEST_REPOS]
+
+        return {
+            'duration': time.time() - self.started,
+            'total_requests': sum(len(values) for values in requests.values()),
+            'requests': [{
+                'host': host,
+                'endpoint': endpoint,
+                'count': len(values),
+                'p50': percentile(values, 0.5),
+                'p95': percentile(values, 0.95),
+                'seconds': sum(values),
+                'statuses': statuses[(host, endpoint)],
+                **totals[(host, endpoint)],
+            } for (host, endpoint), values in sorted(requests.items())],
+            'stages': [{
+                'stage': stage,
+                'count': len(values),
+                'p50': percentile(values, 0.5),
+                'p95': percentile(values, 0.95),
+                'seconds': sum(values),
+            } for stage, values in sorted(stages.items())],
+            'slowest_repos': [{'repo': repo, 'seconds': seconds}
+                              for seconds, repo in repos],
+            'rate_limit': rate_limit or {},
+        }
+
+    def write_report(self, path, rate_limit=None):
+        """
+        Writes report() to path, as a Prometheus textfile if path ends
+        in .prom, otherwise as JSON.
+        """
+        report = self.report(rate_limit)
+        with open(path, 'w') as f:
+            if path.endswith('.prom'):
+                f.write(prometheus_text(report))
+            else:
+                json.dump(report, f, indent=2)
+
+    def log_summary(self):
+        report = self.report()
+        logger.info(f'{report["total_requests"]} requests in '
+                    f'{report["duration"]:.1f}s')
+        for entry in report['requests']:
+            logger.info(
+                f'{entry["host"]} {entry["endpoint"]}: {entry["count"]} '
+                f'requests, p50 {entry["p50"]:.3f}s, p95 {entry["p95"]:.3f}s')
+        for entry in report['slowest_repos']:
+            logger.info(f'Slow repo {entry["repo"]}: {entry["seconds"]:.1f}s')
+
+
+def prometheus_labels(**labels):
+    if not labels:
+        return ''
+    return '{{{}}}'.format(','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace(
+            '"', '\\"')) for name, value in labels.items()))
+
+
+def prometheus_text(report):
+    lines = []
+
+    def _metric(name, kind, help_text, samples):
+        name = f'{METRIC_PREFIX}_{name}'
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for suffix, labels, value in samples:
+            lines.append(
+                f'{name}{suffix}{prometheus_labels(**labels)} {value}')
+
+    def _summary(entries, label):
+        samples = []
+        for entry in entries:
+            labels = {name: entry[name] for name in label}
+            samples.extend([
+                ('', {**labels, 'quantile': '0.5'}, entry['p50']),
+                ('', {**labels, 'quantile': '0.95'}, entry['p95']),
+                ('_sum', labels, entry['seconds']),
+                ('_count', labels, entry['count']),
+            ])
+        return samples
+
+    _metric('duration_seconds', 'gauge', 'Duration of the run.',
+            [('', {}, report['duration'])])
+    _metric('request_seconds', 'summary', 'Request latency by endpoint.',
+            _summary(report['requests'], ['host', 'endpoint']))
+    _metric('requests', 'counter', 'Requests by endpoint and status.',
+            [('_total', {'host': entry['host'], 'endpoint': entry['endpoint'],
+                         'status': status}, count)
+             for entry in report['requests']
+             for status, count in entry['statuses'].items()])
+    _metric('request_bytes', 'counter', 'Response bytes by endpoint.',
+            [('_total', {'host': entry['host'], 'endpoint': entry['endpoint']},
+              entry.get('bytes', 0)) for entry in report['requests']])
+    _metric('request_retries', 'counter', 'Retries by endpoint.',
+            [('_total', {'host': entry['host'], 'endpoint': entry['endpoint']},
+              entry.get('retries', 0)) for entry in report['requests']])
+    _metric('request_throttled_seconds', 'counter',
+            'Time requests waited for the rate limiter by endpoint.',
+            [('_total', {'host': entry['host'], 'endpoint': entry['endpoint']},
+              entry.get('throttled_seconds', 0))
+             for entry in report['requests']])
+    _metric('request_cache_hits', 'counter', 'Cache hits by endpoint.',
+            [('_total', {'host': entry['host'], 'endpoint': entry['endpoint']},
+              entry.get('cache_hits', 0)) for entry in report['requests']])
+    _metric('stage_seconds', 'summary', 'Time spent in each stage.',
+            _summary(report['stages'], ['stage']))
+    _metric('slowest_repo_seconds', 'gauge', 'Slowest repos to collect.',
+            [('', {'repo': entry['repo']}, entry['seconds'])
+             for entry in report['slowest_repos']])
+    _metric('rate_limit', 'gauge', 'GitHub rate limit state at exit.',
+            [('', {'name': name}, value)
+             for name, value in report['rate_limit'].items()
+             if value is not None])
+    return '\n'.join(lines) + '\n'
+
+
+_metrics = None
+_metrics_lock = Lock()
+
+
+def get_metrics():
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = RunMetrics()
+    return _metrics
+
+
+def reset_metrics():
+    """
+    Replaces the shared RunMetrics with empty ones, so that a
+    long-running process only keeps those of its current piece of work.
+    """
+    global _metrics
+    with _metrics_lock:
+        _metrics = RunMetrics()
+    return _metrics
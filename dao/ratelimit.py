@@ -0,0 +1,163 @@
+# Copyright 2026 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+import asyncio
+import logging
+import random
+import time
+from threading import Lock
+
+import github_inventory_settings as settings
+
+logger = logging.getLogger(__name__)
+
+
+def is_retryable(resp):
+    """
+    Server errors, 429s and secondary (abuse) rate limit 403s are worth
+    retrying, other statuses are final.
+    """
+    if resp.status_code >= 500 or resp.status_code == 429:
+        return True
+    if resp.status_code == 403:
+        return (resp.headers.get('X-RateLimit-Remaining') == '0' or
+                'Retry-After' in resp.headers or
+                b'rate limit' in resp.content.lower())
+    return False
+
+
+class RateLimiter:
+    """
+    Token bucket shared by every thread and coroutine making GitHub
+    requests.  Once X-RateLimit-Remaining drops below
+    GITHUB_RATE_RESERVE the refill rate is slowed to spread what is
+    left over the time until X-RateLimit-Reset, and all requests pause
+    while a Retry-After or reset is pending.
+    """
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.max_rate = rate
+        self.burst = burst
+        self.throttled = 0.0
+        self.retries = 0
+        self.remaining = None
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._paused_until = 0
+        self._throttled_until = 0
+        self._lock = Lock()
+
+    def acquire(self):
+        """
+        Waits for a token, and returns the seconds waited.
+        """
+        waited = 0
+        while (wait := self._take()) > 0:
+            time.sleep(wait)
+            waited += wait
+        return waited
+
+    async def acquire_async(self):
+        """
+        acquire for coroutines, waiting without blocking the event loop.
+        """
+        waited = 0
+        while (wait := self._take()) > 0:
+            await asyncio.sleep(wait)
+            waited += wait
+        return waited
+
+    def _take(self):
+        """
+        Takes a token and returns 0, or returns the seconds to wait
+        before trying again.  Waits overlapping one another are only
+        counted once in throttled, the wall clock time spent paused.
+        """
+        with self._lock:
+            now = time.monotonic()
+            wait = self._paused_until - now
+            if wait <= 0:
+                self._tokens = min(self.burst, self._tokens + (
+                    now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return 0
+                wait = (1 - self._tokens) / self.rate
+
+            self.throttled += max(now + wait - max(
+                now, self._throttled_until), 0)
+            self._throttled_until = max(self._throttled_until, now + wait)
+            return wait
+
+    def update(self, resp):
+        # GraphQL and search requests count against quotas of their own
+        if resp.headers.get('X-RateLimit-Resource', 'core') != 'core':
+            return
+
+        remaining = resp.headers.get('X-RateLimit-Remaining')
+        reset = resp.headers.get('X-RateLimit-Reset')
+        if remaining is None or reset is None:
+            return
+
+        remaining = int(remaining)
+        seconds_left = max(int(reset) - time.time(), 1)
+        with self._lock:
+            self.remaining = remaining
+            if remaining == 0:
+                self._pause(seconds_left)
+            elif remaining < getattr(settings, 'GITHUB_RATE_RESERVE', 500):
+                self.rate = min(self.max_rate, max(
+                    remaining / seconds_left, 0.1))
+            else:
+                self.rate = self.max_rate
+
+    def backoff(self, resp, attempt):
+        """
+        Pauses every thread before a retry, for Retry-After seconds if
+        given, otherwise an exponential delay with full jitter.
+        """
+        delay = None
+        if resp is not None and resp.headers.get('Retry-After'):
+            try:
+                delay = float(resp.headers['Retry-After'])
+            except ValueError:
+                pass
+        if delay is None:
+            delay = random.uniform(0, min(  # noqa: S311
+                getattr(settings, 'GITHUB_BACKOFF_MAX', 60),
+                getattr(settings, 'GITHUB_BACKOFF_BASE', 1) * 2 ** attempt))
+
+        with self._lock:
+            self.retries += 1
+            self._pause(delay)
+
+    def _pause(self, seconds):
+        self._paused_until = max(
+            self._paused_until, time.monotonic() + seconds)
+
+    def stats(self):
+        return {
+            'remaining': self.remaining,
+            'throttled_seconds': self.throttled,
+            'retries': self.retries,
+        }
+
+    def log_stats(self):
+        logger.info(
+            f'GitHub rate limiter: {self.throttled:.1f}s throttled, '
+            f'{self.retries} retries, {self.remaining} requests remaining')
+
+
+_rate_limiter = None
+_rate_limiter_lock = Lock()
+
+
+def get_rate_limiter():
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = RateLimiter(
+                getattr(settings, 'GITHUB_REQUEST_RATE', 10),
+                getattr(settings, 'GITHUB_REQUEST_BURST', 20))
+    return _rate_limiter
@@ -0,0 +1,236 @@
+# Copyright 2026 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+import logging
+import os
+import time
+import zlib
+from queue import Queue
+from threading import Lock, Thread
+
+from rows import rows_from_json, rows_to_json
+
+logger = logging.getLogger(__name__)
+
+
+def repo_fingerprint(repo):
+    """
+    Everything get_repo_values reads from the org listing.  If none of
+    it has changed, neither have the values derived from files on the
+    default branch.
+    """
+    return [
+        repo.get('pushed_at'),
+        repo.get('default_branch'),
+        repo.get('name'),
+        repo.get('language'),
+        repo.get('license').get('name') if (
+            repo.get('license') is not None) else None,
+    ]
+
+
+def shard_of(repo, count):
+    """
+    Stable shard number of repo, the same in every process and run.
+    """
+    return zlib.crc32(repo['html_url'].encode('utf-8')) % count
+
+
+def save_partial(path, shard, results, listing=None):
+    """
+    Writes the (repo, values) results of shard, an (index, count)
+    tuple, of a run whose repo listing is described by listing, for
+    merge_partials to combine with the other shards.
+    """
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump({
+            'shard': list(shard),
+            'listing': listing,
+            'results': [{
+                'url': repo['html_url'],
+                'pushed_at': repo.get('pushed_at'),
+                'values': rows_to_json(values) if (
+                    values is not None) else None,
+            } for repo, values in results],
+        }, f)
+    os.replace(tmp_path, path)
+
+
+def merge_partials(paths):
+    """
+    Returns (results, listing): the (repo, values) results of all
+    shards, most recently pushed first, and the description of the
+    repo listing they were collected from.  The partials must hold
+    every shard of one run.
+    """
+    shards = {}
+    counts = set()
+    listings = []
+    for path in paths:
+        with open(path) as f:
+            partial = json.load(f)
+        index, count = partial['shard']
+        if index in shards:
+            raise Exception(  # noqa: TRY002
+                f'Cannot merge shard {index} twice, again from {path}')
+        shards[index] = partial['results']
+        counts.add(count)
+        if partial.get('listing') not in listings:
+            listings.append(partial.get('listing'))
+
+    if len(counts) != 1:
+        raise Exception(  # noqa: TRY002
+            f'Cannot merge shards of {sorted(counts)} shards')
+    missing = sorted(set(range(count)) - set(shards))
+    if missing or len(shards) != count:
+        raise Exception(  # noqa: TRY002
+            f'Cannot merge shards {sorted(shards)} of {count}, missing '
+            f'{missing}')
+    if len(listings) != 1:
+        raise Exception(  # noqa: TRY002
+            f'Cannot merge shards of different repo listings: {listings}')
+
+    results = [entry for partial in shards.values() for entry in partial]
+    results.sort(key=lambda entry: entry['pushed_at'] or '', reverse=True)
+    return ([({'html_url': entry['url'], 'pushed_at': entry['pushed_at']},
+              rows_from_json(*entry['values']) if (
+                  entry['values'] is not None) else None)
+             for entry in results], listings[0])
+
+
+class RepoSnapshot:
+    """
+    The RepoRow and WebappRow computed for each repo by the last run,
+    keyed by repo URL, stored as a JSON file.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._repos = {}
+        try:
+            with open(path) as f:
+                self._repos = json.load(f)
+        except FileNotFoundError:
+            pass
+        except ValueError as ex:
+            logger.warning(f'Ignoring unreadable snapshot {path}: {ex}')
+
+    def get(self, repo):
+        """
+        Returns the stored (RepoRow, WebappRow) for repo, or None if the
+        repo has changed since it was stored.
+        """
+        entry = self._repos.get(repo['html_url'])
+        if entry is not None and (
+                entry['fingerprint'] == repo_fingerprint(repo)):
+            return rows_from_json(
+                entry['repo_values'], entry['webapp_values'])
+
+    def coverage_expired(self, repo, max_age):
+        entry = self._repos.get(repo['html_url'], {})
+        return time.time() - entry.get('coverage_updated', 0) > max_age
+
+    def update(self, repo, repo_row, webapp_row, coverage_updated=None):
+        entry = self._repos.get(repo['html_url'], {})
+        repo_values, webapp_values = rows_to_json((repo_row, webapp_row))
+        self._repos[repo['html_url']] = {
+            'fingerprint': repo_fingerprint(repo),
+            'repo_values': repo_values,
+            'webapp_values': webapp_values,
+            'coverage_updated': coverage_updated or entry.get(
+                'coverage_updated', time.time()),
+        }
+
+    def save(self, repos=None):
+        """
+        Writes the snapshot, keeping only the given repos if any, so
+        that repos no longer listed are dropped.
+        """
+        data = self._repos
+        if repos is not None:
+            urls = {repo['html_url'] for repo in repos}
+            data = {url: entry for url, entry in data.items() if url in urls}
+
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+
+class RunCheckpoint:
+    """
+    Append-only JSON lines file of the values collected so far in a
+    run.  Results are queued by the collecting threads and written by
+    a single writer thread as they arrive, so a rerun after a failure
+    only needs to collect the repos that are missing.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._queue = Queue()
+        self._writer = None
+        self._lock = Lock()
+        self._done = {}
+        try:
+            with open(path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # partial line from an interrupted write
+                    self._done[entry['url']] = entry
+        except FileNotFoundError:
+            pass
+
+    def get(self, repo):
+        """
+        Returns the (RepoRow, WebappRow) a previous run collected for
+        repo, or None if it has not been collected since it changed.
+        """
+        entry = self._done.get(repo['html_url'])
+        if entry is not None and (
+                entry['fingerprint'] == repo_fingerprint(repo)):
+            return rows_from_json(
+                entry['repo_values'], entry['webapp_values'])
+
+    def put(self, repo, values):
+        with self._lock:
+            if self._writer is None:
+                self._writer = Thread(target=self._write, daemon=True)
+                self._writer.start()
+        self._queue.put((repo, values))
+
+    def close(self):
+        with self._lock:
+            if self._writer is not None:
+                self._queue.put(None)
+                self._writer.join()
+                self._writer = None
+
+    def clear(self):
+        self.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def _write(self):
+        with open(self.path, 'a+') as f:
+            if f.tell():
+                # Terminate a line left partial by an interrupted run
+                f.seek(f.tell() - 1)
+                if f.read(1) != '\n':
+                    f.write('\n')
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    break
+                repo, values = item
+                repo_values, webapp_values = rows_to_json(values)
+                f.write(json.dumps({
+                    'url': repo['html_url'],
+                    'fingerprint': repo_fingerprint(repo),
+                    'repo_values': repo_values,
+                    'webapp_values': webapp_values,
+                }) + '\n')
+                f.flush()
@@ -0,0 +1,239 @@
+# Copyright 2026 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+import re
+
+import toml
+
+REQUIREMENT_RE = re.compile(
+    r'\s*([A-Za-z0-9][A-Za-z0-9._-]*)\s*(?:\[[^\]]*\])?\s*'
+    r'((?:[~=!<>]=?|===)[^;@]*?)?\s*(?:@[^;]*)?(?:;.*)?')
+QUOTED_RE = re.compile(r'\'([^\'\n]+)\'|"([^"\n]+)"')
+PYTHON_VERSION_RE = re.compile(r'\d+(\.\d+)?')
+NAME_SEPARATORS_RE = re.compile(r'[-_.]+')
+REGISTRY_TARBALL_RE = re.compile(r'https?://\S+\.tgz')
+
+
+def normalize_name(name):
+    return NAME_SEPARATORS_RE.sub('-', name).lower()
+
+
+def parse_requirement(requirement):
+    """
+    Returns (normalized name, version specifier) of a PEP 508
+    requirement string, or None if it is not one.
+    """
+    match = REQUIREMENT_RE.fullmatch(requirement)
+    if match:
+        return (normalize_name(match.group(1)),
+                re.sub(r'\s+', '', match.group(2) or ''))
+
+
+def parse_setup_py(content):
+    """
+    Every quoted requirement in setup.py, which is not run, so the
+    first string naming a package gives its version.
+    """
+    dependencies = {}
+    for match in QUOTED_RE.finditer(content.decode('utf-8')):
+        requirement = parse_requirement(match.group(1) or match.group(2))
+        if requirement:
+            dependencies.setdefault(*requirement)
+    # Any 'python' string is not a requirement, pyproject.toml sets it
+    dependencies.pop('python', None)
+    return dependencies
+
+
+def parse_pyproject(content):
+    """
+    PEP 621 and Poetry dependencies, with the Python version as
+    "python", and any top-level string keys.
+    """
+    config = toml.loads(content.decode('utf-8'))
+    dependencies = {}
+
+    project = config.get('project') or {}
+    requirements = list(project.get('dependencies') or [])
+    for group in (project.get('optional-dependencies') or {}).values():
+        requirements.extend(group)
+    for requirement in requirements:
+        requirement = parse_requirement(requirement)
+        if requirement:
+            dependencies.setdefault(*requirement)
+    if project.get('requires-python'):
+        dependencies.setdefault('python', project['requires-python'])
+
+    poetry = (config.get('tool') or {}).get('poetry') or {}
+    tables = [poetry.get('dependencies'), poetry.get('dev-dependencies')] + [
+        group.get('dependencies')
+        for group in (poetry.get('group') or {}).values()]
+    for table in tables:
+        for name, spec in (table or {}).items():
+            if isinstance(spec, dict):
+                spec = spec.get('version')
+            dependencies.setdefault(normalize_name(name), (
+                spec if isinstance(spec, str) else ''))
+
+    for name, value in config.items():
+        if isinstance(value, str):
+            dependencies.setdefault(normalize_name(name), value)
+    return dependencies
+
+
+def parse_requirements(content):
+    dependencies = {}
+    for line in content.decode('utf-8').splitlines():
+        line = re.sub(r'(^|\s)#.*', '', line).strip()
+        if line and not line.startswith('-'):
+            requirement = parse_requirement(line)
+            if requirement:
+                dependencies.setdefault(*requirement)
+    dependencies.pop('python', None)
+    return dependencies
+
+
+def parse_package_json(content):
+    data = json.loads(content)
+    dependencies = {}
+    for key in ['devDependencies', 'dependencies']:
+        dependencies.update({
+            name: spec for name, spec in (data.get(key) or {}).items()
+            if spec and isinstance(spec, str)})
+    return dependencies
+
+
+def parse_package_lock(content):
+    """
+    The installed version of each top-level package from the registry.
+    Packages installed from git or a path are skipped, their version is
+    a URL in lockfile v1, and in v2 and later the package's own version,
+    with the source in resolved.
+    """
+    data = json.loads(content)
+    packages = data.get('packages')
+    if packages is not None:
+        entries = {path[13:]: entry for path, entry in packages.items() if (
+            path.startswith('node_modules/') and
+            '/node_modules/' not in path)}
+    else:
+        entries = data.get('dependencies') or {}
+    return {name: entry['version'] for name, entry in entries.items() if (
+        (entry.get('version') or '')[:1].isdigit() and
+        not entry.get('link') and (
+            entry.get('resolved') is None or
+            REGISTRY_TARBALL_RE.fullmatch(entry['resolved'])))}
+
+
+def requirement_version(spec):
+    spec = spec.strip()
+    return spec if spec and spec != '*' else 'Latest'
+
+
+def python_language(spec):
+    match = PYTHON_VERSION_RE.search(spec)
+    if match:
+        return f'Python{match.group(0)}'
+
+
+def git_ref_version(spec):
+    """
+    The ref of a git dependency, such as repo#1.2, or the version.
+    """
+    if '#' in spec:
+        return spec.split('#', 1)[1] or None
+    return spec
+
+
+# Sheet column set by each package, and how its version is written
+PYTHON_DEPENDENCIES = {
+    'python': ('Language', python_language),
+    'django': ('Django', requirement_version),
+    'django-compressor': ('django-compressor', requirement_version),
+}
+NPM_DEPENDENCIES = {
+    'vue': ('Vue', str),
+    'webpack': ('Webpack', str),
+    'bootstrap': ('Bootstrap', str),
+    'bootstrap-icons': ('Bootstrap Icons', str),
+    'vite': ('Vite', str),
+    'prettier': ('Prettier', str),
+    'eslint': ('ESLint', str),
+    'stylelint': ('Stylelint', str),
+    'axdd-components': ('axdd-components', git_ref_version),
+}
+
+# Root files declaring each ecosystem's dependencies, first match wins:
+# (pattern, parser, whether it only pins packages a manifest declares)
+PYTHON_MANIFESTS = [
+    (re.compile(r'setup\.py'), parse_setup_py, False),
+    (re.compile(r'pyproject\.toml'), parse_pyproject, False),
+    (re.compile(r'requirements[\w.-]*\.txt'), parse_requirements, False),
+]
+NPM_MANIFESTS = [
+    (re.compile(r'package-lock\.json'), parse_package_lock, True),
+    (re.compile(r'package\.json'), parse_package_json, False),
+]
+DEFAULT_MANIFEST_NAMES = [
+    'setup.py', 'pyproject.toml', 'requirements.txt', 'package-lock.json',
+    'package.json']
+
+
+class Ecosystem:
+    """
+    The manifests and dependency columns of one package ecosystem,
+    with the package names precompiled to a set for lookups.
+    """
+    def __init__(self, manifests, dependencies, defaults=None):
+        self.manifests = manifests
+        self.dependencies = dependencies
+        self.names = frozenset(dependencies)
+        self.defaults = defaults or {}
+
+    def manifest_files(self, names):
+        """
+        Returns (name, parser, pins) for each of the root file names
+        that is a manifest, in priority order, shortest name first
+        among matches of one pattern.
+        """
+        files = []
+        for pattern, parse, pins in self.manifests:
+            files.extend((name, parse, pins) for name in sorted(
+                names, key=lambda name: (len(name), name)) if (
+                    pattern.fullmatch(name)))
+        return files
+
+    def values(self, parsed):
+        """
+        The sheet values from parsed, the (dependencies, pins) of each
+        manifest file in priority order, or {} if there were none.
+        """
+        if not parsed:
+            return {}
+
+        declared = set()
+        for dependencies, pins in parsed:
+            if not pins:
+                declared.update(dependencies.keys() & self.names)
+
+        versions = {}
+        for dependencies, pins in reversed(parsed):
+            versions.update({name: dependencies[name] for name in (
+                dependencies.keys() & (declared if pins else self.names))})
+
+        values = dict(self.defaults)
+        for name, version in versions.items():
+            column, format_version = self.dependencies[name]
+            value = format_version(version)
+            if value is not None:
+                values[column] = value
+        return values
+
+
+PYTHON = Ecosystem(PYTHON_MANIFESTS, PYTHON_DEPENDENCIES, {'Django': 'N/A'})
+NPM = Ecosystem(NPM_MANIFESTS, NPM_DEPENDENCIES)
+
+
+def is_manifest(path):
+    return any(pattern.fullmatch(path) for pattern, _parse, _pins in (
+        PYTHON_MANIFESTS + NPM_MANIFESTS))
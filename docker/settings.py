@@ -4,10 +4,33 @@
 import os
 
 GITHUB_ORG = 'uw-it-aca'
+GITHUB_ORGS = [org for org in os.getenv('GITHUB_ORGS', '').split(',') if org]
+GITHUB_SHARD = os.getenv('GITHUB_SHARD')
+GITHUB_REPO_TYPE = os.getenv('GITHUB_REPO_TYPE', 'all')
 GITHUB_OK_STATUS = [200, 404, 409]
 GITHUB_TOKEN = os.getenv('GITHUB_TOKEN')
+GITHUB_WORKERS = int(os.getenv('GITHUB_WORKERS', '8'))
+GITHUB_ASYNC_CONCURRENCY = int(os.getenv('GITHUB_ASYNC_CONCURRENCY', '20'))
+GITHUB_REQUEST_RATE = float(os.getenv('GITHUB_REQUEST_RATE', '10'))
+GITHUB_REQUEST_BURST = int(os.getenv('GITHUB_REQUEST_BURST', '20'))
+GITHUB_MAX_RETRIES = int(os.getenv('GITHUB_MAX_RETRIES', '5'))
+GITHUB_GRAPHQL_BATCH_SIZE = int(os.getenv('GITHUB_GRAPHQL_BATCH_SIZE', '25'))
+GITHUB_CACHE_PATH = os.getenv('GITHUB_CACHE_PATH')
+GITHUB_CACHE_MAX_SIZE = int(os.getenv('GITHUB_CACHE_MAX_SIZE', '268435456'))
+GITHUB_VALUE_CACHE_MAX_SIZE = int(
+    os.getenv('GITHUB_VALUE_CACHE_MAX_SIZE', '67108864'))
+GITHUB_MIRROR_PATH = os.getenv('GITHUB_MIRROR_PATH')
+GITHUB_POLL_INTERVAL = int(os.getenv('GITHUB_POLL_INTERVAL', '60'))
+SNAPSHOT_PATH = os.getenv('SNAPSHOT_PATH', 'repo_snapshot.json')
+CHECKPOINT_PATH = os.getenv('CHECKPOINT_PATH')
+RUN_REPORT_PATH = os.getenv('RUN_REPORT_PATH')
+HISTORY_PATH = os.getenv('HISTORY_PATH')
+COVERAGE_REFRESH_AGE = int(os.getenv('COVERAGE_REFRESH_AGE', '86400'))
 
 GOOGLE_SHEET_ID = os.getenv('GOOGLE_SHEET_ID')
 REPO_WORKSHEET_NAME = 'GitHub'
 WEBAPP_WORKSHEET_NAME = 'WebApps'
+REMOVED_COLUMN = 'Removed'
+PORT = int(os.getenv('PORT', '8000'))
+WEBHOOK_SECRET = os.getenv('WEBHOOK_SECRET')
 GS_CREDENTIALS = '/gcs/credentials.json'
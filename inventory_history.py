@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# Copyright 2026 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Reports on the history of inventory runs recorded with --history.
+
+    # The recorded runs
+    python3 inventory_history.py runs
+
+    # What changed in the latest run, or between two runs
+    python3 inventory_history.py diff
+    python3 inventory_history.py diff 12 40
+
+    # When each repo moved to a new django-container version
+    python3 inventory_history.py history django-container
+"""
+
+import argparse
+import json
+import sys
+
+import github_inventory_settings as settings
+
+from dao.history import HistoryStore, format_diff
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Report on the recorded inventory runs')
+    parser.add_argument(
+        '--history', default=getattr(settings, 'HISTORY_PATH', None),
+        required=not getattr(settings, 'HISTORY_PATH', None),
+        help='SQLite file the runs were recorded in')
+    parser.add_argument(
+        '--json', action='store_true', help='print JSON instead of text')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    commands.add_parser('runs', help='list the recorded runs')
+
+    diff = commands.add_parser(
+        'diff', help='changes between two runs, by default the latest '
+                     'and the one before it')
+    diff.add_argument('from_run', type=int, nargs='?')
+    diff.add_argument('to_run', type=int, nargs='?')
+
+    history = commands.add_parser(
+        'history', help='every change of a column, by repo')
+    history.add_argument('column', help='sheet column name')
+    history.add_argument('--repo', help='only the repo with this URL')
+    history.add_argument('--sheet', help='only this worksheet')
+    return parser.parse_args()
+
+
+def main(args):
+    history = HistoryStore(args.history)
+    if args.command == 'runs':
+        runs = history.runs()
+        lines = [f'{run}\t{started}' for run, started in runs]
+        data = [{'run': run, 'started': started} for run, started in runs]
+
+    elif args.command == 'diff':
+        to_run = args.to_run or history.latest_run() or 0
+        from_run = args.from_run if args.from_run is not None else (
+            to_run - 1)
+        diff = history.diff(from_run, to_run)
+        lines = format_diff(diff)
+        data = diff
+
+    else:
+        changes = history.column_history(args.column, args.repo, args.sheet)
+        lines = [f'{sheet}\t{url}\t{run}\t{started}\t{value!r}'
+                 for run, started, sheet, url, value in changes]
+        data = [{'run': run, 'started': started, 'sheet': sheet,
+                 'url': url, 'value': value}
+                for run, started, sheet, url, value in changes]
+
+    history.close()
+    if args.json:
+        json.dump(data, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+    else:
+        for line in lines:
+            print(line)
+
+
+if __name__ == '__main__':
+    main(parse_args())
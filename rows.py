@@ -0,0 +1,108 @@
+# Copyright 2026 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+from dataclasses import dataclass, field, fields
+from operator import attrgetter
+
+
+def column(name, default=None):
+    return field(default=default, metadata={'column': name})
+
+
+def row_schema(cls):
+    """
+    Makes cls a slotted dataclass whose fields are the sheet columns
+    named by their column() metadata, in sheet order.
+    """
+    cls = dataclass(slots=True)(cls)
+    cls.ATTRS = {item.metadata['column']: item.name for item in fields(cls)}
+    cls.COLUMNS = tuple(cls.ATTRS)
+    cls._getter = attrgetter(*cls.ATTRS.values())
+    return cls
+
+
+class Row:
+    __slots__ = ()
+
+    def values(self):
+        """
+        The row's values in COLUMNS order.
+        """
+        return self._getter(self)
+
+    def update(self, values):
+        """
+        Sets the columns of this row from values, a {column: value}
+        dict, and returns the values of columns it does not have.
+        """
+        others = {}
+        for name, value in values.items():
+            if name in self.ATTRS:
+                setattr(self, self.ATTRS[name], value)
+            else:
+                others[name] = value
+        return others
+
+    def as_dict(self):
+        return dict(zip(self.COLUMNS, self.values()))
+
+    @classmethod
+    def from_dict(cls, data):
+        if data is None:
+            return None
+        return cls(**{attr: data[name] for name, attr in cls.ATTRS.items()
+                      if name in data})
+
+
+@row_schema
+class RepoRow(Row):
+    url: str = column('URL')
+    name: str = column('Name')
+    language: str = column('Language', '')
+    last_updated: str = column('Last Updated')
+    license: str = column('License', 'N/A')
+    default_branch: str = column('Default Branch')
+    linter: str = column('Linter', 'N/A')
+    pypi: object = column('PyPI', 'N/A')
+    django: object = column('Django', 'N/A')
+    django_container: str = column('django-container', 'N/A')
+    ingress: object = column('Ingress', 'N/A')
+    trivy: str = column('Trivy', 'N/A')
+    coveralls: bool = column('Coveralls', False)
+    coverage: float = column('Coverage', 0)
+    version: str = column('Version')
+
+
+@row_schema
+class WebappRow(Row):
+    url: str = column('URL')
+    name: str = column('Name')
+    django: object = column('Django', 'N/A')
+    vue: str = column('Vue')
+    vite: str = column('Vite')
+    webpack: str = column('Webpack')
+    django_compressor: str = column('django-compressor')
+    axdd_components: str = column('axdd-components')
+    bootstrap: str = column('Bootstrap')
+    bootstrap_icons: str = column('Bootstrap Icons')
+    prettier: str = column('Prettier')
+    eslint: str = column('ESLint')
+    # The sheet's original column, package.json values go to Stylelint
+    stylint: str = column('Stylint')
+    stylelint: str = column('Stylelint')
+    jshint: bool = column('JSHint')
+    coverage: object = column('Coverage', 'N/A')
+
+
+def rows_to_json(values):
+    """
+    The (RepoRow, WebappRow or None) values of a repo as JSON-friendly
+    dicts keyed by column name.
+    """
+    repo_row, webapp_row = values
+    return (repo_row.as_dict(),
+            webapp_row.as_dict() if webapp_row is not None else None)
+
+
+def rows_from_json(repo_values, webapp_values):
+    return (RepoRow.from_dict(repo_values), WebappRow.from_dict(webapp_values))
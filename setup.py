@@ -15,11 +15,10 @@ setup(
     author_email="aca-it@uw.edu",
     install_requires=[
         'requests',
-        'gspread',
+        'httpx[http2]',
+        'gspread>=6',
         'pyyaml',
         'toml',
-        'lxml',
-        'beautifulsoup4',
     ],
     license='Apache License, Version 2.0',
     description=('UWIT Technology spreadsheet updater'),
@@ -0,0 +1,98 @@
+# Copyright 2026 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+import importlib.util
+import json
+import os
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# The image installs docker/settings.py as github_inventory_settings
+if 'github_inventory_settings' not in sys.modules:
+    spec = importlib.util.spec_from_file_location(
+        'github_inventory_settings',
+        os.path.join(ROOT, 'docker', 'settings.py'))
+    sys.modules[spec.name] = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(sys.modules[spec.name])
+
+
+@pytest.fixture
+def value_cache(monkeypatch):
+    """
+    A fresh, in-memory shared ValueCache for the test.
+    """
+    from dao import cache
+
+    value_cache = cache.ValueCache()
+    monkeypatch.setattr(cache, '_value_cache', value_cache)
+    return value_cache
+
+
+@pytest.fixture
+def rate_limiter(monkeypatch):
+    """
+    A fresh shared RateLimiter, with a token and short backoffs for
+    GitHub requests.
+    """
+    import github_inventory_settings as settings
+    from dao import ratelimit
+
+    monkeypatch.setattr(settings, 'GITHUB_TOKEN', 'token')
+    monkeypatch.setattr(
+        settings, 'GITHUB_BACKOFF_BASE', 0.01, raising=False)
+    rate_limiter = ratelimit.RateLimiter(1000, 1000)
+    monkeypatch.setattr(ratelimit, '_rate_limiter', rate_limiter)
+    return rate_limiter
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    Answers GETs and POSTs from the server's responses, {path: JSON
+    data or a list of (status, headers, data) answered in turn}, with a
+    404 for other paths, and records each path requested and its
+    headers.
+    """
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.do_GET()
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        self.server.request_headers.append(self.headers)
+        status, headers, data = 404, {}, None
+        response = self.server.responses.get(self.path)
+        if isinstance(response, list):
+            status, headers, data = response.pop(0) if (
+                len(response) > 1) else response[0]
+        elif response is not None:
+            status, data = 200, response
+
+        content = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    server.url = f'http://127.0.0.1:{server.server_port}'
+    server.responses = {}
+    server.requests = []
+    server.request_headers = []
+    Thread(target=server.serve_forever, args=(0.01,), daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,117 @@
+# Copyright 2026 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+import github_inventory_settings as settings
+import pytest
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from dao import cache, github
+from dao.cache import ResponseCache, ValueCache
+from dao.github import GitHub_DAO, memoize_values, memoized_values
+from dependencies import parse_requirements
+
+ETAG = '"644b5b0155e6404a9cc4bd9d8b1ae730"'
+LAST_MODIFIED = 'Thu, 05 Jul 2026 15:31:30 GMT'
+LINK = ('<https://api.github.com/organizations/1/repos?page=2>; '
+        'rel="next"')
+
+
+def response(content, **headers):
+    resp = requests.Response()
+    resp.status_code = 200
+    resp.headers = CaseInsensitiveDict({
+        name.replace('_', '-'): value for name, value in headers.items()})
+    resp._content = content
+    return resp
+
+
+@pytest.fixture
+def response_cache(tmp_path, monkeypatch):
+    path = str(tmp_path / 'cache.db')
+    monkeypatch.setattr(settings, 'GITHUB_CACHE_PATH', path)
+    response_cache = ResponseCache(path, 1024)
+    monkeypatch.setattr(cache, '_response_cache', response_cache)
+    return response_cache
+
+
+def test_conditional_headers(response_cache):
+    response_cache.store('/etag', response(b'[]', ETag=ETAG))
+    response_cache.store('/modified', response(
+        b'[]', Last_Modified=LAST_MODIFIED))
+    response_cache.store('/neither', response(b'[]'))
+
+    assert response_cache.conditional_headers('/etag') == {
+        'If-None-Match': ETAG}
+    assert response_cache.conditional_headers('/modified') == {
+        'If-Modified-Since': LAST_MODIFIED}
+    assert response_cache.conditional_headers('/neither') == {}
+    assert response_cache.response('/neither') is None
+
+
+def test_replay(stub_server, rate_limiter, response_cache):
+    stub_server.responses['/repos'] = [
+        (200, {'ETag': ETAG, 'Link': LINK, 'X-Request-Id': '1'}, [1, 2]),
+        (304, {'ETag': ETAG}, None),
+    ]
+    dao = GitHub_DAO()
+    dao.get(f'{stub_server.url}/repos')
+    resp = dao.get(f'{stub_server.url}/repos')
+
+    # The stored body and pagination are replayed for a 304
+    assert resp.status_code == 200
+    assert resp.json() == [1, 2]
+    assert resp.headers['Link'] == LINK
+    assert 'X-Request-Id' not in resp.headers
+    assert stub_server.request_headers[1]['If-None-Match'] == ETAG
+    assert (response_cache.hits, response_cache.misses) == (1, 1)
+
+
+def test_eviction(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    response_cache = ResponseCache(path, 25)
+    response_cache.store('/a', response(b'a' * 10, ETag='"a"'))
+    response_cache.store('/b', response(b'b' * 10, ETag='"b"'))
+    response_cache.response('/a')
+
+    # The least recently used response is evicted down to 22.5 bytes
+    response_cache.store('/c', response(b'c' * 10, ETag='"c"'))
+    assert [url for url in ['/a', '/b', '/c'] if (
+        response_cache.response(url) is not None)] == ['/a', '/c']
+
+    # Access times replayed since the last store are kept by a flush
+    response_cache.response('/a')
+    response_cache.flush()
+    response_cache = ResponseCache(path, 25)
+    response_cache.store('/d', response(b'd' * 10, ETag='"d"'))
+    assert [url for url in ['/a', '/c', '/d'] if (
+        response_cache.response(url) is not None)] == ['/a', '/d']
+
+
+def test_value_cache_eviction(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    cache = ValueCache(path, max_size=100)
+    for i in range(4):
+        cache.set('ns', str(i), 'x' * 20)
+    cache.set('ns', '0', 'y' * 20)
+
+    # Values of 22 bytes, the oldest dropped down to 90 bytes
+    cache.set('ns', '4', 'x' * 20)
+    assert [cache.get('ns', str(i)) for i in range(5)] == [
+        'y' * 20, None, 'x' * 20, 'x' * 20, 'x' * 20]
+
+    # The size stored is counted again when reopened
+    cache = ValueCache(path, max_size=100)
+    cache.set('ns', '5', 'x' * 20)
+    assert [cache.get('ns', str(i)) for i in range(6)] == [
+        'y' * 20, None, None, 'x' * 20, 'x' * 20, 'x' * 20]
+
+
+def test_parsers_version(value_cache, monkeypatch):
+    sha = 'a' * 40
+    assert memoize_values(parse_requirements, sha, b'Django~=4.2\n') == (
+        memoized_values(parse_requirements, sha))
+
+    # Results of an earlier version of the parsers are not reused
+    monkeypatch.setattr(github, 'PARSERS_VERSION', github.PARSERS_VERSION + 1)
+    assert memoized_values(parse_requirements, sha) is None
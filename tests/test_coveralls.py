@@ -0,0 +1,67 @@
+# Copyright 2026 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+import asyncio
+
+import github_inventory_settings as settings
+import pytest
+
+from dao.aio import AsyncCoveralls_DAO
+from dao.coveralls import Coveralls_DAO
+
+REPO_URL = 'https://github.com/org/app'
+REPO_PATH = '/github/org/app.json?branch=main'
+BUILD_PATH = '/builds/{}.json?paths=*%2Fstatic%2F*'
+
+
+@pytest.fixture
+def coveralls(monkeypatch, value_cache, stub_server):
+    monkeypatch.setattr(
+        settings, 'COVERALLS_URL', stub_server.url, raising=False)
+    return stub_server
+
+
+def set_build(coveralls, commit_id, covered_percent, paths_covered_percent):
+    coveralls.responses[REPO_PATH] = {'builds': [{
+        'commit_sha': commit_id, 'covered_percent': covered_percent}]}
+    coveralls.responses[BUILD_PATH.format(commit_id)] = {
+        'selected_source_files_count': 2,
+        'paths_covered_percent': paths_covered_percent}
+
+
+def get_coverage(dao_class, has_js):
+    dao = dao_class()
+    if dao_class is Coveralls_DAO:
+        return dao.get_coverage(REPO_URL, 'main', has_js)
+
+    async def _get_coverage():
+        try:
+            return await dao.get_coverage(REPO_URL, 'main', has_js)
+        finally:
+            await dao.aclose()
+    return asyncio.run(_get_coverage())
+
+
+@pytest.mark.parametrize('dao_class', [Coveralls_DAO, AsyncCoveralls_DAO])
+def test_coverage(coveralls, dao_class):
+    set_build(coveralls, 'a' * 40, 81.25, 0)
+    assert get_coverage(dao_class, False) == (81.2, False)
+    assert coveralls.requests == [REPO_PATH]
+
+    set_build(coveralls, 'a' * 40, 87.5, 50)
+    assert get_coverage(dao_class, True) == (87.5, True)
+
+    # The build was still running, its coverage is read again, but
+    # whether its statics are covered is cached
+    coveralls.responses[REPO_PATH]['builds'][0]['covered_percent'] = 90
+    assert get_coverage(dao_class, True) == (90.0, True)
+    assert coveralls.requests == [REPO_PATH] * 2 + [
+        BUILD_PATH.format('a' * 40), REPO_PATH]
+
+
+@pytest.mark.parametrize('dao_class', [Coveralls_DAO, AsyncCoveralls_DAO])
+def test_no_build(coveralls, dao_class):
+    assert get_coverage(dao_class, True) == (0, False)
+
+    coveralls.responses[REPO_PATH] = {'builds': []}
+    assert get_coverage(dao_class, True) == (0, False)
@@ -0,0 +1,44 @@
+# Copyright 2026 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+
+from dependencies import NPM, parse_package_json, parse_package_lock
+
+PACKAGE_JSON = json.dumps({
+    'dependencies': {'vue': '^3.4', 'axdd-components': 'github:x/y#1.2.0'},
+}).encode('utf-8')
+
+
+def test_package_lock_v1():
+    lock = json.dumps({'lockfileVersion': 1, 'dependencies': {
+        'vue': {'version': '3.4.21'},
+        'axdd-components': {'version': 'git+ssh://git@github.com/x/y.git#'
+                                       'abc123', 'from': 'github:x/y#1.2.0'},
+    }}).encode('utf-8')
+    assert parse_package_lock(lock) == {'vue': '3.4.21'}
+
+
+def test_package_lock_v2():
+    lock = json.dumps({'lockfileVersion': 2, 'packages': {
+        '': {'dependencies': {'vue': '^3.4'}},
+        'node_modules/vue': {
+            'version': '3.4.21',
+            'resolved': 'https://registry.npmjs.org/vue/-/vue-3.4.21.tgz'},
+        'node_modules/axdd-components': {
+            'version': '0.1.0',
+            'resolved': 'git+ssh://git@github.com/x/y.git#abc123'},
+        'node_modules/local': {
+            'version': '1.0.0', 'resolved': 'file:../local'},
+        'node_modules/linked': {'version': '1.0.0', 'link': True,
+                                'resolved': 'packages/linked'},
+        'node_modules/bundled': {'version': '2.0.0'},
+        'node_modules/dep/node_modules/vue': {'version': '2.7.0'},
+    }}).encode('utf-8')
+    assert parse_package_lock(lock) == {'vue': '3.4.21', 'bundled': '2.0.0'}
+
+    # The git dependency's version comes from its ref in package.json
+    assert NPM.values([
+        (parse_package_lock(lock), True),
+        (parse_package_json(PACKAGE_JSON), False),
+    ]) == {'Vue': '3.4.21', 'axdd-components': '1.2.0'}
@@ -0,0 +1,85 @@
+# Copyright 2026 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+import github_inventory_settings as settings
+
+from dao.github import (
+    PREFETCH_PATHS, GitHub_DAO, graphql_files_query, parse_graphql_files)
+
+REPOS = [
+    {'full_name': 'org/app', 'default_branch': 'main'},
+    {'full_name': 'org/gone', 'default_branch': 'develop'},
+]
+
+
+def test_graphql_files_query():
+    query = graphql_files_query(REPOS)
+    assert query.startswith('query { r0: repository(owner: "org", '
+                            'name: "app") ')
+    assert 'r1: repository(owner: "org", name: "gone") ' in query
+    assert 'f0: object(expression: "main:setup.py") ' in query
+    assert (f'f{len(PREFETCH_PATHS) - 1}: object(expression: '
+            f'"develop:{PREFETCH_PATHS[-1]}") ') in query
+    assert 'workflows: object(expression: "main:.github/workflows") ' in (
+        query)
+    assert query.count('{ ... on Blob { text isTruncated } }') == 2 * (
+        len(PREFETCH_PATHS) + 1)
+    assert query.count('latestRelease { tagName }') == 2
+
+
+def test_parse_graphql_files():
+    setup_py = PREFETCH_PATHS.index('setup.py')
+    package_lock = PREFETCH_PATHS.index('package-lock.json')
+    data = {'data': {'r0': {
+        f'f{setup_py}': {'text': 'setup()\n', 'isTruncated': False},
+        # Too large for GraphQL, left out to be downloaded
+        f'f{package_lock}': {'text': '{"lockfileVersion', 'isTruncated': True},
+        'workflows': {'entries': [
+            {'name': 'test.yml', 'type': 'blob', 'oid': 'b' * 40,
+             'object': {'text': 'jobs: {}\n', 'isTruncated': False}},
+            {'name': 'big.yaml', 'type': 'blob', 'oid': 'a' * 40,
+             'object': {'text': 'jobs:', 'isTruncated': True}},
+            {'name': 'README.md', 'type': 'blob', 'oid': 'c' * 40,
+             'object': {'text': '', 'isTruncated': False}},
+            {'name': 'scripts', 'type': 'tree', 'oid': 'd' * 40,
+             'object': {}},
+        ]},
+        'latestRelease': {'tagName': '1.2.0'},
+    }, 'r1': None}}
+
+    files, release, workflows = parse_graphql_files(data, REPOS)[0]
+    assert release == '1.2.0'
+    assert workflows == [('big.yaml', 'a' * 40), ('test.yml', 'b' * 40)]
+    missing = {path: None for path in PREFETCH_PATHS}
+    del missing['package-lock.json']
+    assert files == {**missing, 'setup.py': b'setup()\n',
+                     '.github/workflows/test.yml': b'jobs: {}\n'}
+    assert parse_graphql_files(data, REPOS)[1] is None
+
+
+def test_parse_graphql_files_no_workflows():
+    data = {'data': {'r0': {'workflows': None, 'latestRelease': None}}}
+    files, release, workflows = parse_graphql_files(data, REPOS[:1])[0]
+    assert files == {path: None for path in PREFETCH_PATHS}
+    assert (release, workflows) == (None, [])
+
+
+def test_prefetch_failed_batch(stub_server, rate_limiter, monkeypatch):
+    monkeypatch.setattr(settings, 'GITHUB_GRAPHQL_URL',
+                        f'{stub_server.url}/graphql', raising=False)
+    monkeypatch.setattr(settings, 'GITHUB_MAX_RETRIES', 0)
+    repos = [dict(repo, html_url=f'https://github.com/{repo["full_name"]}',
+                  releases_url=f'{stub_server.url}/{repo["full_name"]}')
+             for repo in REPOS]
+    stub_server.responses['/graphql'] = [
+        (502, {}, None),
+        (200, {}, {'data': {'r0': {'latestRelease': {'tagName': '2.0'}}}}),
+    ]
+
+    # The first batch is left to be read file by file
+    dao = GitHub_DAO()
+    dao.prefetch_files(repos, batch_size=1)
+    assert stub_server.requests == ['/graphql'] * 2
+    assert dao.get_current_version(repos[1]['releases_url']) == '2.0'
+    assert dao.get_file(repos[1]['html_url'], 'develop', 'setup.py') is None
+    assert repos[0]['html_url'] not in dao._prefetched_files
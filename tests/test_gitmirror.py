@@ -0,0 +1,112 @@
+# Copyright 2026 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+import subprocess
+
+import pytest
+
+from dao.gitmirror import (
+    GitMirror, GitMirror_DAO, parse_cat_file_batch, parse_ls_tree)
+from utils import get_workflow_values
+
+WORKFLOW = b'''
+jobs:
+  test:
+    steps:
+      - uses: uw-it-aca/actions/container-vuln-scan@main
+'''
+
+
+def git(*args, cwd=None):
+    subprocess.run(['git', *args], cwd=cwd, check=True, capture_output=True)
+
+
+@pytest.fixture
+def mirror(tmp_path):
+    """
+    A mirror of one repo whose workflows and requirements files are
+    pairs of identical files, so each pair shares a blob, and whose
+    workflows directory has an identical copy, sharing its tree.
+    """
+    src = tmp_path / 'src'
+    for workflows in [src / '.github' / 'workflows', src / 'templates']:
+        workflows.mkdir(parents=True)
+        (workflows / 'a.yml').write_bytes(WORKFLOW)
+        (workflows / 'b.yml').write_bytes(WORKFLOW)
+    (src / 'requirements.txt').write_bytes(b'Django~=4.2\n')
+    (src / 'requirements-dev.txt').write_bytes(b'Django~=4.2\n')
+    (src / 'app.js').write_bytes(b'')
+    git('init', '-b', 'main', cwd=src)
+    git('add', '-A', cwd=src)
+    git('-c', 'user.name=test', '-c', 'user.email=test@example.com',
+        'commit', '-m', 'test', cwd=src)
+
+    url = 'https://github.com/org/app'
+    repo = {
+        'full_name': 'org/app',
+        'html_url': url,
+        'trees_url': 'https://api.github.com/repos/org/app/git/trees{/sha}',
+        'releases_url': 'https://api.github.com/repos/org/app/releases{/id}',
+        'default_branch': 'main',
+        'clone_url': src.as_uri(),
+        'latest_release': '1.0',
+    }
+    mirror = GitMirror(str(tmp_path / 'mirror'))
+    mirror.sync(repo)
+    mirror.save_listing('org', [repo])
+    return mirror, repo
+
+
+def test_parse_ls_tree():
+    output = (b'040000 tree ' + b'a' * 40 + b'\tdocs\0' +
+              b'100644 blob ' + b'b' * 40 + b'\tdocs/read me.md\0')
+    assert parse_ls_tree(output) == [
+        ('tree', 'a' * 40, 'docs'),
+        ('blob', 'b' * 40, 'docs/read me.md'),
+    ]
+
+
+def test_parse_cat_file_batch():
+    output = (b'a' * 40 + b' blob 5\nhello\n' +
+              b'HEAD:nope missing\n' +
+              b'b' * 40 + b' blob 0\n\n')
+    assert parse_cat_file_batch(output) == [
+        ('a' * 40, b'hello'),
+        ('HEAD:nope', None),
+        ('b' * 40, b''),
+    ]
+
+
+def test_read_identical_files(mirror):
+    mirror, repo = mirror
+    root_sha, entries, files = mirror.read(repo)
+
+    assert root_sha is not None
+    assert entries[0][::2] == ('tree', '.github')
+    assert files == {
+        '.github/workflows/a.yml': WORKFLOW,
+        '.github/workflows/b.yml': WORKFLOW,
+        'requirements.txt': b'Django~=4.2\n',
+        'requirements-dev.txt': b'Django~=4.2\n',
+    }
+
+
+def test_read_missing_clone(tmp_path):
+    repo = {'full_name': 'org/none', 'html_url': 'https://github.com/org/none',
+            'default_branch': 'main'}
+    assert GitMirror(str(tmp_path)).read(repo) == (None, [], {})
+
+
+def test_mirror_dao(mirror, value_cache):
+    mirror, repo = mirror
+    dao = GitMirror_DAO(mirror)
+    assert list(dao.get_repositories_for_org('org')) == [repo]
+
+    for name in ['a.yml', 'b.yml']:
+        assert dao.get_file(
+            repo['html_url'], 'main', f'.github/workflows/{name}') == WORKFLOW
+    assert get_workflow_values(repo, dao) == {'Trivy': 'Yes'}
+    assert [name for name, sha in dao.get_workflow_files(
+        repo['html_url'], repo['trees_url'], 'main')] == ['a.yml', 'b.yml']
+    assert dao.get_has_statics(repo['trees_url'], 'main') == (True, False)
+    assert dao.get_current_version(repo['releases_url']) == '1.0'
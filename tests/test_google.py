@@ -0,0 +1,72 @@
+# Copyright 2026 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+import pytest
+
+from dao.google import changed_blocks, upsert_values
+from rows import RepoRow
+
+COL_NAMES = ['URL', 'Name', 'Notes', 'Version', 'Removed']
+SHEET_VALUES = [
+    ['u/a', 'a', 'keep', '1.0', ''],
+    ['u/b', 'b', '', '1.0', ''],
+    ['u/c', 'c', '', '1.0', 'Yes'],
+    ['u/d', 'd'],
+]
+ROWS = [
+    RepoRow(url='u/a', name='a', version='1.1'),
+    RepoRow(url='u/c', name='c', version='1.0'),
+    RepoRow(url='u/e', name='e', version='2.0'),
+]
+
+
+def test_upsert_values():
+    new_values, appended, removed = upsert_values(
+        SHEET_VALUES, COL_NAMES, ROWS, removed_column='Removed',
+        removed_value='2026-10-18', skipped={'u/b'})
+
+    # Notes is not a RepoRow column and is kept, a matched row is no
+    # longer marked removed
+    assert new_values == [
+        ['u/a', 'a', 'keep', '1.1', ''],
+        ['u/b', 'b', '', '1.0', ''],
+        ['u/c', 'c', '', '1.0', ''],
+        ['u/d', 'd', '', '', '2026-10-18'],
+        ['u/e', 'e', '', '2.0', ''],
+    ]
+    assert (appended, removed) == (1, 1)
+
+
+def test_upsert_values_removed():
+    new_values, appended, removed = upsert_values(
+        SHEET_VALUES, COL_NAMES, ROWS[:1], removed_column='Removed',
+        removed_value='Yes', removed={'u/b', 'u/c'})
+    assert [row[4] for row in new_values] == ['', 'Yes', 'Yes', '']
+    assert (appended, removed) == (0, 2)
+
+    # Without a removed column, removed rows are only counted
+    new_values, appended, removed = upsert_values(
+        SHEET_VALUES, COL_NAMES[:4], ROWS[:1])
+    assert [len(row) for row in new_values] == [4] * 4
+    assert (appended, removed) == (0, 3)
+
+
+def test_upsert_values_no_key():
+    with pytest.raises(Exception, match='no URL column'):
+        upsert_values(SHEET_VALUES, ['Name'], ROWS)
+
+
+def test_changed_blocks():
+    new_values, appended, removed = upsert_values(
+        SHEET_VALUES, COL_NAMES, ROWS, removed_column='Removed',
+        removed_value='2026-10-18', skipped={'u/b'})
+
+    # The Removed cells of rows 2 and 3 form one block, blank cells of
+    # short and appended rows are unchanged
+    assert changed_blocks(SHEET_VALUES, new_values) == [
+        (0, 3, [['1.1']]),
+        (2, 4, [[''], ['2026-10-18']]),
+        (4, 0, [['u/e', 'e']]),
+        (4, 3, [['2.0']]),
+    ]
+    assert changed_blocks(new_values, new_values) == []
@@ -0,0 +1,90 @@
+# Copyright 2026 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+import pytest
+
+from dao.history import REMOVED, HistoryStore, format_diff
+from rows import RepoRow, WebappRow
+
+A = 'https://github.com/org/a'
+B = 'https://github.com/org/b'
+C = 'https://github.com/org/c'
+
+
+def worksheets(versions, webapps=()):
+    return {
+        'GitHub': [RepoRow(url=url, name=url[-1], version=version)
+                   for url, version in versions.items()],
+        'WebApps': [WebappRow(url=url, name=url[-1]) for url in webapps],
+    }
+
+
+@pytest.fixture
+def history(tmp_path):
+    """
+    Four runs: B is removed by the second and back in the third, the
+    fourth lists only A without marking the others removed.
+    """
+    history = HistoryStore(str(tmp_path / 'history.db'))
+    assert history.latest_run() is None
+    history.record(worksheets({A: '1.0', B: '1.0', C: '2.0'}, [A]))
+    history.record(worksheets({A: '1.1', C: '2.0'}, [A]))
+    history.record(worksheets({A: '1.1', B: '1.0'}, [A]), skipped={C})
+    history.record(worksheets({A: '1.2'}), mark_removed=False)
+    yield history
+    history.close()
+
+
+def test_rows(history):
+    assert [run for run, started in history.runs()] == [1, 2, 3, 4]
+    assert history.rows(1)[('GitHub', A)]['Version'] == '1.0'
+    assert history.rows(1)[('WebApps', A)] == WebappRow(
+        url=A, name='a').as_dict()
+    assert sorted(history.rows(2)) == [
+        ('GitHub', A), ('GitHub', C), ('WebApps', A)]
+
+    # A repo back in a sheet has the values it was recorded with
+    rows = history.rows(3)
+    assert sorted(rows) == [
+        ('GitHub', A), ('GitHub', B), ('GitHub', C), ('WebApps', A)]
+    assert rows[('GitHub', A)]['Version'] == '1.1'
+    assert rows[('GitHub', B)] == RepoRow(
+        url=B, name='b', version='1.0').as_dict()
+
+    # Without mark_removed, repos not listed are kept
+    assert sorted(history.rows()) == sorted(rows)
+    assert history.rows()[('GitHub', A)]['Version'] == '1.2'
+
+
+def test_diff(history):
+    assert history.diff(1, 2) == {
+        'added': [],
+        'removed': [('GitHub', B)],
+        'changed': [('GitHub', A, 'Version', '1.0', '1.1')],
+    }
+    assert history.diff(2, 3) == {
+        'added': [('GitHub', B)], 'removed': [], 'changed': []}
+
+    # B is back as it was, only A changed
+    assert history.diff(1, 4) == {
+        'added': [], 'removed': [],
+        'changed': [('GitHub', A, 'Version', '1.0', '1.2')]}
+    assert format_diff(history.diff(1, 2)) == [
+        f'GitHub: removed {B}', f"GitHub: {A} Version: '1.0' -> '1.1'"]
+
+
+def test_diff_reads_changed_repos(history):
+    # Only the repos runs 3 and 4 changed are read, not C or A's webapp
+    cells, removed = history._state(2, changed_between=(2, 4))
+    assert sorted(cells) == [('GitHub', A), ('GitHub', B)]
+    assert removed == {('GitHub', B)}
+
+
+def test_column_history(history):
+    assert [(run, sheet, value) for run, started, sheet, url, value in (
+        history.column_history('Version', url=A))] == [
+            (1, 'GitHub', '1.0'), (2, 'GitHub', '1.1'), (4, 'GitHub', '1.2')]
+    assert [(run, url, value) for run, started, sheet, url, value in (
+        history.column_history(REMOVED, sheet='GitHub'))] == [
+            (2, B, True), (3, B, False)]
+    assert history.column_history('Version', sheet='WebApps') == []
@@ -0,0 +1,73 @@
+# Copyright 2026 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import github_inventory_settings as settings
+import httpx
+import pytest
+
+from dao.aio import AsyncGitHub_DAO
+from dao.github import GitHub_DAO
+from dao.ratelimit import RateLimiter
+
+
+def get(url, use_async):
+    if not use_async:
+        return GitHub_DAO().get(url)
+
+    async def _get():
+        dao = AsyncGitHub_DAO()
+        try:
+            return await dao.get(url)
+        finally:
+            await dao.aclose()
+    return asyncio.run(_get())
+
+
+def test_throttled_wall_clock():
+    limiter = RateLimiter(10, 1)
+    limiter.acquire()
+
+    # Four waits for one token each take 0.4s, not their 1s total
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        waited = sum(executor.map(lambda i: limiter.acquire(), range(4)))
+    assert waited > 0.6
+    assert 0.3 < limiter.throttled < 0.6
+
+
+@pytest.mark.parametrize('use_async', [False, True])
+def test_retry(stub_server, rate_limiter, use_async):
+    stub_server.responses['/flaky'] = [
+        (503, {}, None),
+        (403, {'Retry-After': '0'}, 'secondary rate limit'),
+        (200, {}, {'tag_name': '1.0'}),
+    ]
+    resp = get(f'{stub_server.url}/flaky', use_async)
+    assert resp.status_code == 200
+    assert stub_server.requests == ['/flaky'] * 3
+    assert rate_limiter.retries == 2
+
+
+@pytest.mark.parametrize('use_async', [False, True])
+def test_retries_run_out(stub_server, rate_limiter, monkeypatch, use_async):
+    monkeypatch.setattr(settings, 'GITHUB_MAX_RETRIES', 1)
+    stub_server.responses['/down'] = [(502, {}, None)]
+    with pytest.raises(Exception, match='Status: 502'):
+        get(f'{stub_server.url}/down', use_async)
+    assert stub_server.requests == ['/down'] * 2
+
+
+@pytest.mark.parametrize('resource, remaining', [
+    ('core', 10), (None, 10), ('graphql', None)])
+def test_update_core_only(resource, remaining):
+    limiter = RateLimiter(10, 10)
+    headers = {'X-RateLimit-Remaining': '10', 'X-RateLimit-Reset': str(
+        int(time.time()) + 3600)}
+    if resource is not None:
+        headers['X-RateLimit-Resource'] = resource
+    limiter.update(httpx.Response(200, headers=headers))
+    assert limiter.remaining == remaining
+    assert limiter.rate == (0.1 if remaining is not None else 10)
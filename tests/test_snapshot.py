@@ -0,0 +1,100 @@
+# Copyright 2026 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+import pytest
+
+from dao.snapshot import RepoSnapshot, merge_partials, save_partial
+from rows import RepoRow, WebappRow
+
+REPO = {
+    'html_url': 'https://github.com/org/app',
+    'name': 'app',
+    'pushed_at': '2026-10-01T12:00:00Z',
+    'default_branch': 'main',
+    'language': 'Python',
+    'license': {'name': 'Apache License 2.0'},
+}
+
+
+def save_shards(tmp_path, listing, count=2):
+    paths = []
+    for index in range(count):
+        path = str(tmp_path / f'shard-{index}.json')
+        repo = {'html_url': f'https://github.com/org/app{index}',
+                'pushed_at': f'2026-0{index + 1}'}
+        save_partial(path, (index, count), [(repo, None)], listing)
+        paths.append(path)
+    return paths
+
+
+def test_merge_partials(tmp_path):
+    listing = {'orgs': ['org'], 'type': 'all', 'since': None}
+    results, merged_listing = merge_partials(save_shards(tmp_path, listing))
+    assert merged_listing == listing
+    assert [repo['html_url'] for repo, values in results] == [
+        'https://github.com/org/app1', 'https://github.com/org/app0']
+
+
+def test_merge_missing_shard(tmp_path):
+    with pytest.raises(Exception, match='missing'):
+        merge_partials(save_shards(tmp_path, None)[:1])
+
+
+def test_merge_different_listings(tmp_path):
+    paths = save_shards(tmp_path, {'orgs': ['org'], 'type': 'all',
+                                   'since': None})
+    save_partial(paths[1], (1, 2), [], {'orgs': ['org'], 'type': 'public',
+                                        'since': None})
+    with pytest.raises(Exception, match='different repo listings'):
+        merge_partials(paths)
+
+
+def test_merge_different_counts(tmp_path):
+    paths = save_shards(tmp_path, None)
+    paths.append(str(tmp_path / 'shard-2-of-3.json'))
+    save_partial(paths[2], (2, 3), [], None)
+    with pytest.raises(Exception, match=r'of \[2, 3\] shards'):
+        merge_partials(paths)
+
+
+def test_merge_repeated_shard(tmp_path):
+    paths = save_shards(tmp_path, None)
+    with pytest.raises(Exception, match='shard 1 twice'):
+        merge_partials(paths + paths[1:])
+
+
+def test_snapshot_fingerprint(tmp_path):
+    path = str(tmp_path / 'snapshot.json')
+    values = (RepoRow(url=REPO['html_url'], name='app', version='1.0'),
+              WebappRow(url=REPO['html_url'], name='app', vue='3.4.21'))
+    snapshot = RepoSnapshot(path)
+    assert snapshot.get(REPO) is None
+    snapshot.update(REPO, *values)
+    snapshot.save()
+
+    snapshot = RepoSnapshot(path)
+    assert snapshot.get(REPO) == values
+    assert snapshot.get(dict(REPO, stargazers_count=5)) == values
+
+    # Any change to what the values are derived from is a miss
+    for changes in [{'pushed_at': '2026-10-02T08:00:00Z'},
+                    {'default_branch': 'develop'}, {'name': 'app2'},
+                    {'language': 'Vue'}, {'license': None}]:
+        assert snapshot.get(dict(REPO, **changes)) is None
+
+
+def test_snapshot_prune(tmp_path):
+    path = str(tmp_path / 'snapshot.json')
+    other = dict(REPO, html_url='https://github.com/org/other')
+    snapshot = RepoSnapshot(path)
+    for repo in [REPO, other]:
+        snapshot.update(repo, RepoRow(url=repo['html_url']), None)
+
+    snapshot.save()
+    assert RepoSnapshot(path).get(other) is not None
+
+    # Only the repos listed are kept
+    snapshot.save([REPO])
+    snapshot = RepoSnapshot(path)
+    assert snapshot.get(REPO) is not None
+    assert snapshot.get(other) is None
@@ -0,0 +1,104 @@
+# Copyright 2026 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+import sys
+import time
+from argparse import Namespace
+
+import github_inventory_settings as settings
+import pytest
+
+import update_github_sheet
+from dao.snapshot import RepoSnapshot
+from rows import RepoRow, WebappRow
+from update_github_sheet import (
+    collect_incremental, lists_every_repo, parse_args, repo_listing)
+
+
+@pytest.fixture
+def argv(monkeypatch):
+    monkeypatch.setattr(settings, 'GITHUB_ORGS', ['uw-it-aca', 'other'])
+    monkeypatch.setattr(settings, 'GITHUB_SHARD', None, raising=False)
+
+    def _argv(*args):
+        monkeypatch.setattr(sys, 'argv', ['update_github_sheet.py', *args])
+        return parse_args()
+    return _argv
+
+
+@pytest.mark.parametrize('args, every_repo', [
+    ([], True),
+    (['--org', 'other', '--org', 'UW-IT-ACA'], True),
+    (['--org', 'uw-it-aca'], False),
+    (['--type', 'public'], False),
+    (['--type', 'sources'], False),
+    (['--since', '2026-01-01'], False),
+])
+def test_lists_every_repo(argv, args, every_repo):
+    assert lists_every_repo(repo_listing(argv(*args))) == every_repo
+
+
+@pytest.mark.parametrize('args, mark_removed', [
+    ([], True),
+    (['--type', 'public'], False),
+    (['--org', 'other'], False),
+])
+def test_run_marks_removed(argv, monkeypatch, args, mark_removed):
+    updates = []
+    monkeypatch.setattr(update_github_sheet, 'list_repos',
+                        lambda ghclient, args: [])
+    monkeypatch.setattr(update_github_sheet, 'collect',
+                        lambda repos, ghclient, args, checkpoint: [])
+    monkeypatch.setattr(
+        update_github_sheet, 'update_sheets',
+        lambda results, mark_removed, history_path: updates.append(
+            mark_removed))
+    update_github_sheet.run(argv('--checkpoint', '', *args))
+    assert updates == [mark_removed]
+
+
+def test_collect_incremental(tmp_path, monkeypatch):
+    def _repo(name):
+        return {'html_url': f'https://github.com/org/{name}', 'name': name,
+                'pushed_at': '2026-10-01T12:00:00Z',
+                'default_branch': 'main'}
+
+    def _values(repo, coverage):
+        return (RepoRow(url=repo['html_url'], coveralls=True,
+                        coverage=coverage),
+                WebappRow(url=repo['html_url'], coverage=coverage))
+
+    repos = [_repo(name) for name in ['stale', 'fresh', 'pushed']]
+    stale, fresh, pushed = repos
+    snapshot = RepoSnapshot(str(tmp_path / 'snapshot.json'))
+    snapshot.update(stale, *_values(stale, 50),
+                    coverage_updated=time.time() - 2 * 24 * 60 * 60)
+    snapshot.update(fresh, *_values(fresh, 60))
+    snapshot.update(pushed, *_values(pushed, 70))
+    pushed['pushed_at'] = '2026-10-02T08:00:00Z'
+
+    collected = []
+
+    def collect(repos, ghclient, args, checkpoint):
+        repos = list(repos)
+        collected.extend(repo['name'] for repo in repos)
+        return [(repo, _values(repo, 90)) for repo in repos]
+
+    class Coveralls:
+        def get_coverage(self, url, branch, has_js):
+            return (80, 40 if has_js else False)
+
+    monkeypatch.setattr(update_github_sheet, 'collect', collect)
+    monkeypatch.setattr(update_github_sheet, 'Coveralls_DAO', Coveralls)
+    monkeypatch.setattr(settings, 'COVERAGE_REFRESH_AGE', 24 * 60 * 60)
+
+    # Only the pushed repo is collected, and only the coverage of the
+    # repo whose coverage is more than a day old is read again
+    results = collect_incremental(
+        repos, None, snapshot, Namespace(workers=1), None)
+    assert collected == ['pushed']
+    assert [(repo['name'], values[0].coverage, values[1].coverage)
+            for repo, values in results] == [
+                ('stale', 80, 40), ('fresh', 60, 60), ('pushed', 90, 90)]
+    assert not snapshot.coverage_expired(stale, 24 * 60 * 60)
+    assert snapshot.get(pushed)[0].coverage == 90
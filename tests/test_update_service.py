@@ -0,0 +1,177 @@
+# Copyright 2026 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+import hashlib
+import hmac
+import json
+from threading import Condition, Thread
+from urllib.parse import urlencode
+
+import github_inventory_settings as settings
+import pytest
+import requests
+
+from update_service import (
+    RepoUpdater, WebhookServer, event_changes, valid_signature)
+
+BODY = b'{"zen": "Keep it logically awesome."}'
+
+
+@pytest.mark.parametrize('secret', [None, ''])
+def test_signature_without_secret(monkeypatch, secret):
+    monkeypatch.setattr(settings, 'WEBHOOK_SECRET', secret)
+    assert not valid_signature(BODY, None)
+    assert not valid_signature(BODY, 'sha256=')
+
+
+def test_signature(monkeypatch):
+    monkeypatch.setattr(settings, 'WEBHOOK_SECRET', 'secret')
+    signature = 'sha256=' + hmac.new(
+        b'secret', BODY, hashlib.sha256).hexdigest()
+    assert valid_signature(BODY, signature)
+    assert not valid_signature(BODY + b' ', signature)
+    assert not valid_signature(BODY, None)
+
+
+class StubUpdater(RepoUpdater):
+    """
+    Queues repos as RepoUpdater does, recording each one, but never
+    collects them.
+    """
+    def __init__(self, orgs):
+        self.orgs = {org.lower() for org in orgs}
+        self.queued = []
+        self._pending = {}
+        self._changed = Condition()
+
+    def queue(self, full_name, ref=None):
+        queued = super().queue(full_name, ref)
+        if queued:
+            self.queued.append((full_name, ref))
+        return queued
+
+
+REPOSITORY = {
+    'id': 1296269,
+    'name': 'app',
+    'full_name': 'uw-it-aca/app',
+    'owner': {'login': 'uw-it-aca', 'type': 'Organization'},
+    'html_url': 'https://github.com/uw-it-aca/app',
+    'default_branch': 'main',
+}
+
+PUSH = {
+    'ref': 'refs/heads/main',
+    'before': 'a' * 40,
+    'after': 'b' * 40,
+    'repository': REPOSITORY,
+    'pusher': {'name': 'octocat'},
+    'commits': [{'id': 'b' * 40, 'message': 'Update README.md'}],
+}
+
+RELEASE = {
+    'action': 'published',
+    'release': {'tag_name': '1.2.0', 'draft': False},
+    'repository': REPOSITORY,
+}
+
+RENAME = {
+    'action': 'renamed',
+    'changes': {'repository': {'name': {'from': 'old-app'}}},
+    'repository': REPOSITORY,
+}
+
+WORKFLOW_RUN = {
+    'action': 'completed',
+    'workflow_run': {'name': 'Build, Release and Deploy',
+                     'head_branch': 'main', 'conclusion': 'success'},
+    'repository': REPOSITORY,
+}
+
+
+@pytest.fixture
+def webhook(monkeypatch):
+    monkeypatch.setattr(settings, 'WEBHOOK_SECRET', 'secret')
+    server = WebhookServer(0, StubUpdater(['uw-it-aca']))
+    server.url = f'http://127.0.0.1:{server.server_port}'
+    Thread(target=server.serve_forever, args=(0.01,), daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def deliver(webhook, event, payload, form=False, secret=b'secret'):
+    if isinstance(payload, bytes):
+        body = payload
+    elif form:
+        body = urlencode({'payload': json.dumps(payload)}).encode('utf-8')
+    else:
+        body = json.dumps(payload).encode('utf-8')
+    headers = {'X-GitHub-Event': event, 'Content-Type': (
+        'application/x-www-form-urlencoded' if form else 'application/json')}
+    if secret is not None:
+        headers['X-Hub-Signature-256'] = 'sha256=' + hmac.new(
+            secret, body, hashlib.sha256).hexdigest()
+    return requests.post(webhook.url, data=body, headers=headers, timeout=5)
+
+
+@pytest.mark.parametrize('event, payload, queued', [
+    ('push', PUSH, [('uw-it-aca/app', 'refs/heads/main')]),
+    ('push', dict(PUSH, ref='refs/heads/feature'),
+     [('uw-it-aca/app', 'refs/heads/feature')]),
+    ('release', RELEASE, [('uw-it-aca/app', None)]),
+    ('repository', RENAME,
+     [('uw-it-aca/app', None), ('uw-it-aca/old-app', None)]),
+    ('workflow_run', WORKFLOW_RUN, [('uw-it-aca/app', 'refs/heads/main')]),
+    ('workflow_run', dict(WORKFLOW_RUN, action='requested'), []),
+    ('star', dict(RELEASE, action='created'), []),
+    ('push', dict(PUSH, repository=dict(
+        REPOSITORY, full_name='other/app', owner={'login': 'other'})), []),
+])
+@pytest.mark.parametrize('form', [False, True])
+def test_webhook(webhook, event, payload, queued, form):
+    resp = deliver(webhook, event, payload, form)
+    assert resp.status_code == 202
+    assert resp.json() == {'event': event, 'queued': [
+        full_name for full_name, ref in queued]}
+    assert webhook.updater.queued == queued
+
+    resp = requests.get(webhook.url, timeout=5)
+    assert resp.json() == {'pending': len(queued)}
+
+
+@pytest.mark.parametrize('secret', [b'wrong', None])
+def test_webhook_signature(webhook, secret):
+    resp = deliver(webhook, 'push', PUSH, secret=secret)
+    assert resp.status_code == 401
+    assert webhook.updater.queued == []
+
+
+@pytest.mark.parametrize('body, form', [
+    (b'{"ref":', False),
+    (b'ref=refs%2Fheads%2Fmain', True),
+    (b'payload=%7B%22ref%22%3A', True),
+])
+def test_webhook_invalid_payload(webhook, body, form):
+    resp = deliver(webhook, 'push', body, form)
+    assert resp.status_code == 400
+    assert webhook.updater.queued == []
+
+
+@pytest.mark.parametrize('event, changes', [
+    ({'type': 'PushEvent', 'repo': {'name': 'uw-it-aca/app'},
+      'payload': {'ref': 'refs/heads/main'}},
+     [('uw-it-aca/app', 'refs/heads/main')]),
+    ({'type': 'ReleaseEvent', 'repo': {'name': 'uw-it-aca/app'},
+      'payload': {'action': 'published'}}, [('uw-it-aca/app', None)]),
+    ({'type': 'PublicEvent', 'repo': {'name': 'uw-it-aca/app'},
+      'payload': {}}, [('uw-it-aca/app', None)]),
+    ({'type': 'CreateEvent', 'repo': {'name': 'uw-it-aca/app'},
+      'payload': {'ref_type': 'repository'}}, [('uw-it-aca/app', None)]),
+    ({'type': 'CreateEvent', 'repo': {'name': 'uw-it-aca/app'},
+      'payload': {'ref_type': 'branch', 'ref': 'feature'}}, []),
+    ({'type': 'WatchEvent', 'repo': {'name': 'uw-it-aca/app'},
+      'payload': {'action': 'started'}}, []),
+])
+def test_event_changes(event, changes):
+    assert event_changes(event) == changes
@@ -0,0 +1,226 @@
+# Copyright 2026 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+import hashlib
+
+import pytest
+import yaml
+
+from utils import (
+    analyze_workflow, get_workflow_values, resolve_workflow_values)
+
+CICD_YML = b'''
+on:
+  push:
+    branches: [main]
+
+env:
+  APP_NAME: app
+  COVERAGE_DJANGO_VERSION: '4.2'
+
+jobs:
+  context:
+    runs-on: ubuntu-latest
+    steps:
+      - uses: uw-it-aca/actions/cicd-context@main
+
+  test:
+    runs-on: ubuntu-latest
+    needs: context
+    steps:
+      - uses: actions/checkout@v4
+      - uses: actions/setup-python@v5
+        with:
+          python-version: '3.10'
+      - uses: uw-it-aca/actions/python-linters@main
+        with:
+          app_name: app
+          exclude_paths: 'app/migrations'
+          linter: ruff
+      - name: Run Python tests
+        run: python -m compileall app/
+      - run: coveralls
+
+  build:
+    runs-on: ubuntu-latest
+    needs: test
+    steps:
+      - uses: uw-it-aca/actions/container-vuln-scan@main
+      - name: Run JavaScript tests
+        run: docker run -u root -t app npm run coverage && coveralls
+      - uses: actions/setup-python@v5
+        with:
+          python-version: '3.12'
+
+  publish:
+    runs-on: ubuntu-latest
+    needs: build
+    steps:
+      - uses: uw-it-aca/actions/publish-pypi@main
+'''
+
+# An older workflow, linted with pycodestyle and with the Python
+# version of the coverage run in its env
+OLD_CICD_YML = b'''
+env:
+  COVERAGE_PYTHON_VERSION: '3.8'
+
+jobs:
+  test:
+    steps:
+      - uses: actions/setup-python@v2
+        with:
+          python-version: '3.6'
+      - run: pycodestyle app/ --exclude=migrations
+      - uses: uw-it-aca/actions/python-linters@main
+  build:
+    steps:
+      - run: docker build .
+'''
+
+
+def parse_github_action_values(repo, data):
+    """
+    The cicd.yml parser the workflow rules replaced, as it was.
+    """
+    values = {}
+    config = yaml.full_load(data)
+    for step in config.get('jobs', {}).get('test', {}).get('steps', []):
+        if 'run' in step:
+            if step.get('run').startswith('pycodestyle'):
+                values['Linter'] = 'Pycodestyle'
+            elif step.get('run').startswith('coveralls'):
+                values['Coveralls'] = True
+        if 'with' in step and 'python-version' in step.get('with'):
+            python_version = step.get('with').get('python-version')
+            values['Language'] = f'Python{python_version}'
+        if 'uses' in step:
+            if 'uw-it-aca/actions/python-linters' in step.get('uses'):
+                if repo.get('license'):
+                    license_name = repo.get('license').get('name')
+                    values['License'] = f'{license_name} with src headers'
+                if 'with' in step and 'linter' in step.get('with'):
+                    values['Linter'] = step.get('with').get(
+                        'linter').capitalize()
+            elif 'uw-it-aca/actions/container-vuln-scan' in step.get('uses'):
+                values['Trivy'] = 'Yes'
+
+    for step in config.get('jobs', {}).get('build', {}).get('steps', []):
+        if 'run' in step and 'coveralls' in step.get('run'):
+            values['JSHint'] = True
+            values['Coveralls'] = True
+        if 'with' in step and 'python-version' in step.get('with'):
+            python_version = step.get('with').get('python-version')
+            values['Language'] = f'Python{python_version}'
+        if 'uses' in step:
+            if 'uw-it-aca/actions/python-linters' in step.get('uses'):
+                if repo.get('license'):
+                    license_name = repo.get('license').get('name')
+                    values['License'] = f'{license_name} with src headers'
+                if 'with' in step and 'linter' in step.get('with'):
+                    values['Linter'] = step.get('with').get(
+                        'linter').capitalize()
+            elif 'uw-it-aca/actions/container-vuln-scan' in step.get('uses'):
+                values['Trivy'] = 'Yes'
+
+    for step in config.get('jobs', {}).get('publish', {}).get('steps', []):
+        if ('uses' in step and
+                'uw-it-aca/actions/publish-pypi' in step.get('uses')):
+            values['PyPI'] = True
+
+    if config.get('env', {}).get('COVERAGE_PYTHON_VERSION'):
+        python_version = config.get('env').get('COVERAGE_PYTHON_VERSION')
+        values['Language'] = f'Python{python_version}'
+
+    return values
+
+
+@pytest.mark.parametrize('data', [CICD_YML, OLD_CICD_YML])
+@pytest.mark.parametrize('license', [{'name': 'Apache License 2.0'}, None])
+def test_cicd_parity(data, license):
+    repo = {'license': license}
+    assert resolve_workflow_values(repo, analyze_workflow(data)) == (
+        parse_github_action_values(repo, data))
+
+
+def test_analyze_workflow():
+    assert analyze_workflow(CICD_YML) == {
+        'Language': 'Python3.12',
+        'License': '{license} with src headers',
+        'Linter': 'Ruff',
+        'Coveralls': True,
+        'JSHint': True,
+        'Trivy': 'Yes',
+        'PyPI': True,
+    }
+
+    # The env rule is applied after the jobs
+    assert analyze_workflow(OLD_CICD_YML) == {
+        'Language': 'Python3.8',
+        'License': '{license} with src headers',
+        'Linter': 'Pycodestyle',
+    }
+    assert analyze_workflow(b'- not a workflow') == {}
+
+
+def test_license_placeholder():
+    values = {'License': '{license} with src headers', 'Trivy': 'Yes'}
+    assert resolve_workflow_values(
+        {'license': {'name': 'MIT License'}}, values) == {
+            'License': 'MIT License with src headers', 'Trivy': 'Yes'}
+    assert resolve_workflow_values({'license': None}, values) == {
+        'Trivy': 'Yes'}
+    assert values['License'] == '{license} with src headers'
+
+
+def test_job_precedence():
+    # The build job's python-version wins, wherever it is in the file
+    assert analyze_workflow(b'''
+jobs:
+  build:
+    steps:
+      - with: {python-version: '3.12'}
+  test:
+    steps:
+      - with: {python-version: '3.10'}
+''') == {'Language': 'Python3.12'}
+
+
+class WorkflowFiles:
+    def __init__(self, files):
+        self.files = files
+
+    def get_workflow_files(self, url, trees_url, default_branch):
+        return sorted(
+            (name, hashlib.sha1(content, usedforsecurity=False).hexdigest())
+            for name, content in self.files.items())
+
+    def get_file(self, url, default_branch, path):
+        return self.files.get(path.rpartition('/')[2])
+
+
+def test_workflow_precedence(value_cache):
+    repo = {'html_url': 'https://github.com/org/app', 'default_branch': 'main',
+            'trees_url': '', 'license': None}
+    python_test = b'''
+jobs:
+  test:
+    steps:
+      - with: {python-version: '3.13'}
+      - run: pycodestyle .
+'''
+
+    # cicd.yml takes precedence over the workflows named after it
+    values = get_workflow_values(repo, WorkflowFiles({
+        'cicd.yml': CICD_YML, 'python-test.yml': python_test}))
+    assert (values['Language'], values['Linter']) == ('Python3.12', 'Ruff')
+
+    values = get_workflow_values(repo, WorkflowFiles({
+        'python-test.yml': python_test, 'trivy.yml': b'''
+jobs:
+  scan:
+    steps:
+      - uses: uw-it-aca/actions/container-vuln-scan@main
+'''}))
+    assert values == {
+        'Language': 'Python3.13', 'Linter': 'Pycodestyle', 'Trivy': 'Yes'}
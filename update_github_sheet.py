@@ -2,14 +2,29 @@
 # Copyright 2026 UW-IT, University of Washington
 # SPDX-License-Identifier: Apache-2.0
 
+import argparse
+import asyncio
+import heapq
 import logging
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 
 import github_inventory_settings as settings
 
+from dao.aio import AsyncCoveralls_DAO, AsyncGitHub_DAO, AsyncLimiter
+from dao.cache import get_response_cache
+from dao.coveralls import Coveralls_DAO
 from dao.github import GitHub_DAO
+from dao.gitmirror import GitMirror, GitMirror_DAO
 from dao.google import GoogleSheet_DAO
-from utils import get_repo_values
+from dao.history import HistoryStore, format_diff
+from dao.metrics import get_metrics
+from dao.ratelimit import get_rate_limiter
+from dao.snapshot import (
+    RepoSnapshot, RunCheckpoint, merge_partials, save_partial, shard_of)
+from utils import get_repo_values, get_repo_values_async
 
 # setup basic logging
 logging.basicConfig(level=logging.INFO,
@@ -17,36 +32,462 @@ logging.basicConfig(level=logging.INFO,
                             '%(funcName)s():%(lineno)d:'
                             ' %(message)s'),
                     handlers=(logging.StreamHandler(sys.stdout),))
+# httpx logs every request of the async engine at INFO
+logging.getLogger('httpx').setLevel(logging.WARNING)
 
 logger = logging.getLogger(__name__)
 
 
-if __name__ == '__main__':
+def iso_timestamp(value):
+    """
+    Parses an ISO 8601 date or time, UTC unless it says otherwise, into
+    the format of GitHub's timestamps so the two compare as strings.
+    """
+    try:
+        when = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError as ex:
+        raise argparse.ArgumentTypeError(str(ex)) from ex
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return when.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def shard_spec(value):
+    """
+    Parses INDEX/COUNT, such as 0/4 for the first of four shards.
+    """
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError as ex:
+        raise argparse.ArgumentTypeError(
+            f'{value} is not INDEX/COUNT') from ex
+    if not 0 <= index < count:
+        raise argparse.ArgumentTypeError(f'{value} is not INDEX/COUNT')
+    return (index, count)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Update the technology inventory spreadsheet')
+    parser.add_argument(
+        '--org', dest='orgs', action='append',
+        help='GitHub org to inventory, repeat for several, default '
+             'GITHUB_ORGS or GITHUB_ORG')
+    parser.add_argument(
+        '--shard', type=shard_spec,
+        default=shard_spec(settings.GITHUB_SHARD) if (
+            getattr(settings, 'GITHUB_SHARD', None)) else None,
+        help='only collect shard INDEX/COUNT of the repos and save it to '
+             '--partial instead of updating the sheet')
+    parser.add_argument(
+        '--partial', help='file for the --shard results, default '
+                          'inventory-shard-INDEX-of-COUNT.json')
+    parser.add_argument(
+        '--merge', nargs='+', metavar='PARTIAL',
+        help='update the sheet from the partial results of every shard')
+    parser.add_argument(
+        '--type', dest='repo_type',
+        default=getattr(settings, 'GITHUB_REPO_TYPE', 'all'),
+        choices=['all', 'public', 'private', 'forks', 'sources', 'member'],
+        help='type of org repos to inventory')
+    parser.add_argument(
+        '--since', type=iso_timestamp,
+        help='only inventory repos pushed since this ISO 8601 date or time')
+    parser.add_argument(
+        '--workers', type=int,
+        default=getattr(settings, 'GITHUB_WORKERS', 1),
+        help='number of repositories to collect concurrently')
+    parser.add_argument(
+        '--async', dest='use_async', action='store_true',
+        help='collect with the asyncio/HTTP-2 fetch engine')
+    parser.add_argument(
+        '--graphql', action='store_true',
+        help='prefetch repo files in GraphQL batches')
+    parser.add_argument(
+        '--mirror', default=getattr(settings, 'GITHUB_MIRROR_PATH', None),
+        help='read repos, trees and files from the bare clones in this '
+             'directory instead of GitHub')
+    parser.add_argument(
+        '--sync', action='store_true',
+        help='fetch the org listings and clones into --mirror first')
+    parser.add_argument(
+        '--incremental', action='store_true',
+        help='only recompute repos pushed since the last run')
+    parser.add_argument(
+        '--snapshot', default=getattr(
+            settings, 'SNAPSHOT_PATH', 'repo_snapshot.json'),
+        help='file holding the values computed by the last run')
+    parser.add_argument(
+        '--checkpoint', default=getattr(settings, 'CHECKPOINT_PATH', None),
+        help='stream collected values to this file and resume from it')
+    parser.add_argument(
+        '--history', default=getattr(settings, 'HISTORY_PATH', None),
+        help='record the rows of each run in this SQLite file and log '
+             'the changes since the last one')
+    parser.add_argument(
+        '--report', default=getattr(settings, 'RUN_REPORT_PATH', None),
+        help='write a run report here, a Prometheus textfile if it ends '
+             'in .prom, otherwise JSON')
+    args = parser.parse_args()
+    if args.sync and not args.mirror:
+        parser.error('--sync requires --mirror')
+    if args.mirror and args.use_async:
+        parser.error('--mirror cannot be used with --async')
+    if args.graphql and args.use_async:
+        parser.error('--graphql cannot be used with --async')
+    if not args.orgs:
+        args.orgs = configured_orgs()
+    if args.shard is not None and args.partial is None:
+        args.partial = 'inventory-shard-{}-of-{}.json'.format(*args.shard)
+    return args
+
+
+def configured_orgs():
+    return getattr(settings, 'GITHUB_ORGS', None) or [
+        getattr(settings, 'GITHUB_ORG', '')]
+
+
+def repo_listing(args):
+    """
+    Describes the repos a run with args lists, across all its shards.
+    """
+    return {
+        'orgs': sorted({org.lower() for org in args.orgs}),
+        'type': args.repo_type,
+        'since': args.since,
+    }
+
+
+def lists_every_repo(listing):
+    """
+    Whether a repo_listing holds every repo of the configured orgs, so
+    that the sheet's rows for any other repo are no longer listed.
+    Listing only some orgs, types of repo or recent pushes does not.
+    """
+    return listing['since'] is None and listing['type'] == 'all' and (
+        listing['orgs'] == sorted({org.lower() for org in configured_orgs()}))
+
+
+def list_repos(ghclient, args):
+    """
+    Yields the repos of every org in args.orgs, most recently pushed
+    first, limited to this process's shard.
+    """
+    repos = heapq.merge(*[
+        ghclient.get_repositories_for_org(org, args.repo_type, args.since)
+        for org in args.orgs],
+        key=lambda repo: repo.get('pushed_at') or '', reverse=True)
+
+    if args.shard is not None:
+        index, count = args.shard
+        repos = (repo for repo in repos if shard_of(repo, count) == index)
+    return repos
+
+
+def map_repos(func, repos, workers=1, on_result=None):
+    """
+    Returns func(repo) for each repo, in the order given.  A repo that
+    fails is logged and returned as None so that the rest of the run
+    can complete.  Successful results are also passed to on_result as
+    soon as each one is ready.
+    """
+    def _call(repo):
+        try:
+            result = func(repo)
+        except Exception as ex:
+            logger.error(f'Error collecting {repo.get("html_url")}: {ex}')
+            return None
+        if on_result is not None:
+            on_result(repo, result)
+        return result
+
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(_call, repos))
+
+    return [_call(repo) for repo in repos]
+
+
+def sync_mirror(mirror, args):
+    """
+    Fetches this shard's repos of every org in args.orgs into mirror,
+    recording each repo's latest release, and saves the org listings.
+    """
+    ghclient = GitHub_DAO()
+
+    def _sync(repo):
+        mirror.sync(repo)
+        repo['latest_release'] = ghclient.get_current_version(
+            repo['releases_url'])
+        return repo
+
+    for org in args.orgs:
+        repos = list(ghclient.get_repositories_for_org(org, args.repo_type))
+        synced = repos
+        if args.shard is not None:
+            index, count = args.shard
+            synced = [repo for repo in repos if (
+                shard_of(repo, count) == index)]
+
+        with get_metrics().span('mirror sync'):
+            map_repos(_sync, synced, args.workers)
+        mirror.save_listing(org, repos)
+        logger.info(f'Synced {len(synced)} of {len(repos)} {org} repos '
+                    f'into {mirror.path}')
+
+
+def collect_repo_values(repos, ghclient, workers=1, on_result=None):
+    """
+    Returns a (RepoRow, WebappRow or None) tuple, or None on failure,
+    for each repo, in the order given.
+    """
+    metrics = get_metrics()
+
+    def _collect(repo):
+        with metrics.span('repo', repo=repo['html_url']):
+            return get_repo_values(repo, ghclient)
+
+    return map_repos(_collect, repos, workers, on_result)
+
+
+async def collect_repo_values_async(repos, on_result=None):
+    """
+    Async counterpart of collect_repo_values, all requests share one
+    concurrency limit set by GITHUB_ASYNC_CONCURRENCY.
+    """
+    limiter = AsyncLimiter()
+    ghclient = AsyncGitHub_DAO(limiter)
+    coveralls = AsyncCoveralls_DAO(limiter)
+
+    metrics = get_metrics()
+
+    async def _collect(repo):
+        try:
+            with metrics.span('repo', repo=repo['html_url']):
+                result = await get_repo_values_async(
+                    repo, ghclient, coveralls)
+        except Exception as ex:
+            logger.error(f'Error collecting {repo.get("html_url")}: {ex}')
+            return None
+        if on_result is not None:
+            on_result(repo, result)
+        return result
+
+    try:
+        return await asyncio.gather(*[_collect(repo) for repo in repos])
+    finally:
+        await ghclient.aclose()
+        await coveralls.aclose()
+
+
+def collect(repos, ghclient, args, checkpoint=None):
+    """
+    Collects values for repos with the engine selected by args, and
+    returns (repo, values) pairs in the order repos were listed.  repos
+    may be a generator still paging through the org, the threaded
+    engine starts on each repo as soon as it is listed.  With a
+    checkpoint, repos it already holds are not collected again, and
+    each new result is streamed to it as soon as it is ready.
+    """
+    listed = []
+    pending = []
+    done = {}
+
+    def _pending():
+        for repo in repos:
+            listed.append(repo)
+            values = checkpoint.get(repo) if checkpoint is not None else None
+            if values is not None:
+                done[repo['html_url']] = values
+            else:
+                pending.append(repo)
+                yield repo
+
+    on_result = checkpoint.put if checkpoint is not None else None
     try:
-        github_org = getattr(settings, 'GITHUB_ORG', '')
+        if args.use_async:
+            results = asyncio.run(
+                collect_repo_values_async(list(_pending()), on_result))
+        elif args.graphql:
+            # Prefetch batches need the whole list up front
+            ghclient.prefetch_files(list(_pending()))
+            results = collect_repo_values(
+                pending, ghclient, args.workers, on_result)
+        else:
+            results = collect_repo_values(
+                _pending(), ghclient, args.workers, on_result)
+    finally:
+        if checkpoint is not None:
+            checkpoint.close()
+
+    if done:
+        logger.info(f'Resumed from checkpoint, {len(done)} of {len(listed)}'
+                    ' repos already collected')
+
+    done.update(zip([repo['html_url'] for repo in pending], results))
+    return [(repo, done[repo['html_url']]) for repo in listed]
+
+
+def collect_incremental(repos, ghclient, snapshot, args, checkpoint=None):
+    """
+    Recomputes only the repos whose fingerprint changed since the
+    snapshot was saved.  Coverage lives outside the repo, so for the
+    others it is refreshed once it is older than COVERAGE_REFRESH_AGE.
+    """
+    listed = []
+
+    def _changed():
+        for repo in repos:
+            listed.append(repo)
+            if snapshot.get(repo) is None:
+                yield repo
+
+    changed = collect(_changed(), ghclient, args, checkpoint)
+    logger.info(f'{len(changed)} of {len(listed)} repos changed since the '
+                'last run')
+
+    now = time.time()
+    collected = {}
+    for repo, values in changed:
+        collected[repo['html_url']] = values
+        if values is not None:
+            snapshot.update(repo, *values, coverage_updated=now)
+
+    max_age = getattr(settings, 'COVERAGE_REFRESH_AGE', 24 * 60 * 60)
+    expired = [repo for repo in listed if (
+        repo['html_url'] not in collected and
+        snapshot.coverage_expired(repo, max_age) and
+        snapshot.get(repo)[0].coveralls)]
+    coveralls = Coveralls_DAO()
+
+    def _refresh_coverage(repo):
+        repo_row, webapp_row = snapshot.get(repo)
+        (coverage, js_coverage) = coveralls.get_coverage(
+            repo['html_url'], repo['default_branch'],
+            has_js=webapp_row is not None)
+        repo_row.coverage = coverage
+        if webapp_row:
+            webapp_row.coverage = js_coverage
+        snapshot.update(repo, repo_row, webapp_row, coverage_updated=now)
 
-        repo_list = []
-        webapp_list = []
-        for repo in GitHub_DAO().get_repositories_for_org(github_org):
-            if not repo.get('archived'):  # Active repos only
-                repo_values, webapp_values = get_repo_values(repo)
+    map_repos(_refresh_coverage, expired, args.workers)
 
-                # logger.info(', '.join(f"{k}: {v}" for k, v in repo_values.items()))
+    return [(repo, collected[repo['html_url']]) if (
+        repo['html_url'] in collected) else (repo, snapshot.get(repo))
+        for repo in listed]
 
-                repo_list.append(repo_values)
-                if webapp_values:
-                    webapp_list.append(webapp_values)
 
-        GoogleSheet_DAO().update_sheet(
-            getattr(settings, 'GOOGLE_SHEET_ID', ''),
-            getattr(settings, 'REPO_WORKSHEET_NAME', ''),
-            repo_list)
+def update_sheets(results, mark_removed=True, history_path=None):
+    """
+    Upserts the collected rows, and records them in the history file
+    if given.  With mark_removed, results holds every listed repo, so
+    rows for any other repo are marked removed.
+    """
+    repo_list = []
+    webapp_list = []
+    failed = []
+    for repo, values in results:
+        if values is None:
+            failed.append(repo['html_url'])
+            continue
 
-        GoogleSheet_DAO().update_sheet(
-            getattr(settings, 'GOOGLE_SHEET_ID', ''),
-            getattr(settings, 'WEBAPP_WORKSHEET_NAME', ''),
-            webapp_list)
+        repo_row, webapp_row = values
+
+        # logger.info(repo_row)
+
+        repo_list.append(repo_row)
+        if webapp_row:
+            webapp_list.append(webapp_row)
+
+    if failed:
+        logger.warning(f'{len(failed)} of {len(results)} repos failed')
+
+    worksheets = {
+        getattr(settings, 'REPO_WORKSHEET_NAME', ''): repo_list,
+        getattr(settings, 'WEBAPP_WORKSHEET_NAME', ''): webapp_list,
+    }
+    with get_metrics().span('update sheets'):
+        GoogleSheet_DAO().update_sheets(
+            getattr(settings, 'GOOGLE_SHEET_ID', ''), worksheets,
+            mark_removed, set(failed))
+
+    if history_path:
+        with get_metrics().span('history'):
+            history = HistoryStore(history_path)
+            last_run = history.latest_run()
+            run = history.record(worksheets, mark_removed, set(failed))
+            if last_run is not None:
+                for line in format_diff(history.diff(last_run, run)):
+                    logger.info(line)
+            history.close()
+
+
+def run(args):
+    """
+    Collects the repos, then updates the sheet, or with --shard saves
+    this shard's results for a --merge run to combine.
+    """
+    if args.mirror:
+        mirror = GitMirror(args.mirror)
+        if args.sync:
+            sync_mirror(mirror, args)
+        ghclient = GitMirror_DAO(mirror)
+    else:
+        ghclient = GitHub_DAO()
+    repos = list_repos(ghclient, args)
+
+    checkpoint = RunCheckpoint(args.checkpoint) if (
+        args.checkpoint) else None
+    with get_metrics().span('collect'):
+        if args.incremental:
+            snapshot = RepoSnapshot(args.snapshot)
+            results = collect_incremental(
+                repos, ghclient, snapshot, args, checkpoint)
+        else:
+            results = collect(repos, ghclient, args, checkpoint)
+
+    cache = get_response_cache()
+    if cache is not None:
+        cache.flush()
+        cache.log_stats()
+    get_rate_limiter().log_stats()
+
+    listing = repo_listing(args)
+    if args.shard is not None:
+        save_partial(args.partial, args.shard, results, listing)
+        index, count = args.shard
+        logger.info(f'Saved {len(results)} repos of shard {index}/{count} '
+                    f'to {args.partial}')
+    else:
+        update_sheets(results, mark_removed=lists_every_repo(listing),
+                      history_path=args.history)
+
+    if args.incremental:
+        # Only prune the repos no longer listed if every repo was listed
+        listed = [repo for repo, values in results]
+        snapshot.save(listed if args.shard is None and (
+            lists_every_repo(listing)) else None)
+    if checkpoint is not None:
+        checkpoint.clear()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    metrics = get_metrics()
+    try:
+        if args.merge:
+            # The shards may have listed only some of the repos
+            results, listing = merge_partials(args.merge)
+            update_sheets(results, mark_removed=listing is not None and (
+                lists_every_repo(listing)), history_path=args.history)
+        else:
+            run(args)
 
     except Exception as ex:
         logger.exception('ERROR')
         logger.critical(ex)
+
+    finally:
+        metrics.log_summary()
+        if args.report:
+            metrics.write_report(args.report, get_rate_limiter().stats())
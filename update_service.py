@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# Copyright 2026 UW-IT, University of Washington
+# SPDX-License-Identifier: Apache-2.0
+
+import argparse
+import hashlib
+import hmac
+import json
+import logging
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Condition, Thread
+from urllib.parse import parse_qs
+
+import github_inventory_settings as settings
+
+from dao.github import GitHub_DAO
+from dao.google import GoogleSheet_DAO
+from dao.metrics import reset_metrics
+from utils import get_repo_values
+
+# setup basic logging
+logging.basicConfig(level=logging.INFO,
+                    format=('%(asctime)s %(levelname)s %(module)s.'
+                            '%(funcName)s():%(lineno)d:'
+                            ' %(message)s'),
+                    handlers=(logging.StreamHandler(sys.stdout),))
+
+logger = logging.getLogger(__name__)
+
+GITHUB_URL = 'https://github.com'
+
+
+def webhook_changes(event, payload):
+    """
+    Returns (full_name, ref) for each repo a webhook event affects.  A
+    push gives its ref, which only matters on the default branch, the
+    other events None.
+    """
+    repo = payload.get('repository')
+    if repo is None:
+        return []
+
+    full_name = repo['full_name']
+    if event == 'push':
+        return [(full_name, payload.get('ref'))]
+    if event == 'release':
+        return [(full_name, None)]
+    if event == 'workflow_run':
+        # Coverage is reported by CI after the push
+        run = payload.get('workflow_run') or {}
+        if payload.get('action') == 'completed' and run.get('head_branch'):
+            return [(full_name, f'refs/heads/{run["head_branch"]}')]
+        return []
+    if event == 'repository':
+        changes = [(full_name, None)]
+        old_name = (((payload.get('changes') or {}).get(
+            'repository') or {}).get('name') or {}).get('from')
+        if old_name:
+            changes.append((f'{repo["owner"]["login"]}/{old_name}', None))
+        return changes
+    return []
+
+
+def event_changes(event):
+    """
+    Returns (full_name, ref) for each repo an org events API event
+    affects, as webhook_changes does.
+    """
+    full_name = event['repo']['name']
+    payload = event.get('payload') or {}
+    if event['type'] == 'PushEvent':
+        return [(full_name, payload.get('ref'))]
+    if event['type'] in ['ReleaseEvent', 'PublicEvent']:
+        return [(full_name, None)]
+    if event['type'] == 'CreateEvent' and (
+            payload.get('ref_type') == 'repository'):
+        return [(full_name, None)]
+    return []
+
+
+def valid_signature(body, signature):
+    """
+    Whether signature is the WEBHOOK_SECRET signature of body.  Without
+    a secret, no delivery can be verified.
+    """
+    secret = getattr(settings, 'WEBHOOK_SECRET', None)
+    if not secret:
+        return False
+
+    expected = 'sha256=' + hmac.new(
+        secret.encode('utf-8'), body, hashlib.sha256).hexdigest()
+    return signature is not None and hmac.compare_digest(expected, signature)
+
+
+class RepoUpdater:
+    """
+    Recomputes the repos that events name, one at a time, and patches
+    their rows in both worksheets.  A repo named again before it is
+    processed is only recomputed once.
+    """
+    def __init__(self, orgs):
+        self.orgs = {org.lower() for org in orgs}
+        self.ghclient = GitHub_DAO()
+        self.sheets = GoogleSheet_DAO()
+        self._pending = {}
+        self._changed = Condition()
+
+    @property
+    def pending(self):
+        with self._changed:
+            return len(self._pending)
+
+    def queue(self, full_name, ref=None):
+        """
+        Queues the repo to be recomputed, for a push to ref or, if ref
+        is None, for any change.  Returns False for other orgs' repos.
+        """
+        if full_name.split('/')[0].lower() not in self.orgs:
+            return False
+
+        with self._changed:
+            self._pending.setdefault(full_name, set()).add(ref)
+            self._changed.notify()
+        return True
+
+    def run(self):
+        while True:
+            with self._changed:
+                while not self._pending:
+                    self._changed.wait()
+                full_name = next(iter(self._pending))
+                refs = self._pending.pop(full_name)
+
+            try:
+                self.refresh(full_name, refs)
+            except Exception as ex:
+                logger.error(f'Error updating {full_name}: {ex}')
+
+    def refresh(self, full_name, refs):
+        repo = self.ghclient.get_repository(full_name)
+        if repo is None or repo.get('archived') or (
+                repo['owner']['login'].lower() not in self.orgs) or (
+                repo['full_name'].lower() != full_name.lower()):
+            # Deleted, archived, transferred or, if GitHub redirected
+            # the request, renamed
+            logger.info(f'{full_name} is no longer listed')
+            self.patch(f'{GITHUB_URL}/{full_name}', None, None)
+            return
+
+        if None not in refs and (
+                f'refs/heads/{repo["default_branch"]}' not in refs):
+            return
+
+        # Only the metrics of the current repo are kept
+        reset_metrics()
+        start = time.perf_counter()
+        # A new DAO for each repo, branch trees are kept for its lifetime
+        repo_row, webapp_row = get_repo_values(repo, GitHub_DAO())
+        self.patch(repo['html_url'], repo_row, webapp_row)
+        logger.info(f'Updated {full_name} in '
+                    f'{time.perf_counter() - start:.1f}s')
+
+    def patch(self, url, repo_row, webapp_row):
+        """
+        Upserts the repo's rows, marking the repo removed from each
+        worksheet it has no row for.
+        """
+        self.sheets.update_sheets(
+            getattr(settings, 'GOOGLE_SHEET_ID', ''), {
+                getattr(settings, 'REPO_WORKSHEET_NAME', ''): [
+                    repo_row] if repo_row is not None else [],
+                getattr(settings, 'WEBAPP_WORKSHEET_NAME', ''): [
+                    webapp_row] if webapp_row is not None else [],
+            }, removed={url})
+
+    def poll(self, interval):
+        """
+        Queues the repos named by new org events every interval
+        seconds, or as often as GitHub's poll interval allows.  Events
+        before the first poll are not replayed.
+        """
+        last_ids = {}
+        while True:
+            wait = interval
+            for org in self.orgs:
+                try:
+                    events, poll_interval = self.ghclient.get_org_events(org)
+                except Exception as ex:
+                    logger.error(f'Error polling {org} events: {ex}')
+                    continue
+
+                last_id = last_ids.get(org)
+                for event in reversed(events):
+                    if last_id is not None and int(event['id']) > last_id:
+                        for full_name, ref in event_changes(event):
+                            self.queue(full_name, ref)
+                if events:
+                    last_ids[org] = max(
+                        [int(event['id']) for event in events] +
+                        ([last_id] if last_id is not None else []))
+                wait = max(wait, poll_interval)
+            time.sleep(wait)
+
+
+class WebhookServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port, updater):
+        self.updater = updater
+        super().__init__(('', port), WebhookHandler)
+
+
+class WebhookHandler(BaseHTTPRequestHandler):
+    """
+    Accepts GitHub webhook deliveries, as JSON or form encoded, and
+    answers GETs as a health check.
+    """
+    def do_GET(self):
+        self._respond(200, {'pending': self.server.updater.pending})
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if not valid_signature(body, self.headers.get('X-Hub-Signature-256')):
+            self._respond(401, {'error': 'invalid signature'})
+            return
+
+        try:
+            if self.headers.get('Content-Type', '').startswith(
+                    'application/x-www-form-urlencoded'):
+                body = parse_qs(body.decode('utf-8'))['payload'][0]
+            payload = json.loads(body)
+        except (KeyError, ValueError) as ex:
+            self._respond(400, {'error': f'invalid payload: {ex}'})
+            return
+
+        event = self.headers.get('X-GitHub-Event', '')
+        queued = [full_name for full_name, ref in webhook_changes(
+            event, payload) if self.server.updater.queue(full_name, ref)]
+        self._respond(202, {'event': event, 'queued': queued})
+
+    def _respond(self, status, data):
+        content = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        logger.info(format % args)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Keep the technology inventory spreadsheet up to date '
+                    'from GitHub webhooks or org events')
+    parser.add_argument(
+        '--org', dest='orgs', action='append',
+        help='GitHub org to watch, repeat for several, default '
+             'GITHUB_ORGS or GITHUB_ORG')
+    parser.add_argument(
+        '--port', type=int, default=getattr(settings, 'PORT', 8000),
+        help='port to accept webhook deliveries on')
+    parser.add_argument(
+        '--poll', action='store_true',
+        help='also poll the org events API')
+    parser.add_argument(
+        '--poll-interval', type=int,
+        default=getattr(settings, 'GITHUB_POLL_INTERVAL', 60),
+        help='seconds between org events polls')
+    args = parser.parse_args()
+    if not getattr(settings, 'WEBHOOK_SECRET', None):
+        parser.error('WEBHOOK_SECRET must be set to verify deliveries')
+    if not args.orgs:
+        args.orgs = getattr(settings, 'GITHUB_ORGS', None) or [
+            getattr(settings, 'GITHUB_ORG', '')]
+    return args
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    updater = RepoUpdater(args.orgs)
+    Thread(target=updater.run, daemon=True).start()
+    if args.poll:
+        Thread(target=updater.poll, args=(args.poll_interval,),
+               daemon=True).start()
+
+    server = WebhookServer(args.port, updater)
+    logger.info(f'Watching {", ".join(sorted(updater.orgs))} on port '
+                f'{args.port}')
+    server.serve_forever()
@@ -1,15 +1,39 @@
 # Copyright 2026 UW-IT, University of Washington
 # SPDX-License-Identifier: Apache-2.0
 
+import asyncio
+import logging
 import re
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
 
+import github_inventory_settings as settings
 import yaml
 
+from dao.cache import get_value_cache
 from dao.coveralls import Coveralls_DAO
-from dao.github import GitHub_DAO
+from dao.github import WORKFLOWS_PATH, GitHub_DAO
+from dao.metrics import get_metrics
+from rows import RepoRow, WebappRow
+
+logger = logging.getLogger(__name__)
 
 PYCODESTYLE_RE = re.compile(r'.*--exclude=(.*)')
 
+coveralls = Coveralls_DAO()
+_coverage_executor = None
+_coverage_executor_lock = Lock()
+
+
+def get_coverage_executor():
+    global _coverage_executor
+    with _coverage_executor_lock:
+        if _coverage_executor is None:
+            _coverage_executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'COVERALLS_WORKERS', 4))
+    return _coverage_executor
+
 
 def stringify(value):
     if value is None:
@@ -21,137 +45,337 @@ def stringify(value):
     return value
 
 
-def parse_github_action_values(repo, data):
+def step_input(name, format_value):
+    def _value(step):
+        value = (step.get('with') or {}).get(name)
+        if value is not None:
+            return format_value(value)
+    return _value
+
+
+def python_language(version):
+    return f'Python{version}'
+
+
+# Placeholder for the repo's license name, filled in by
+# resolve_workflow_values since workflow results are shared across repos
+LICENSE_HEADERS = '{license} with src headers'
+
+WorkflowRule = namedtuple(
+    'WorkflowRule', ['jobs', 'field', 'match', 'pattern', 'values'])
+
+# Detections made on each step of each workflow job. jobs limits a rule
+# to the named jobs, None applies it to every job. values maps a column
+# to a constant, or to a function of the step returning None to skip.
+WORKFLOW_RULES = (
+    WorkflowRule(('test',), 'run', 'prefix', 'pycodestyle',
+                 {'Linter': 'Pycodestyle'}),
+    WorkflowRule(('test',), 'run', 'prefix', 'coveralls',
+                 {'Coveralls': True}),
+    WorkflowRule(('build',), 'run', 'contains', 'coveralls',
+                 {'JSHint': True, 'Coveralls': True}),
+    WorkflowRule(('test', 'build'), 'with', 'key', 'python-version',
+                 {'Language': step_input('python-version', python_language)}),
+    WorkflowRule(None, 'uses', 'contains', 'uw-it-aca/actions/python-linters',
+                 {'License': LICENSE_HEADERS,
+                  'Linter': step_input('linter', str.capitalize)}),
+    WorkflowRule(None, 'uses', 'contains',
+                 'uw-it-aca/actions/container-vuln-scan', {'Trivy': 'Yes'}),
+    WorkflowRule(None, 'uses', 'contains', 'uw-it-aca/actions/publish-pypi',
+                 {'PyPI': True}),
+)
+
+# Detections made on the workflow's top-level env, after its jobs
+WORKFLOW_ENV_RULES = {
+    'COVERAGE_PYTHON_VERSION': ('Language', python_language),
+}
+
+# Where rules detect a column more than once, the last value wins.  The
+# jobs named here are analyzed after the others, in this order, and the
+# repo's main workflow after its other workflows, in name order.
+JOB_PRECEDENCE = {'test': 1, 'build': 2, 'publish': 3}
+MAIN_WORKFLOW = 'cicd.yml'
+
+# Workflow results are memoized by blob SHA under this namespace.  Bump
+# the version whenever the rules change, so that results of earlier
+# rules are not reused.
+WORKFLOW_RULES_VERSION = 2
+WORKFLOW_NAMESPACE = f'workflow v{WORKFLOW_RULES_VERSION}'
+
+RULE_MATCHES = {
+    'prefix': lambda value, pattern: (
+        isinstance(value, str) and value.startswith(pattern)),
+    'contains': lambda value, pattern: (
+        isinstance(value, str) and pattern in value),
+    'key': lambda value, pattern: (
+        isinstance(value, dict) and pattern in value),
+}
+
+YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+def analyze_workflow(data):
+    """
+    Applies WORKFLOW_RULES to every step of every job, and
+    WORKFLOW_ENV_RULES to the env, of a workflow file in one pass.
+    """
     values = {}
-    config = yaml.full_load(data)
-    for step in config.get('jobs', {}).get('test', {}).get('steps', []):
-        if 'run' in step:
-            if step.get('run').startswith('pycodestyle'):
-                values['Linter'] = 'Pycodestyle'
-            elif step.get('run').startswith('coveralls'):
-                values['Coveralls'] = True
-        if 'with' in step and 'python-version' in step.get('with'):
-            python_version = step.get('with').get('python-version')
-            values['Language'] = f'Python{python_version}'
-        if 'uses' in step:
-            if 'uw-it-aca/actions/python-linters' in step.get('uses'):
-                if repo.get('license'):
-                    license_name = repo.get('license').get('name')
-                    values['License'] = f'{license_name} with src headers'
-                if 'with' in step and 'linter' in step.get('with'):
-                    values['Linter'] = step.get('with').get('linter').capitalize()
-            elif 'uw-it-aca/actions/container-vuln-scan' in step.get('uses'):
-                values['Trivy'] = 'Yes'
-
-    for step in config.get('jobs', {}).get('build', {}).get('steps', []):
-        if 'run' in step and 'coveralls' in step.get('run'):
-            values['JSHint'] = True
-            values['Coveralls'] = True
-        if 'with' in step and 'python-version' in step.get('with'):
-            python_version = step.get('with').get('python-version')
-            values['Language'] = f'Python{python_version}'
-        if 'uses' in step:
-            if 'uw-it-aca/actions/python-linters' in step.get('uses'):
-                if repo.get('license'):
-                    license_name = repo.get('license').get('name')
-                    values['License'] = f'{license_name} with src headers'
-                if 'with' in step and 'linter' in step.get('with'):
-                    values['Linter'] = step.get('with').get('linter').capitalize()
-            elif 'uw-it-aca/actions/container-vuln-scan' in step.get('uses'):
-                values['Trivy'] = 'Yes'
-
-    for step in config.get('jobs', {}).get('publish', {}).get('steps', []):
-        if ('uses' in step and
-                'uw-it-aca/actions/publish-pypi' in step.get('uses')):
-            values['PyPI'] = True
-
-    if config.get('env', {}).get('COVERAGE_PYTHON_VERSION'):
-        python_version = config.get('env').get('COVERAGE_PYTHON_VERSION')
-        values['Language'] = f'Python{python_version}'
+    config = yaml.load(data, Loader=YAML_LOADER)  # noqa: S506
+    if not isinstance(config, dict):
+        return values
+
+    jobs = config.get('jobs') or {}
+    for job_name in sorted(jobs, key=lambda name: JOB_PRECEDENCE.get(name, 0)):
+        job = jobs[job_name]
+        if not isinstance(job, dict):
+            continue
+        rules = [rule for rule in WORKFLOW_RULES if (
+            rule.jobs is None or job_name in rule.jobs)]
+        for step in job.get('steps') or []:
+            for rule in rules:
+                if RULE_MATCHES[rule.match](
+                        step.get(rule.field), rule.pattern):
+                    for column, value in rule.values.items():
+                        if callable(value):
+                            value = value(step)
+                        if value is not None:
+                            values[column] = value
+
+    for name, (column, format_value) in WORKFLOW_ENV_RULES.items():
+        value = (config.get('env') or {}).get(name)
+        if value:
+            values[column] = format_value(value)
 
     return values
 
 
-def get_repo_values(repo):
-    ghclient = GitHub_DAO()
+def analyze_workflow_file(url, name, content):
+    try:
+        return analyze_workflow(content)
+    except yaml.YAMLError as ex:
+        logger.warning(f'Error parsing {url} {name}: {ex}')
+        return {}
+
+
+def resolve_workflow_values(repo, values):
+    values = dict(values)
+    if values.get('License') == LICENSE_HEADERS:
+        if repo.get('license'):
+            values['License'] = LICENSE_HEADERS.format(
+                license=repo.get('license').get('name'))
+        else:
+            del values['License']
+    return values
+
+
+def workflow_precedence(files):
+    """
+    Orders a repo's (name, sha) workflow files in which their values
+    are applied, so that later ones take precedence.
+    """
+    return sorted(files, key=lambda file: (file[0] == MAIN_WORKFLOW, file))
+
+
+def get_workflow_values(repo, ghclient):
+    """
+    Combined rule results for all of a repo's workflow files.  Results
+    are memoized by blob SHA, since many repos share identical
+    workflow files, but not for files that could not be read.
+    """
     url = repo['html_url']
-    lang = repo['language'] or ''
     default_branch = repo['default_branch']
-    git_file_url = url.replace(
-        'https://github.com', 'https://raw.githubusercontent.com')
-    (has_js, has_css) = ghclient.get_has_statics(
-        repo['trees_url'], default_branch)
-
-    repo_values = {
-        'URL': url,
-        'Name': repo.get('name'),
-        'Language': lang,
-        'Last Updated': repo.get('pushed_at'),
-        'License': repo.get('license').get('name') if (
+    cache = get_value_cache()
+
+    values = {}
+    for name, sha in workflow_precedence(ghclient.get_workflow_files(
+            url, repo['trees_url'], default_branch)):
+        workflow_values = cache.get(WORKFLOW_NAMESPACE, sha)
+        if workflow_values is None:
+            content = ghclient.get_file(
+                url, default_branch, f'{WORKFLOWS_PATH}/{name}')
+            if content is None:
+                continue
+            workflow_values = analyze_workflow_file(url, name, content)
+            cache.set(WORKFLOW_NAMESPACE, sha, workflow_values)
+        values.update(workflow_values)
+
+    return resolve_workflow_values(repo, values)
+
+
+async def get_workflow_values_async(repo, ghclient):
+    url = repo['html_url']
+    default_branch = repo['default_branch']
+    cache = get_value_cache()
+
+    files = await ghclient.get_workflow_files(
+        url, repo['trees_url'], default_branch)
+    missing = [(name, sha) for name, sha in files if (
+        cache.get(WORKFLOW_NAMESPACE, sha) is None)]
+    contents = await asyncio.gather(*[ghclient.get_file(
+        url, default_branch, f'{WORKFLOWS_PATH}/{name}')
+        for name, sha in missing])
+    for (name, sha), content in zip(missing, contents):
+        if content is not None:
+            cache.set(WORKFLOW_NAMESPACE, sha, analyze_workflow_file(
+                url, name, content))
+
+    values = {}
+    for _, sha in workflow_precedence(files):
+        values.update(cache.get(WORKFLOW_NAMESPACE, sha) or {})
+    return resolve_workflow_values(repo, values)
+
+
+def init_repo_values(repo, has_js):
+    """
+    Returns the (RepoRow, WebappRow) for repo with the values known
+    before any of its files are read.
+    """
+    url = repo['html_url']
+    lang = repo['language'] or ''
+    is_python = lang.startswith('Python')
+
+    repo_row = RepoRow(
+        url=url,
+        name=repo.get('name'),
+        language=lang,
+        last_updated=repo.get('pushed_at'),
+        license=repo.get('license').get('name') if (
             repo.get('license') is not None) else 'N/A',
-        'Default Branch': default_branch,
-        'Linter': 'Ruff' if lang.startswith('Python') else 'N/A',
-        'PyPI': False if lang.startswith('Python') else 'N/A',
-        'Django': None if lang.startswith('Python') else 'N/A',
-        'django-container': 'N/A',
-        'Ingress': 'N/A',
-        'Trivy': 'No' if lang.startswith('Python') else 'N/A',
-        'Coveralls': False,
-        'Coverage': 0,
-        'Version': None,
-    }
-
-    webapp_values = {
-        'URL': url,
-        'Name': repo.get('name'),
-        'Django': None if lang.startswith('Python') else 'N/A',
-        'Vue': None,
-        'Vite': None,
-        'Webpack': None,
-        'django-compressor': None,
-        'axdd-components': None,
-        'Bootstrap': None,
-        'Bootstrap Icons': None,
-        'Prettier': None,
-        'ESLint': None,
-        'Stylint': None,
-        'JSHint': False if has_js else 'N/A',
-        'Coverage': 0 if has_js else 'N/A',
-    }
-
-    ga_url = f'{git_file_url}/{default_branch}/.github/workflows/cicd.yml'
-
-    resp = ghclient.get(ga_url)
-    if resp.status_code == 200:
-        repo_values.update(parse_github_action_values(repo, resp.content))
-
-    repo_values['Version'] = ghclient.get_current_version(repo['releases_url'])
+        default_branch=repo['default_branch'],
+        linter='Ruff' if is_python else 'N/A',
+        pypi=False if is_python else 'N/A',
+        django=None if is_python else 'N/A',
+        trivy='No' if is_python else 'N/A',
+    )
+
+    webapp_row = WebappRow(
+        url=url,
+        name=repo.get('name'),
+        django=None if is_python else 'N/A',
+        coverage=0 if has_js else 'N/A',
+    )
+
+    return repo_row, webapp_row
+
+
+def update_repo_values(repo_row, webapp_row, values):
+    """
+    Sets values, a {column: value} dict, on repo_row, and the webapp
+    only columns among them, such as JSHint, on webapp_row.
+    """
+    webapp_row.update(repo_row.update(values))
+
+
+def has_django(repo_row):
+    return repo_row.django is not None and repo_row.django != 'N/A'
+
+
+def get_repo_values(repo, ghclient=None):
+    if ghclient is None:
+        ghclient = GitHub_DAO()
+    metrics = get_metrics()
+    url = repo['html_url']
+    lang = repo['language'] or ''
+    default_branch = repo['default_branch']
+    trees_url = repo['trees_url']
+    with metrics.span('statics'):
+        (has_js, has_css) = ghclient.get_has_statics(trees_url, default_branch)
+
+    repo_row, webapp_row = init_repo_values(repo, has_js)
+
+    with metrics.span('workflows'):
+        update_repo_values(
+            repo_row, webapp_row, get_workflow_values(repo, ghclient))
+
+    # Coveralls is a different host, fetch it alongside the GitHub requests
+    if repo_row.coveralls:
+        coverage = get_coverage_executor().submit(
+            coveralls.get_coverage, url, default_branch, has_js)
+
+    with metrics.span('version'):
+        repo_row.version = ghclient.get_current_version(repo['releases_url'])
 
     if lang.startswith('Python'):
-        repo_values.update(ghclient.get_setup_values(url, default_branch))
-        webapp_values['Django'] = repo_values['Django']
+        with metrics.span('setup'):
+            update_repo_values(repo_row, webapp_row, ghclient.get_setup_values(
+                url, default_branch, trees_url))
+        webapp_row.django = repo_row.django
 
-        if (repo_values['Django'] is not None and
-                repo_values['Django'] != 'N/A'):
-            repo_values.update(ghclient.get_docker_values(url, default_branch))
-            repo_values.update(ghclient.get_prod_values(url, default_branch))
+        if has_django(repo_row):
+            with metrics.span('docker'):
+                update_repo_values(
+                    repo_row, webapp_row,
+                    ghclient.get_docker_values(url, default_branch, trees_url))
+                update_repo_values(
+                    repo_row, webapp_row,
+                    ghclient.get_prod_values(url, default_branch, trees_url))
 
-    if repo_values['Coveralls']:
-        (coverage, js_coverage) = Coveralls_DAO().get_coverage(url, default_branch)
-        repo_values['Coverage'] = coverage
+    if repo_row.coveralls:
+        with metrics.span('coverage wait'):
+            (coverage, js_coverage) = coverage.result()
+        repo_row.coverage = coverage
         if has_js:
-            webapp_values['Coverage'] = js_coverage
+            webapp_row.coverage = js_coverage
 
-    webapp_values['JSHint'] = repo_values.get('JSHint')
-    webapp_values['django-compressor'] = repo_values.get('django-compressor')
-    try:
-        del repo_values['JSHint']
-        del repo_values['django-compressor']
-    except KeyError:
-        pass
+    if has_js and has_css:
+        with metrics.span('package'):
+            webapp_row.update(ghclient.get_package_values(
+                url, default_branch, trees_url))
+        return repo_row, webapp_row
+    else:
+        return repo_row, None
+
+
+async def get_repo_values_async(repo, ghclient, coveralls):
+    """
+    Same values as get_repo_values, with each group of independent
+    requests issued concurrently through the async DAOs.
+    """
+    url = repo['html_url']
+    lang = repo['language'] or ''
+    default_branch = repo['default_branch']
+    trees_url = repo['trees_url']
+    is_python = lang.startswith('Python')
+
+    (has_js, has_css), workflow_values, version, setup_values = (
+        await asyncio.gather(
+            ghclient.get_has_statics(trees_url, default_branch),
+            get_workflow_values_async(repo, ghclient),
+            ghclient.get_current_version(repo['releases_url']),
+            ghclient.get_setup_values(url, default_branch, trees_url) if (
+                is_python) else asyncio.sleep(0, {})))
+
+    repo_row, webapp_row = init_repo_values(repo, has_js)
+    update_repo_values(repo_row, webapp_row, workflow_values)
+
+    repo_row.version = version
+
+    if is_python:
+        update_repo_values(repo_row, webapp_row, setup_values)
+        webapp_row.django = repo_row.django
+
+    use_docker = is_python and has_django(repo_row)
+    (docker_values, prod_values,
+     coverage, package_values) = await asyncio.gather(
+        ghclient.get_docker_values(url, default_branch, trees_url) if (
+            use_docker) else asyncio.sleep(0, {}),
+        ghclient.get_prod_values(url, default_branch, trees_url) if (
+            use_docker) else asyncio.sleep(0, {}),
+        coveralls.get_coverage(url, default_branch, has_js) if (
+            repo_row.coveralls) else asyncio.sleep(0),
+        ghclient.get_package_values(url, default_branch, trees_url) if (
+            has_js and has_css) else asyncio.sleep(0, {}))
+
+    update_repo_values(repo_row, webapp_row, docker_values)
+    update_repo_values(repo_row, webapp_row, prod_values)
+
+    if coverage is not None:
+        repo_row.coverage = coverage[0]
+        if has_js:
+            webapp_row.coverage = coverage[1]
 
     if has_js and has_css:
-        webapp_values.update(ghclient.get_package_values(url, default_branch))
-        return repo_values, webapp_values
+        webapp_row.update(package_values)
+        return repo_row, webapp_row
     else:
-        return repo_values, None
+        return repo_row, None